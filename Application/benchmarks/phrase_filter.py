@@ -0,0 +1,102 @@
+"""Compare quoted-phrase filtering in Python against the native FTS5 `phrases` table.
+
+Builds a synthetic library of large Markdown bodies in which the benchmark
+phrases' words are common but the exact phrases are rare, so the FTS5 MATCH
+admits many candidates that the phrase filter must reject. Each phrase query
+runs once with the Python callback (`native_phrase_filter = False`) and once
+natively; the result cache is bypassed by clearing it before each query.
+
+    python benchmarks/phrase_filter.py --files 1000 --body-kb 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+APPLICATION_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(APPLICATION_DIR / "src"))
+
+from perfect_prompts.contracts.dto import SearchRequest  # noqa: E402
+from perfect_prompts.infrastructure.search.prompt_beacon import PromptBeaconIndex  # noqa: E402
+
+PHRASES = ('"session handoff"', '"prompt template"', '"context window budget"', '"review rubric" agent')
+WORDS = "session handoff prompt template context window budget review rubric agent".split()
+
+
+def build_corpus(root: Path, files: int, body_kb: int, seed: int = 11) -> None:
+    generator = random.Random(seed)
+    filler = [f"w{number:04d}" for number in range(5_000)]
+    directory = root / "Prompts" / "Synthetic"
+    directory.mkdir(parents=True, exist_ok=True)
+    for number in range(files):
+        words: list[str] = []
+        size = 0
+        while size < body_kb * 1024:
+            word = generator.choice(WORDS) if generator.random() < 0.05 else generator.choice(filler)
+            words.append(word)
+            size += len(word) + 1
+        if number % 20 == 0:
+            words.insert(generator.randrange(len(words)), generator.choice(PHRASES).split('"')[1])
+        (directory / f"artifact_{number:05d}.md").write_text(" ".join(words), encoding="utf-8")
+
+
+def measure(index: PromptBeaconIndex, native: bool, repeats: int) -> dict[str, object]:
+    index.native_phrase_filter = native
+    latencies: dict[str, list[float]] = {query: [] for query in PHRASES}
+    counts: dict[str, int] = {}
+    for _ in range(repeats):
+        for query in PHRASES:
+            index._results.clear()
+            started = time.perf_counter()
+            counts[query] = len(index.search(SearchRequest(query, limit=500)))
+            latencies[query].append((time.perf_counter() - started) * 1000)
+    return {
+        query: {"median_ms": round(statistics.median(values), 2), "hits": counts[query]}
+        for query, values in latencies.items()
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=1_000)
+    parser.add_argument("--body-kb", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--tree", type=Path, help="Reuse (or keep) a synthetic library at this path")
+    args = parser.parse_args(argv)
+
+    scratch = None
+    if args.tree is None:
+        scratch = tempfile.TemporaryDirectory(prefix="pp-phrase-bench-")
+        root = Path(scratch.name)
+    else:
+        root = args.tree
+        root.mkdir(parents=True, exist_ok=True)
+    try:
+        index = PromptBeaconIndex(root)
+        if not (root / "Prompts").exists():
+            build_corpus(root, args.files, args.body_kb)
+        if not index.db_path.exists():
+            index.rebuild(workers=0)
+        python = measure(index, False, args.repeats)
+        native = measure(index, True, args.repeats)
+        results: dict[str, object] = {"files": args.files, "body_kb": args.body_kb, "python": python, "native": native}
+        results["speedup"] = {
+            query: round(python[query]["median_ms"] / max(native[query]["median_ms"], 0.01), 1) for query in PHRASES
+        }
+        results["identical_hit_counts"] = all(python[query]["hits"] == native[query]["hits"] for query in PHRASES)
+        print(json.dumps(results, indent=2))
+    finally:
+        if scratch is not None:
+            scratch.cleanup()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,110 @@
+"""Measure FTS5 prefix index settings: index size and rebuild time versus prefix-query latency.
+
+Builds a synthetic library whose words are drawn, Zipf-distributed, from a large
+pseudo-word vocabulary with realistic initial-letter spread, then rebuilds it
+once per prefix setting and replays bare-word queries cut to 2, 3, 4 and 6
+characters. Every unquoted term becomes an FTS5 prefix query, so short terms
+without a matching prefix index merge the doclists of every word they begin.
+The result cache is disabled so every query reaches SQLite.
+
+    python benchmarks/prefix_indexes.py --files 5000 --queries 400
+    python benchmarks/prefix_indexes.py --settings none 2,3 2,3,4
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+APPLICATION_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(APPLICATION_DIR / "src"))
+
+from perfect_prompts.contracts.dto import SearchRequest  # noqa: E402
+from perfect_prompts.infrastructure.search.prompt_beacon import PromptBeaconIndex, resolve_prefix_lengths  # noqa: E402
+
+SETTINGS = ("none", "2", "3", "4", "2,3", "2,3,4")
+QUERY_LENGTHS = (2, 3, 4, 6)
+ONSETS = "b c d f g h j k l m n p r s t v w z br ch cl cr dr fl gr pl pr sh st th tr".split()
+VOWELS = "a e i o u ai ea ie oo ou".split()
+
+
+def vocabulary(size: int, generator: random.Random) -> list[str]:
+    words: set[str] = set()
+    while len(words) < size:
+        syllables = generator.randint(2, 4)
+        words.add("".join(generator.choice(ONSETS) + generator.choice(VOWELS) for _ in range(syllables)))
+    return sorted(words)
+
+
+def build_corpus(root: Path, files: int, seed: int = 5) -> list[str]:
+    generator = random.Random(seed)
+    words = vocabulary(40_000, generator)
+    generator.shuffle(words)
+    cumulative = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(words))))
+    directory = root / "Prompts" / "Synthetic"
+    directory.mkdir(parents=True, exist_ok=True)
+    for number in range(files):
+        body = generator.choices(words, cum_weights=cumulative, k=generator.randint(150, 600))
+        (directory / f"artifact_{number:06d}.md").write_text(" ".join(body), encoding="utf-8")
+    return words
+
+
+def queries(words: list[str], count: int, seed: int = 9) -> dict[int, list[str]]:
+    generator = random.Random(seed)
+    # Draw from the 2,000 most frequent words, the ones people actually start typing.
+    pool = [word for word in words[:2_000] if len(word) >= max(QUERY_LENGTHS)]
+    return {length: [generator.choice(pool)[:length] for _ in range(count)] for length in QUERY_LENGTHS}
+
+
+def measure(index: PromptBeaconIndex, terms: list[str]) -> dict[str, float]:
+    latencies = []
+    for term in terms:
+        started = time.perf_counter()
+        index.search(SearchRequest(term, limit=40))
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    return {
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))], 3),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=5_000)
+    parser.add_argument("--queries", type=int, default=400, help="Queries per term length")
+    parser.add_argument("--settings", nargs="+", default=list(SETTINGS), help="Prefix settings, e.g. none 2,3 2,3,4")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="pp-prefix-bench-") as scratch:
+        root = Path(scratch)
+        words = build_corpus(root, args.files)
+        batch = queries(words, args.queries)
+        index = PromptBeaconIndex(root)
+        index._results.max_entries = 0
+        results: dict[str, object] = {"files": args.files, "queries_per_length": args.queries}
+        for setting in args.settings:
+            lengths = () if setting == "none" else resolve_prefix_lengths(int(part) for part in setting.split(","))
+            started = time.perf_counter()
+            index.rebuild(workers=0, prefix_lengths=lengths)
+            rebuild_seconds = time.perf_counter() - started
+            for terms in batch.values():
+                index.search(SearchRequest(terms[0]))
+            results[setting] = {
+                "database_mb": round(index.db_path.stat().st_size / 2**20, 2),
+                "rebuild_s": round(rebuild_seconds, 2),
+                **{f"{length}_chars": measure(index, terms) for length, terms in batch.items()},
+            }
+        print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
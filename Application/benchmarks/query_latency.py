@@ -0,0 +1,126 @@
+"""Measure Prompt Beacon query latency with fresh versus pooled read connections.
+
+Builds (or reuses) a synthetic library, indexes it, then replays a fixed mix
+of broad-term, prefix, quoted-phrase and filtered queries. The ``fresh``
+variant closes every pooled handle before each query, reproducing the former
+connect-register-close cycle with a cold SQLite page cache; ``pooled`` keeps
+one read-only handle per thread.
+
+    python benchmarks/query_latency.py --files 5000 --queries 1000 --threads 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+APPLICATION_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(APPLICATION_DIR / "src"))
+
+from perfect_prompts.contracts.dto import SearchRequest  # noqa: E402
+from perfect_prompts.infrastructure.search.prompt_beacon import PromptBeaconIndex  # noqa: E402
+
+VOCABULARY = (
+    "agent context prompt handoff session standard template rubric research architecture review critique "
+    "pipeline schema retrieval citation mermaid reasoning synthesis workflow guardrail evaluation summary "
+    "planner executor memory scaffold curriculum benchmark latency index query ranking"
+).split()
+QUERIES = (
+    "agent handoff", "context synthesis", '"prompt template"', "retrieval citation", "arch", "rubric evaluation",
+    '"session handoff" memory', "mermaid", "planner executor scaffold", "latency benchmark",
+)
+AREAS = ("Prompts", "Skills", "Standards")
+
+
+def build_corpus(root: Path, files: int, seed: int = 7) -> None:
+    """Write Markdown files whose words follow a Zipf-like distribution over a large filler vocabulary.
+
+    The domain words above are sprinkled in rarely, so benchmark queries are
+    selective the way real library queries are rather than matching every file.
+    """
+    generator = random.Random(seed)
+    filler = [f"w{number:05d}" for number in range(20_000)]
+    cumulative = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(filler))))
+    for number in range(files):
+        directory = root / AREAS[number % len(AREAS)] / f"group_{number // 1000:03d}"
+        if number % 1000 < len(AREAS):
+            directory.mkdir(parents=True, exist_ok=True)
+        words = generator.choices(filler, cum_weights=cumulative, k=generator.randint(80, 400))
+        for _ in range(generator.randint(0, 3)):
+            words.insert(generator.randrange(len(words) + 1), " ".join(generator.sample(VOCABULARY, 2)))
+        (directory / f"artifact_{number:06d}.md").write_text(" ".join(words), encoding="utf-8")
+
+
+def requests(count: int) -> list[SearchRequest]:
+    mix: list[SearchRequest] = []
+    for number in range(count):
+        query = QUERIES[number % len(QUERIES)]
+        area = AREAS[number % len(AREAS)] if number % 4 == 0 else None
+        mix.append(SearchRequest(query, area=area, limit=40))
+    return mix
+
+
+def measure(index: PromptBeaconIndex, batch: list[SearchRequest], threads: int, fresh: bool) -> dict[str, float]:
+    def run(request: SearchRequest) -> float:
+        if fresh:
+            index._readers.close_all()
+        started = time.perf_counter()
+        index.search(request)
+        return (time.perf_counter() - started) * 1000
+
+    for request in batch[:len(QUERIES)]:
+        index.search(request)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        latencies = sorted(executor.map(run, batch))
+    elapsed = time.perf_counter() - started
+    return {
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))], 3),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "queries_per_second": round(len(latencies) / elapsed, 1),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=5_000)
+    parser.add_argument("--queries", type=int, default=1_000)
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--tree", type=Path, help="Reuse (or keep) a synthetic library at this path")
+    args = parser.parse_args(argv)
+
+    scratch = None
+    if args.tree is None:
+        scratch = tempfile.TemporaryDirectory(prefix="pp-query-bench-")
+        root = Path(scratch.name)
+    else:
+        root = args.tree
+        root.mkdir(parents=True, exist_ok=True)
+    try:
+        index = PromptBeaconIndex(root)
+        if not any((root / area).exists() for area in AREAS):
+            build_corpus(root, args.files)
+        if not index.db_path.exists():
+            index.rebuild(workers=0)
+        batch = requests(args.queries)
+        results: dict[str, object] = {"files": args.files, "queries": args.queries, "threads": args.threads}
+        for variant, fresh in (("fresh", True), ("pooled", False)):
+            results[variant] = measure(index, batch, args.threads, fresh)
+        print(json.dumps(results, indent=2))
+    finally:
+        if scratch is not None:
+            scratch.cleanup()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,231 @@
+"""Count filesystem metadata syscalls made while walking a synthetic library.
+
+Compares the original `Path.iterdir()` walker plus its per-entry consumer
+checks (`is_dir`, `is_file`, `is_symlink`, `stat`) with the `os.scandir`
+walker that yields `WalkEntry` records.
+
+By default the counts are taken at the `os` layer: every `os.stat`, `os.lstat`
+and directory listing is tallied, and `os.DirEntry` calls are modelled on
+CPython's Linux implementation (type from `d_type`, one cached `lstat` per
+entry). With ``--strace`` each variant is re-run under ``strace -c`` and the
+kernel's own counts are reported as well.
+
+    python benchmarks/walk_syscalls.py --files 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+APPLICATION_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(APPLICATION_DIR / "src"))
+
+from perfect_prompts.infrastructure.search.ignore import IgnoreMatcher  # noqa: E402
+from perfect_prompts.infrastructure.search import walker  # noqa: E402
+
+STRACE_SYSCALLS = "stat,lstat,newfstatat,statx,fstat,getdents64,openat"
+
+
+def build_tree(root: Path, files: int, per_directory: int) -> None:
+    for number in range(files):
+        directory = root / "Prompts" / "Synthetic" / f"group_{number // (per_directory * 10):03d}" / f"dir_{number // per_directory:05d}"
+        if number % per_directory == 0:
+            directory.mkdir(parents=True, exist_ok=True)
+        (directory / f"artifact_{number:06d}.md").write_bytes(b"x")
+
+
+def legacy_walk(root: Path, matcher: IgnoreMatcher):
+    """The pre-scandir walker and consumer checks, reproduced call for call."""
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = sorted(directory.iterdir(), key=lambda p: (not p.is_dir(), p.name.casefold()))
+        except OSError:
+            continue
+        children = []
+        for entry in entries:
+            if matcher.ignored(entry):
+                continue
+            stat = entry.stat(follow_symlinks=False)
+            is_regular = entry.is_file() and not entry.is_symlink()
+            kind = "symlink" if entry.is_symlink() else ("file" if entry.is_file() else "directory")
+            extension = entry.suffix.casefold() if entry.is_file() else ""
+            size = stat.st_size if entry.is_file() else 0
+            yield entry.relative_to(root).as_posix(), kind, size, stat.st_mtime_ns, extension, is_regular
+            if entry.is_dir() and not entry.is_symlink():
+                children.append(entry)
+        stack.extend(reversed(children))
+
+
+def scandir_walk(root: Path, matcher: IgnoreMatcher):
+    for entry in walker.walk_library(root, matcher):
+        yield entry.relative, entry.kind, entry.size, entry.mtime_ns, entry.extension, entry.kind == "file"
+
+
+VARIANTS = {"legacy": legacy_walk, "scandir": scandir_walk}
+
+
+class _Counter:
+    def __init__(self) -> None:
+        self.stat_calls = 0
+        self.directory_reads = 0
+
+
+class _CountedEntry:
+    """Proxy for `os.DirEntry` charging only the calls that reach the kernel on Linux."""
+
+    def __init__(self, entry: os.DirEntry, counter: _Counter):
+        self._entry = entry
+        self._counter = counter
+        self._lstat_cached = False
+        self._stat_cached = False
+        self.name = entry.name
+        self.path = entry.path
+
+    def is_symlink(self) -> bool:
+        return self._entry.is_symlink()
+
+    def _charge(self, follow_symlinks: bool) -> None:
+        if follow_symlinks and self._entry.is_symlink():
+            if not self._stat_cached:
+                self._stat_cached = True
+                self._counter.stat_calls += 1
+        elif not self._lstat_cached:
+            self._lstat_cached = True
+            self._counter.stat_calls += 1
+
+    def is_dir(self, *, follow_symlinks: bool = True) -> bool:
+        if follow_symlinks and self._entry.is_symlink():
+            self._charge(True)
+        return self._entry.is_dir(follow_symlinks=follow_symlinks)
+
+    def is_file(self, *, follow_symlinks: bool = True) -> bool:
+        if follow_symlinks and self._entry.is_symlink():
+            self._charge(True)
+        return self._entry.is_file(follow_symlinks=follow_symlinks)
+
+    def stat(self, *, follow_symlinks: bool = True):
+        self._charge(follow_symlinks)
+        return self._entry.stat(follow_symlinks=follow_symlinks)
+
+
+class _CountedScandir:
+    def __init__(self, iterator, counter: _Counter):
+        self._iterator = iterator
+        self._counter = counter
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._iterator.close()
+
+    def __iter__(self):
+        return (_CountedEntry(entry, self._counter) for entry in self._iterator)
+
+
+def count_calls(root: Path, variant: str) -> dict[str, object]:
+    counter = _Counter()
+    real_stat, real_lstat, real_listdir, real_scandir = os.stat, os.lstat, os.listdir, os.scandir
+
+    def stat(*args, **kwargs):
+        counter.stat_calls += 1
+        return real_stat(*args, **kwargs)
+
+    def lstat(*args, **kwargs):
+        counter.stat_calls += 1
+        return real_lstat(*args, **kwargs)
+
+    def listdir(*args, **kwargs):
+        counter.directory_reads += 1
+        return real_listdir(*args, **kwargs)
+
+    def scandir(*args, **kwargs):
+        counter.directory_reads += 1
+        return _CountedScandir(real_scandir(*args, **kwargs), counter)
+
+    matcher = IgnoreMatcher(root, root / ".perfect-promptsignore")
+    os.stat, os.lstat, os.listdir, os.scandir = stat, lstat, listdir, scandir
+    try:
+        started = time.perf_counter()
+        entries = sum(1 for _ in VARIANTS[variant](root, matcher))
+        elapsed = time.perf_counter() - started
+    finally:
+        os.stat, os.lstat, os.listdir, os.scandir = real_stat, real_lstat, real_listdir, real_scandir
+    return {
+        "entries": entries,
+        "stat_calls": counter.stat_calls,
+        "directory_reads": counter.directory_reads,
+        "stat_calls_per_entry": round(counter.stat_calls / max(entries, 1), 3),
+        "seconds": round(elapsed, 3),
+    }
+
+
+def strace_counts(root: Path, variant: str) -> dict[str, int]:
+    with tempfile.NamedTemporaryFile("r", suffix=".strace") as output:
+        subprocess.run(
+            ["strace", "-f", "-c", "-o", output.name, "-e", f"trace={STRACE_SYSCALLS}",
+             sys.executable, __file__, "--run-variant", variant, "--tree", str(root)],
+            check=True, stdout=subprocess.DEVNULL,
+        )
+        counts: dict[str, int] = {}
+        for line in output.read().splitlines():
+            match = re.match(r"\s*[\d.]+\s+[\d.]+\s+\d+\s+(\d+)\s+(?:\d+\s+)?(\w+)$", line)
+            if match and match.group(2) != "total":
+                counts[match.group(2)] = int(match.group(1))
+        return counts
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=100_000)
+    parser.add_argument("--per-directory", type=int, default=100)
+    parser.add_argument("--tree", type=Path, help="Reuse (or keep) a synthetic tree at this path")
+    parser.add_argument("--strace", action="store_true", help="Also report kernel counts from strace -c")
+    parser.add_argument("--run-variant", choices=tuple(VARIANTS), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_variant:
+        root = args.tree.resolve()
+        sum(1 for _ in VARIANTS[args.run_variant](root, IgnoreMatcher(root)))
+        return 0
+
+    scratch = None
+    if args.tree is None:
+        scratch = tempfile.TemporaryDirectory(prefix="pp-walk-bench-")
+        root = Path(scratch.name)
+    else:
+        root = args.tree
+        root.mkdir(parents=True, exist_ok=True)
+    try:
+        root = root.resolve()
+        if not (root / "Prompts").exists():
+            build_tree(root, args.files, args.per_directory)
+        results: dict[str, object] = {"files": args.files, "per_directory": args.per_directory}
+        for variant in VARIANTS:
+            results[variant] = count_calls(root, variant)
+            if args.strace:
+                if shutil.which("strace") is None:
+                    raise SystemExit("strace is not installed")
+                results[variant]["strace"] = strace_counts(root, variant)
+        legacy, scandir = results["legacy"]["stat_calls"], results["scandir"]["stat_calls"]
+        results["stat_call_reduction"] = round(legacy / max(scandir, 1), 2)
+        print(json.dumps(results, indent=2))
+    finally:
+        if scratch is not None:
+            scratch.cleanup()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,40 +1,109 @@
-"""Batch queries preserving Beacon's quote-aware split and per-query exports."""
+"""Batch queries preserving Beacon's quote-aware split and per-query exports.
+
+Queries fan out over a bounded thread pool. Each worker thread searches on its
+own pooled read-only connection, and exports are serialized and written by a
+single background writer, so no search waits on the disk. By default the whole
+batch goes to one append-only JSON Lines file (``export_format="jsonl"`` or
+``"jsonl.gz"``); ``"json"`` keeps one ``query.v1`` file per query. Results keep
+the positions `split_batch_queries` assigned, and one failing query never
+affects the others.
+"""
 
 from __future__ import annotations
 
+import os
 import time
 import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
 
-from perfect_prompts.contracts.dto import BatchQueryResult, SearchRequest
+from perfect_prompts.contracts.dto import BatchQueryReport, BatchQueryResult, SearchHit, SearchRequest
 from perfect_prompts.contracts.ports import SearchIndexPort
-from perfect_prompts.infrastructure.search.exporter import SearchResultsExporter
+from perfect_prompts.infrastructure.search.exporter import BATCH_FORMATS, SearchResultsExporter
+
+# SQLite releases the GIL while it runs a query, so searches scale with cores, not threads.
+DEFAULT_BATCH_WORKERS = min(4, os.cpu_count() or 1)
 
 
 class BatchQuery:
-    def __init__(self, index: SearchIndexPort, root):
+    def __init__(
+        self, index: SearchIndexPort, root, *, workers: int = DEFAULT_BATCH_WORKERS, export_format: str = "jsonl",
+    ):
+        if export_format not in BATCH_FORMATS:
+            raise ValueError(f"Unknown batch export format {export_format!r}; expected one of {', '.join(BATCH_FORMATS)}")
         self._index = index
         self._exporter = SearchResultsExporter(root)
+        self.workers = workers
+        self.export_format = export_format
 
     def execute(self, text: str, *, limit: int = 40) -> tuple[BatchQueryResult, ...]:
+        return self.run(text, limit=limit).results
+
+    def run(self, text: str, *, limit: int = 40, workers: int | None = None) -> BatchQueryReport:
+        """Run every query in ``text`` on up to ``workers`` threads and export each result."""
         queries = split_batch_queries(text)
+        workers = max(1, min(workers or self.workers, len(queries) or 1))
         batch_id = f"bq_{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')}_{uuid.uuid4().hex[:10]}"
-        results: list[BatchQueryResult] = []
-        for position, query in enumerate(queries, start=1):
-            request = SearchRequest(query=query, limit=limit)
-            try:
-                started = time.perf_counter()
-                hits = self._index.search(request)
-                elapsed = (time.perf_counter() - started) * 1000
-                captured = self._exporter.capture(
-                    request, hits, search_duration_ms=elapsed,
-                    batch={"batch_execution_id": batch_id, "position": position, "query_count": len(queries)},
-                )
-                path = self._exporter.write(captured)
-                results.append(BatchQueryResult(query=query, hits=hits, export_path=str(path)))
-            except Exception as error:
-                results.append(BatchQueryResult(query=query, hits=(), error=str(error)))
-        return tuple(results)
+        started = time.perf_counter()
+        sink = None
+        if self.export_format != "json" and queries:
+            sink = self._exporter.open_batch(batch_id, len(queries), compressed=self.export_format == "jsonl.gz")
+        write = sink.append if sink is not None else self._exporter.write
+        try:
+            with ThreadPoolExecutor(max_workers=1, thread_name_prefix="perfect-prompts-batch-export") as writer:
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="perfect-prompts-batch") as pool:
+                    searches = [
+                        pool.submit(self._search, writer, write, query, position, len(queries), batch_id, limit)
+                        for position, query in enumerate(queries, start=1)
+                    ]
+                    results = tuple(
+                        _collect(search, query, position)
+                        for position, (query, search) in enumerate(zip(queries, searches), start=1)
+                    )
+            if sink is not None:
+                for item in results:
+                    if item.error and not item.hits:
+                        sink.append_failure(item.position, item.query, item.error)
+        finally:
+            if sink is not None:
+                sink.close()
+        elapsed = time.perf_counter() - started
+        return BatchQueryReport(
+            results, workers, round(elapsed * 1000, 3), round(len(queries) / elapsed, 1) if elapsed > 0 else 0.0,
+        )
+
+    def _search(
+        self,
+        writer: ThreadPoolExecutor,
+        write: Callable[[dict[str, object]], Path],
+        query: str,
+        position: int,
+        count: int,
+        batch_id: str,
+        limit: int,
+    ) -> tuple[tuple[SearchHit, ...], Future]:
+        request = SearchRequest(query=query, limit=limit)
+        started = time.perf_counter()
+        hits = self._index.search(request)
+        elapsed = (time.perf_counter() - started) * 1000
+        captured = self._exporter.capture(
+            request, hits, search_duration_ms=elapsed,
+            batch={"batch_execution_id": batch_id, "position": position, "query_count": count},
+        )
+        return hits, writer.submit(write, captured)
+
+
+def _collect(search: Future, query: str, position: int) -> BatchQueryResult:
+    try:
+        hits, export = search.result()
+    except Exception as error:
+        return BatchQueryResult(query=query, hits=(), error=str(error), position=position)
+    try:
+        return BatchQueryResult(query=query, hits=hits, export_path=str(export.result()), position=position)
+    except Exception as error:
+        return BatchQueryResult(query=query, hits=hits, error=f"export failed: {error}", position=position)
 
 
 def split_batch_queries(text: str) -> list[str]:
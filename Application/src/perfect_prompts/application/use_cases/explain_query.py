@@ -0,0 +1,10 @@
+from perfect_prompts.contracts.dto import QueryExplanation, SearchRequest
+from perfect_prompts.contracts.ports import SearchIndexPort
+
+
+class ExplainQuery:
+    def __init__(self, index: SearchIndexPort):
+        self._index = index
+
+    def execute(self, request: SearchRequest) -> QueryExplanation:
+        return self._index.explain(request)
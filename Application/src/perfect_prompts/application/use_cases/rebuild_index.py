@@ -7,5 +7,7 @@ class RebuildIndex:
     def __init__(self, index: SearchIndexPort):
         self._index = index
 
-    def execute(self, cancelled: Callable[[], bool] | None = None) -> IndexReport:
-        return self._index.rebuild(cancelled=cancelled)
+    def execute(
+        self, cancelled: Callable[[], bool] | None = None, workers: int = 1, profile: bool = False,
+    ) -> IndexReport:
+        return self._index.rebuild(cancelled=cancelled, workers=workers, profile=profile)
@@ -7,5 +7,7 @@ class SyncIndex:
     def __init__(self, index: SearchIndexPort):
         self._index = index
 
-    def execute(self, cancelled: Callable[[], bool] | None = None) -> IndexReport:
-        return self._index.sync(cancelled=cancelled)
+    def execute(
+        self, cancelled: Callable[[], bool] | None = None, full: bool = False, profile: bool = False,
+    ) -> IndexReport:
+        return self._index.sync(cancelled=cancelled, full=full, profile=profile)
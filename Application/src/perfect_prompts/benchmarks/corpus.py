@@ -0,0 +1,168 @@
+"""Deterministic synthetic Perfect Prompts libraries for benchmarks.
+
+The same `CorpusSpec` always produces byte-identical files: names, layout,
+formats and bodies come from one seeded generator, and archive members carry a
+fixed timestamp. Files are spread over the real `LIBRARY_ROOT_DIRECTORIES`
+with a few levels of subdirectories, formats follow a weighted mix, and sizes
+follow a log-normal distribution around ``median_kb``. Words are drawn
+Zipf-distributed from a pseudo-word vocabulary with a fixed set of real terms
+at the head, so the benchmark queries have realistic match counts.
+"""
+
+from __future__ import annotations
+
+import io
+import itertools
+import json
+import math
+import random
+import zipfile
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from perfect_prompts.domain.classification import LIBRARY_ROOT_DIRECTORIES
+
+DEFAULT_MIX = {"md": 40, "py": 15, "json": 10, "ipynb": 10, "docx": 15, "zip": 10}
+TERMS = (
+    "agent context prompt handoff session standard template rubric research architecture review critique "
+    "pipeline schema retrieval citation reasoning synthesis workflow guardrail evaluation summary planner "
+    "executor memory scaffold curriculum benchmark latency index query ranking"
+).split()
+_ONSETS = "b c d f g h j k l m n p r s t v w z br ch cl cr dr fl gr pl pr sh st th tr".split()
+_VOWELS = "a e i o u ai ea ie oo ou".split()
+_ARCHIVE_TIME = (2024, 1, 1, 0, 0, 0)
+
+
+@dataclass(frozen=True, slots=True)
+class CorpusSpec:
+    files: int = 2_000
+    seed: int = 7
+    mix: dict[str, int] = field(default_factory=lambda: dict(DEFAULT_MIX))
+    median_kb: float = 6.0
+    sigma: float = 1.0
+    max_kb: float = 512.0
+    vocabulary: int = 20_000
+
+
+@dataclass(frozen=True, slots=True)
+class CorpusSummary:
+    files: int
+    bytes: int
+    by_extension: dict[str, int]
+
+
+def parse_mix(value: str) -> dict[str, int]:
+    """Parse ``md=40,py=20,docx=10`` into extension weights."""
+    mix: dict[str, int] = {}
+    for part in value.split(","):
+        extension, _, weight = part.partition("=")
+        extension = extension.strip().lstrip(".").casefold()
+        if extension not in _WRITERS:
+            raise ValueError(f"unsupported extension {extension!r}; expected one of {', '.join(_WRITERS)}")
+        mix[extension] = int(weight or 1)
+        if mix[extension] < 0:
+            raise ValueError("weights must not be negative")
+    if not any(mix.values()):
+        raise ValueError("at least one extension needs a positive weight")
+    return mix
+
+
+def generate_corpus(root: Path, spec: CorpusSpec = CorpusSpec()) -> CorpusSummary:
+    """Write ``spec.files`` files under ``root`` and return what was written."""
+    generator = random.Random(spec.seed)
+    words = _vocabulary(spec.vocabulary, generator)
+    cumulative = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(words))))
+    extensions = [extension for extension, weight in spec.mix.items() if weight > 0]
+    weights = [spec.mix[extension] for extension in extensions]
+    directories = sorted(LIBRARY_ROOT_DIRECTORIES)
+    total = 0
+    by_extension = dict.fromkeys(extensions, 0)
+    for number in range(spec.files):
+        extension = generator.choices(extensions, weights)[0]
+        area = directories[number % len(directories)]
+        depth = generator.randint(0, 2)
+        parts = [area, *(f"topic_{generator.randrange(12):02d}" for _ in range(depth))]
+        target = root.joinpath(*parts, f"artifact_{number:06d}.{extension}")
+        target.parent.mkdir(parents=True, exist_ok=True)
+        size = min(spec.max_kb, spec.median_kb * math.exp(generator.gauss(0, spec.sigma))) * 1024
+        text = _text(generator, words, cumulative, max(64, int(size)))
+        data = _WRITERS[extension](text, number)
+        target.write_bytes(data)
+        total += len(data)
+        by_extension[extension] += 1
+    return CorpusSummary(spec.files, total, by_extension)
+
+
+def _vocabulary(size: int, generator: random.Random) -> list[str]:
+    words: set[str] = set()
+    while len(words) < size:
+        syllables = generator.randint(2, 4)
+        words.add("".join(generator.choice(_ONSETS) + generator.choice(_VOWELS) for _ in range(syllables)))
+    tail = sorted(words - set(TERMS))
+    generator.shuffle(tail)
+    # Real terms sit among the most frequent words so benchmark queries match a realistic share of files.
+    return [*TERMS, *tail]
+
+
+def _text(generator: random.Random, words: list[str], cumulative: list[float], size: int) -> str:
+    count = max(8, size // 7)
+    body = generator.choices(words, cum_weights=cumulative, k=count)
+    lines = (" ".join(body[start:start + 12]) for start in range(0, count, 12))
+    return "\n".join(lines)
+
+
+def _markdown(text: str, number: int) -> bytes:
+    return f"# Artifact {number}\n\n{text}\n".encode()
+
+
+def _python(text: str, number: int) -> bytes:
+    body = "\n".join(f"    # {line}" for line in text.splitlines())
+    return f'"""Artifact {number}."""\n\n\ndef artifact_{number}():\n{body}\n    return {number}\n'.encode()
+
+
+def _json(text: str, number: int) -> bytes:
+    return json.dumps({"id": number, "lines": text.splitlines()}, indent=1).encode()
+
+
+def _notebook(text: str, number: int) -> bytes:
+    lines = text.splitlines()
+    middle = len(lines) // 2
+    output = {"output_type": "stream", "name": "stdout", "text": [line + "\n" for line in lines[middle:]]}
+    cells = [
+        {"cell_type": "markdown", "metadata": {}, "source": [line + "\n" for line in lines[:middle]]},
+        {
+            "cell_type": "code", "execution_count": 1, "metadata": {}, "source": [f"artifact = {number}\n"],
+            "outputs": [output],
+        },
+    ]
+    return json.dumps({"cells": cells, "metadata": {}, "nbformat": 4, "nbformat_minor": 5}).encode()
+
+
+def _docx(text: str, number: int) -> bytes:
+    paragraphs = "".join(f"<w:p><w:r><w:t>{line}</w:t></w:r></w:p>" for line in text.splitlines())
+    document = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f"<w:body>{paragraphs}</w:body></w:document>"
+    )
+    return _archive({"[Content_Types].xml": "<Types/>", "word/document.xml": document})
+
+
+def _zip(text: str, number: int) -> bytes:
+    lines = text.splitlines()
+    middle = len(lines) // 2
+    return _archive({
+        f"artifact_{number}/README.md": "\n".join(lines[:middle]),
+        f"artifact_{number}/notes.txt": "\n".join(lines[middle:]),
+    })
+
+
+def _archive(members: dict[str, str]) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, content in members.items():
+            archive.writestr(zipfile.ZipInfo(name, _ARCHIVE_TIME), content, compress_type=zipfile.ZIP_DEFLATED)
+    return buffer.getvalue()
+
+
+_WRITERS = {"md": _markdown, "py": _python, "json": _json, "ipynb": _notebook, "docx": _docx, "zip": _zip}
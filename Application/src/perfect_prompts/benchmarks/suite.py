@@ -0,0 +1,211 @@
+"""Offline Prompt Beacon benchmark: generate a synthetic library, index it, query it.
+
+`run_benchmark` builds a `generate_corpus` library (in a temporary directory
+unless one is given) and measures a cold rebuild, a no-change and a
+touched-files sync, raw extraction, single-query latency percentiles and batch
+throughput, plus peak RSS. The report is plain JSON so runs can be saved and
+diffed; `compare` checks a report against a saved baseline metric by metric.
+
+Every query in the latency run is distinct, so the per-generation result cache
+never answers one and the percentiles measure SQLite, not a dictionary lookup.
+"""
+
+from __future__ import annotations
+
+import os
+import platform
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+from perfect_prompts import __version__
+from perfect_prompts.benchmarks.corpus import TERMS, CorpusSpec, generate_corpus
+from perfect_prompts.contracts.dto import SearchRequest
+from perfect_prompts.domain.classification import LIBRARY_ROOT_DIRECTORIES
+
+BENCH_SCHEMA = "perfect-prompts.bench.v1"
+DEFAULT_TOLERANCE = 0.10
+TOUCHED_SHARE = 0.01
+
+
+@dataclass(frozen=True, slots=True)
+class BenchConfig:
+    corpus: CorpusSpec = field(default_factory=CorpusSpec)
+    queries: int = 200
+    batch_queries: int = 100
+    workers: int = 1
+
+
+@dataclass(frozen=True, slots=True)
+class MetricChange:
+    metric: str
+    baseline: float
+    current: float
+    change: float
+    regressed: bool
+
+
+def run_benchmark(config: BenchConfig = BenchConfig(), directory: Path | None = None) -> dict[str, object]:
+    """Run the whole suite and return a ``perfect-prompts.bench.v1`` report."""
+    if directory is not None:
+        directory = Path(directory).expanduser().resolve()
+        directory.mkdir(parents=True, exist_ok=True)
+        return _run(config, directory)
+    with tempfile.TemporaryDirectory(prefix="perfect-prompts-bench-") as scratch:
+        return _run(config, Path(scratch))
+
+
+def _run(config: BenchConfig, root: Path) -> dict[str, object]:
+    from perfect_prompts.application.use_cases.batch_query import BatchQuery
+    from perfect_prompts.infrastructure.search.extractors import extract_searchable_text
+    from perfect_prompts.infrastructure.search.prompt_beacon import PromptBeaconIndex
+
+    # A kept directory is reused, but every run starts from a cold index and extraction cache.
+    shutil.rmtree(root / ".perfect-prompts", ignore_errors=True)
+    shutil.rmtree(root / "search-exports", ignore_errors=True)
+    started = time.perf_counter()
+    summary = generate_corpus(root, config.corpus)
+    generate_seconds = time.perf_counter() - started
+    megabytes = summary.bytes / 1_000_000
+    files = sorted(path for path in root.rglob("artifact_*") if path.is_file())
+
+    started = time.perf_counter()
+    for path in files:
+        extract_searchable_text(path)
+    extract_seconds = time.perf_counter() - started
+
+    index = PromptBeaconIndex(root)
+    report = index.rebuild(workers=config.workers)
+    index_seconds = report.duration_ms / 1000
+    noop = index.sync()
+    for path in [path for path in files if path.suffix == ".md"][:max(1, int(len(files) * TOUCHED_SHARE))]:
+        # Saved the way editors do, through a temporary file, so the directory mtime moves too.
+        revised = path.with_name(path.name + ".tmp")
+        revised.write_bytes(path.read_bytes() + b"\nbenchmark revision\n")
+        os.replace(revised, path)
+    touched = index.sync()
+
+    latencies = []
+    for request in benchmark_requests(config.queries):
+        started = time.perf_counter()
+        index.search(request)
+        latencies.append((time.perf_counter() - started) * 1000)
+    batch = BatchQuery(index, root, workers=max(1, config.workers))
+    batch_report = batch.run(", ".join(_query_text(number) for number in range(config.batch_queries)), limit=40)
+
+    metrics = {
+        "index_seconds": round(index_seconds, 3),
+        "index_files_per_second": round(report.indexed_files / index_seconds, 1) if index_seconds else 0.0,
+        "index_mb_per_second": round(megabytes / index_seconds, 2) if index_seconds else 0.0,
+        "extract_files_per_second": round(len(files) / extract_seconds, 1) if extract_seconds else 0.0,
+        "extract_mb_per_second": round(megabytes / extract_seconds, 2) if extract_seconds else 0.0,
+        "sync_noop_ms": round(noop.duration_ms, 2),
+        "sync_touched_ms": round(touched.duration_ms, 2),
+        "query_p50_ms": round(percentile(latencies, 50), 3),
+        "query_p95_ms": round(percentile(latencies, 95), 3),
+        "query_p99_ms": round(percentile(latencies, 99), 3),
+        "batch_queries_per_second": round(batch_report.queries_per_second, 1),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    return {
+        "schema": BENCH_SCHEMA,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": _environment(),
+        "config": {
+            "corpus": asdict(config.corpus), "queries": config.queries,
+            "batch_queries": config.batch_queries, "workers": config.workers,
+        },
+        "corpus": {
+            "files": summary.files, "bytes": summary.bytes, "by_extension": summary.by_extension,
+            "generate_seconds": round(generate_seconds, 3), "indexed_files": report.indexed_files,
+            "touched_files": touched.updated,
+        },
+        "metrics": metrics,
+    }
+
+
+def benchmark_requests(count: int) -> list[SearchRequest]:
+    """``count`` distinct requests cycling through terms, prefixes, phrases and path filters."""
+    return [
+        SearchRequest(_query_text(number), path_prefix=_path_filter(number), limit=40)
+        for number in range(count)
+    ]
+
+
+def _query_text(number: int) -> str:
+    first = TERMS[number % len(TERMS)]
+    second = TERMS[(number // len(TERMS) + number + 1) % len(TERMS)]
+    shape = number % 4
+    if shape == 0:
+        return f"{first} {second}"
+    if shape == 1:
+        return f"{first[:4]} {second}"
+    if shape == 2:
+        return f'"{first} {second}"'
+    return f"{first} {second} {TERMS[(number * 7) % len(TERMS)]}"
+
+
+def _path_filter(number: int) -> str | None:
+    directories = sorted(LIBRARY_ROOT_DIRECTORIES)
+    return directories[number % len(directories)] if number % 5 == 4 else None
+
+
+def percentile(values: list[float], rank: float) -> float:
+    """Nearest-rank percentile; 0.0 for no values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = max(0, min(len(ordered) - 1, int(-(-rank * len(ordered) // 100)) - 1))
+    return ordered[position]
+
+
+def peak_rss_mb() -> float | None:
+    """Peak resident set size of this process or its extraction workers, whichever is larger."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    # Linux reports kilobytes, macOS bytes.
+    return round(peak / (1_048_576 if sys.platform == "darwin" else 1024), 1)
+
+
+def _environment() -> dict[str, object]:
+    return {
+        "perfect_prompts": __version__,
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(
+    current: dict[str, object], baseline: dict[str, object], tolerance: float = DEFAULT_TOLERANCE,
+) -> list[MetricChange]:
+    """Compare shared metrics; ``*_per_second`` should not drop and everything else should not grow.
+
+    A metric regresses when it is worse than the baseline by more than
+    ``tolerance`` (a fraction, 0.10 = 10 %).
+    """
+    if baseline.get("schema") != BENCH_SCHEMA:
+        raise ValueError(f"Baseline is not a {BENCH_SCHEMA} report")
+    if baseline.get("config") != current.get("config"):
+        raise ValueError("Baseline was measured with a different corpus or query configuration")
+    changes = []
+    for metric, before in baseline["metrics"].items():
+        after = current["metrics"].get(metric)
+        if not isinstance(before, (int, float)) or not isinstance(after, (int, float)):
+            continue
+        change = (after - before) / before if before else 0.0
+        worse = -change if metric.endswith("_per_second") else change
+        changes.append(MetricChange(metric, before, after, round(change, 4), worse > tolerance))
+    return changes
@@ -1,4 +1,10 @@
-"""Programmatic companion CLI for library search and filesystem operations."""
+"""Programmatic companion CLI for library search and filesystem operations.
+
+Agents run this once per query, so module-level imports are kept to what
+argument parsing needs. Each subcommand imports its own machinery: ``status``
+and ``query`` never load the extractors, exporter, launcher installer or
+server, and ``query --server`` does not even load SQLite.
+"""
 
 from __future__ import annotations
 
@@ -10,12 +16,7 @@ from dataclasses import asdict
 from pathlib import Path
 
 from perfect_prompts import __version__
-from perfect_prompts.application.use_cases.batch_query import BatchQuery
-from perfect_prompts.contracts.dto import AddArtifactRequest, RemoveArtifactRequest, SearchRequest
-from perfect_prompts.infrastructure.filesystem.artifact_store import LocalArtifactStore
-from perfect_prompts.infrastructure.launcher.installer import install_launchers
-from perfect_prompts.infrastructure.search.exporter import SearchResultsExporter
-from perfect_prompts.infrastructure.search.prompt_beacon import PromptBeaconIndex
+from perfect_prompts.contracts.dto import SearchRequest
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -28,6 +29,51 @@ def build_parser() -> argparse.ArgumentParser:
         command.add_argument("--root", type=Path, default=Path.cwd())
         if name == "status":
             command.add_argument("--json", action="store_true")
+        else:
+            command.add_argument(
+                "--profile", action="store_true",
+                help="Time each phase and extractor and list the slowest files (also kept for `status`)",
+            )
+        if name == "sync":
+            command.description = (
+                "Bring the index up to date. By default only directories whose mtime or listing changed are "
+                "re-listed, so a file rewritten in place inside an unchanged directory is missed; use --full."
+            )
+            command.add_argument(
+                "--full", action="store_true",
+                help="Walk and compare every node, catching files rewritten in place that the default sync misses",
+            )
+            command.add_argument(
+                "--workers", type=int, default=1,
+                help="Shard processes for a sharded index (0 = one per CPU; default: 1, in this process)",
+            )
+        if name == "index":
+            command.add_argument(
+                "--workers", type=int, default=1,
+                help="Extraction processes for the rebuild (0 = one per CPU; default: 1, sequential)",
+            )
+            command.add_argument(
+                "--prefix", type=_prefix_lengths, metavar="N[,N...]",
+                help="FTS5 prefix index lengths, e.g. 2,3,4, or 'none' (default: keep the current index's setting)",
+            )
+            command.add_argument(
+                "--layout", choices=("single", "sharded"),
+                help="One database, or one per library root rebuilt in --workers processes (default: keep the current layout)",
+            )
+            command.add_argument(
+                "--shard", action="append", metavar="ROOT",
+                help="With a sharded index, rebuild only this library root's shard (repeatable)",
+            )
+
+    watch = sub.add_parser("watch", help="Apply library changes to the index as they happen (Ctrl+C to stop)")
+    watch.add_argument("--root", type=Path, default=Path.cwd())
+    watch.add_argument(
+        "--backend", choices=("auto", "inotify", "polling"), default="auto",
+        help="inotify on Linux, polling elsewhere (default: auto)",
+    )
+    watch.add_argument("--debounce-ms", type=int, default=300, help="Quiet period that ends a burst of events")
+    watch.add_argument("--poll-seconds", type=float, default=5.0, help="Interval of the polling backend")
+    watch.add_argument("--metrics-port", type=int, help="Serve OpenMetrics at http://127.0.0.1:PORT/metrics (0 = any free port)")
 
     query = sub.add_parser("query")
     query.add_argument("query", nargs="+")
@@ -40,6 +86,20 @@ def build_parser() -> argparse.ArgumentParser:
     query.add_argument("--path-prefix")
     query.add_argument("--json", action="store_true")
     query.add_argument("--export", action="store_true")
+    query.add_argument("--ndjson", action="store_true", help="Stream one JSON hit per line as results are ranked")
+    query.add_argument("--all", action="store_true", help="With --ndjson, stream every match instead of stopping at --limit")
+    query.add_argument("--server", metavar="ADDRESS", help="Ask a running `serve` process (host:port or socket path)")
+    query.add_argument(
+        "--explain", action="store_true",
+        help="Show the parsed query, SQLite's plan, candidate counts and per-phase timings instead of the hits",
+    )
+
+    serve = sub.add_parser("serve", help="Keep the index hot and answer JSON queries over localhost HTTP or a Unix socket")
+    serve.add_argument("--root", type=Path, default=Path.cwd())
+    serve.add_argument("--host", help="Interface to bind (default: 127.0.0.1)")
+    serve.add_argument("--port", type=int, help="TCP port (default: 8765; 0 = pick a free one)")
+    serve.add_argument("--socket", type=Path, help="Listen on this Unix domain socket instead of TCP")
+    serve.add_argument("--workers", type=int, help="Request-handling threads (default: 8)")
 
     batch = sub.add_parser("batch")
     batch.add_argument("--root", type=Path, default=Path.cwd())
@@ -47,7 +107,12 @@ def build_parser() -> argparse.ArgumentParser:
     source.add_argument("--file", type=Path)
     source.add_argument("--queries")
     batch.add_argument("--limit", type=int, default=40)
+    batch.add_argument("--workers", type=int, help="Concurrent searches (default: up to 4, one per CPU)")
     batch.add_argument("--json", action="store_true")
+    batch.add_argument(
+        "--export-format", choices=("jsonl", "jsonl.gz", "json"), default="jsonl",
+        help="One JSON Lines file for the batch (optionally gzip) or one query.v1 file per query (default: jsonl)",
+    )
 
     add = sub.add_parser("add")
     add.add_argument("source", type=Path)
@@ -61,6 +126,18 @@ def build_parser() -> argparse.ArgumentParser:
     remove.add_argument("--recursive", action="store_true")
     remove.add_argument("--root", type=Path, default=Path.cwd())
 
+    bench = sub.add_parser("bench", help="Benchmark indexing and search on a generated synthetic library (offline)")
+    bench.add_argument("--files", type=int, default=2_000, help="Synthetic files to generate (default: 2000)")
+    bench.add_argument("--seed", type=int, default=7)
+    bench.add_argument("--mix", help="Extension weights, e.g. md=40,py=15,json=10,ipynb=10,docx=15,zip=10")
+    bench.add_argument("--median-kb", type=float, default=6.0, help="Median file size; sizes are log-normal around it")
+    bench.add_argument("--queries", type=int, default=200, help="Distinct queries for the latency percentiles")
+    bench.add_argument("--workers", type=int, default=1, help="Rebuild extraction processes and batch threads")
+    bench.add_argument("--keep", type=Path, metavar="DIR", help="Generate the library in DIR and keep it")
+    bench.add_argument("--output", type=Path, help="Also write the JSON report to this file")
+    bench.add_argument("--baseline", type=Path, help="Compare against a saved report; exit 1 on a regression")
+    bench.add_argument("--tolerance", type=float, default=0.10, help="Allowed slowdown per metric (default: 0.10)")
+
     launcher = sub.add_parser("install-launcher")
     launcher.add_argument("--root", type=Path, required=True)
     launcher.add_argument("--no-desktop", action="store_true")
@@ -68,57 +145,148 @@ def build_parser() -> argparse.ArgumentParser:
     return parser
 
 
+def _prefix_lengths(value: str) -> tuple[int, ...]:
+    from perfect_prompts.infrastructure.search.prompt_beacon import resolve_prefix_lengths
+
+    if value.strip().casefold() == "none":
+        return ()
+    try:
+        return resolve_prefix_lengths(int(part) for part in value.split(","))
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(f"invalid prefix lengths {value!r}: {error}") from error
+
+
 def main(argv: list[str] | None = None) -> int:
     args = build_parser().parse_args(argv)
     if args.command == "install-launcher":
+        from perfect_prompts.infrastructure.launcher.installer import install_launchers
+
         receipt = install_launchers(args.root, desktop=not args.no_desktop, menu=not args.no_menu)
         for path in receipt.paths:
             print(path)
         return 0
+    if args.command == "bench":
+        try:
+            return _bench(args)
+        except (OSError, ValueError) as error:
+            print(f"error: {error}", file=sys.stderr)
+            return 2
+    if args.command == "query" and args.server:
+        try:
+            return _query_server(args)
+        except (OSError, ValueError, RuntimeError) as error:
+            print(f"error: {error}", file=sys.stderr)
+            return 2
+
+    from perfect_prompts.infrastructure.search.sharded import ShardedPromptBeaconIndex, discard_layout, open_index
 
     root = args.root.expanduser().resolve()
-    index = PromptBeaconIndex(root)
     try:
+        index = open_index(
+            root, getattr(args, "layout", None), workers=args.workers if args.command == "sync" else 1,
+        )
         if args.command == "index":
-            print(json.dumps(asdict(index.rebuild()), indent=2))
+            options = {"workers": args.workers, "prefix_lengths": args.prefix, "profile": args.profile}
+            if args.shard:
+                if not isinstance(index, ShardedPromptBeaconIndex):
+                    raise ValueError("--shard needs a sharded index; build one with --layout sharded")
+                options["shards"] = args.shard
+            report = index.rebuild(**options)
+            if args.layout and not report.cancelled:
+                discard_layout(root, "single" if args.layout == "sharded" else "sharded")
+            print(json.dumps(asdict(report), indent=2))
             return 0
         if args.command == "sync":
-            print(json.dumps(asdict(index.sync()), indent=2))
+            print(json.dumps(asdict(index.sync(full=args.full, profile=args.profile)), indent=2))
+            return 0
+        if args.command == "watch":
+            from perfect_prompts.infrastructure.watch.watcher import LibraryWatcher
+
+            watcher = LibraryWatcher(
+                index, backend=args.backend, debounce_seconds=args.debounce_ms / 1000, poll_seconds=args.poll_seconds,
+            )
+            endpoint = None
+            if args.metrics_port is not None:
+                from perfect_prompts.infrastructure.metrics.endpoint import MetricsEndpoint
+
+                endpoint = MetricsEndpoint(index.metrics.render, port=args.metrics_port)
+                print(f"metrics at http://{endpoint.address}/metrics", file=sys.stderr, flush=True)
+            print(f"watching {root} with {watcher.backend}; press Ctrl+C to stop", file=sys.stderr, flush=True)
+            try:
+                watcher.run(
+                    lambda report: print(json.dumps(asdict(report)), flush=True),
+                    lambda error: print(f"error: {error}", file=sys.stderr, flush=True),
+                )
+            except KeyboardInterrupt:
+                pass
+            finally:
+                if endpoint is not None:
+                    endpoint.close()
+            return 0
+        if args.command == "serve":
+            from perfect_prompts.infrastructure.server.query_server import create_server, server_address
+
+            options = {"host": args.host, "port": args.port, "workers": args.workers}
+            server = create_server(
+                index, socket_path=args.socket, **{name: value for name, value in options.items() if value is not None},
+            )
+            print(f"serving {root} on {server_address(server)}; press Ctrl+C to stop", file=sys.stderr, flush=True)
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                server.server_close()
+                index.write_metrics()
             return 0
         if args.command == "add":
+            from perfect_prompts.contracts.dto import AddArtifactRequest
+            from perfect_prompts.infrastructure.filesystem.artifact_store import LocalArtifactStore
+
             receipt = LocalArtifactStore(root).add(AddArtifactRequest(args.source, args.destination, args.name, args.replace))
             report = index.sync()
             print(json.dumps({"artifact": str(receipt.destination), "sync": asdict(report)}, indent=2))
             return 0
         if args.command == "remove":
+            from perfect_prompts.contracts.dto import RemoveArtifactRequest
+            from perfect_prompts.infrastructure.filesystem.artifact_store import LocalArtifactStore
+
             receipt = LocalArtifactStore(root).remove(RemoveArtifactRequest(args.path, args.recursive))
             report = index.sync()
             print(json.dumps({"removed": asdict(receipt), "sync": asdict(report)}, indent=2))
             return 0
         if args.command == "query":
-            request = SearchRequest(
-                " ".join(args.query), area=args.area, artifact_type=args.artifact_type,
-                runtime=args.runtime, source_scope=args.source_scope, path_prefix=args.path_prefix, limit=args.limit,
-            )
+            request = _search_request(args)
+            if args.explain:
+                _print_explanation(args, asdict(index.explain(request)))
+                return 0
+            if args.ndjson:
+                import itertools
+
+                hits = index.search_iter(request)
+                for hit in hits if args.all else itertools.islice(hits, max(1, args.limit)):
+                    print(json.dumps(asdict(hit), ensure_ascii=False), flush=True)
+                return 0
             started = time.perf_counter(); hits = index.search(request); elapsed = (time.perf_counter() - started) * 1000
-            captured = SearchResultsExporter(index.root).capture(request, hits, search_duration_ms=elapsed)
-            if args.json:
-                print(json.dumps(captured, indent=2, ensure_ascii=False))
-            else:
-                print(f"{len(hits)} result(s) in {elapsed:.2f} ms")
-                for pos, hit in enumerate(hits, 1):
-                    print(f"{pos:>3}. {hit.rank:.6f}  [{hit.area}/{hit.artifact_type}] {hit.path}")
-            if args.export:
-                print(f"exported: {SearchResultsExporter(index.root).write(captured)}")
+            _print_hits(args, request, hits, elapsed, index.root)
             return 0
         if args.command == "batch":
+            from perfect_prompts.application.use_cases.batch_query import BatchQuery
+
             text = (args.file if args.file.is_absolute() else index.root / args.file).read_text(encoding="utf-8") if args.file else args.queries
-            results = BatchQuery(index, index.root).execute(text, limit=args.limit)
+            batch = BatchQuery(index, index.root, export_format=args.export_format)
+            report = batch.run(text, limit=args.limit, workers=args.workers)
+            results = report.results
             if args.json:
                 print(json.dumps([asdict(item) for item in results], indent=2, ensure_ascii=False, default=str))
             else:
+                shared = args.export_format != "json"
                 for item in results:
-                    print(f"{item.query}: {len(item.hits)} hit(s)" + (f" ERROR {item.error}" if item.error else f" -> {item.export_path}"))
+                    outcome = f" ERROR {item.error}" if item.error else "" if shared else f" -> {item.export_path}"
+                    print(f"{item.query}: {len(item.hits)} hit(s){outcome}")
+                if shared and results:
+                    print(f"exported: {next((item.export_path for item in results if item.export_path), '')}")
+                print(f"{len(results)} queries in {report.duration_ms:.0f} ms ({report.queries_per_second:,.1f}/s, {report.workers} workers)")
             return 1 if any(item.error for item in results) else 0
         if args.command == "status":
             status = index.status()
@@ -130,5 +298,109 @@ def main(argv: list[str] | None = None) -> int:
     return 0
 
 
+def _search_request(args: argparse.Namespace) -> SearchRequest:
+    return SearchRequest(
+        " ".join(args.query), area=args.area, artifact_type=args.artifact_type,
+        runtime=args.runtime, source_scope=args.source_scope, path_prefix=args.path_prefix, limit=args.limit,
+    )
+
+
+def _query_server(args: argparse.Namespace) -> int:
+    from perfect_prompts.infrastructure.server.client import QueryClient
+
+    client = QueryClient(args.server)
+    request = _search_request(args)
+    if args.explain:
+        _print_explanation(args, client.request("POST", "/explain", asdict(request)))
+        return 0
+    if args.ndjson:
+        payload, remaining = asdict(request), None if args.all else max(1, args.limit)
+        while remaining is None or remaining > 0:
+            page = client.request("POST", "/page", payload)
+            for hit in page["hits"][:remaining]:
+                print(json.dumps(hit, ensure_ascii=False), flush=True)
+            remaining = None if remaining is None else remaining - len(page["hits"])
+            if page["cursor"] is None:
+                break
+            payload["cursor"] = page["cursor"]
+        return 0
+    hits, body = client.search(request)
+    _print_hits(args, request, hits, body["elapsed_ms"], Path(body["root"]))
+    return 0
+
+
+def _print_explanation(args: argparse.Namespace, explanation: dict) -> None:
+    if args.json:
+        print(json.dumps(explanation, indent=2, ensure_ascii=False))
+        return
+    print(f"query: {explanation['query']} ({explanation['match_mode']})")
+    print(f"terms: {', '.join(explanation['terms']) or '-'}")
+    print(f"phrases: {', '.join(explanation['phrases']) or '-'}")
+    print(f"fts expression: {explanation['fts_expression'] or '-'}")
+    if explanation["shards"]:
+        print(f"shards: {', '.join(explanation['shards'])}")
+    phrase_filter = {"native": "phrases table MATCH", "python": "Python UDF prompt_beacon_phrases_match"}
+    print(f"phrase filter: {phrase_filter.get(explanation['phrase_filter'], 'none')}")
+    if explanation["phrase_expression"]:
+        print(f"phrase expression: {explanation['phrase_expression']}")
+    if explanation["node_filters"]:
+        span, nodes = explanation["rowid_span"], explanation["node_rows"]
+        bound = f"; search bounded to rowids {span[0]}-{span[1]}" if span else ""
+        counted = f" ({nodes:,} node(s){bound})" if nodes is not None else ""
+        print(f"node filters: {' AND '.join(explanation['node_filters'])}{counted}")
+    print(
+        f"candidates: {explanation['match_rows']:,} matched, {explanation['filtered_rows']:,} after filters, "
+        f"{explanation['hits']:,} returned"
+    )
+    if explanation["timings_ms"]:
+        print("timings: " + ", ".join(f"{name} {ms:.2f} ms" for name, ms in explanation["timings_ms"].items()))
+    for name, plan in explanation["plans"].items():
+        print(f"plan ({name}):")
+        for line in plan:
+            print(f"  {line}")
+
+
+def _bench(args: argparse.Namespace) -> int:
+    from perfect_prompts.benchmarks.corpus import DEFAULT_MIX, CorpusSpec, parse_mix
+    from perfect_prompts.benchmarks.suite import BenchConfig, compare, run_benchmark
+
+    spec = CorpusSpec(
+        files=args.files, seed=args.seed, mix=parse_mix(args.mix) if args.mix else dict(DEFAULT_MIX),
+        median_kb=args.median_kb,
+    )
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8")) if args.baseline else None
+    report = run_benchmark(BenchConfig(spec, queries=args.queries, workers=args.workers), args.keep)
+    regressions = []
+    if baseline is not None:
+        changes = compare(report, baseline, args.tolerance)
+        report["comparison"] = {
+            "baseline": str(args.baseline), "tolerance": args.tolerance, "metrics": [asdict(item) for item in changes],
+        }
+        regressions = [item for item in changes if item.regressed]
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    print(text)
+    for item in regressions:
+        print(f"regression: {item.metric} {item.baseline} -> {item.current} ({item.change:+.1%})", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+def _print_hits(args: argparse.Namespace, request: SearchRequest, hits, elapsed: float, root: Path) -> None:
+    if args.json or args.export:
+        from perfect_prompts.infrastructure.search.exporter import SearchResultsExporter
+
+        exporter = SearchResultsExporter(root)
+        captured = exporter.capture(request, hits, search_duration_ms=elapsed)
+    if args.json:
+        print(json.dumps(captured, indent=2, ensure_ascii=False))
+    else:
+        print(f"{len(hits)} result(s) in {elapsed:.2f} ms")
+        for pos, hit in enumerate(hits, 1):
+            print(f"{pos:>3}. {hit.rank:.6f}  [{hit.area}/{hit.artifact_type}] {hit.path}")
+    if args.export:
+        print(f"exported: {exporter.write(captured)}")
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
@@ -7,6 +7,7 @@ from typing import Callable
 
 from perfect_prompts.application.use_cases.add_artifact import AddArtifact
 from perfect_prompts.application.use_cases.batch_query import BatchQuery
+from perfect_prompts.application.use_cases.explain_query import ExplainQuery
 from perfect_prompts.application.use_cases.export_query import ExportQuery
 from perfect_prompts.application.use_cases.get_index_status import GetIndexStatus
 from perfect_prompts.application.use_cases.preview_artifact import PreviewArtifact
@@ -16,13 +17,21 @@ from perfect_prompts.application.use_cases.search_library import SearchLibrary
 from perfect_prompts.application.use_cases.sync_index import SyncIndex
 from perfect_prompts.infrastructure.execution.task_runner import ThreadPoolTaskRunner
 from perfect_prompts.infrastructure.filesystem.artifact_store import LocalArtifactStore
-from perfect_prompts.infrastructure.search.prompt_beacon import PromptBeaconIndex
+from perfect_prompts.infrastructure.search.sharded import open_index
+from perfect_prompts.infrastructure.watch.watcher import LibraryWatcher
 from perfect_prompts.presentation.controllers.library_controller import LibraryController
 
 
-def build_container(root: Path, dispatch: Callable[[Callable[[], None]], None]) -> LibraryController:
-    index = PromptBeaconIndex(root)
+def build_container(
+    root: Path, dispatch: Callable[[Callable[[], None]], None], *, metrics_port: int | None = None,
+) -> LibraryController:
+    index = open_index(root)
     store = LocalArtifactStore(root)
+    metrics = None
+    if metrics_port is not None:
+        from perfect_prompts.infrastructure.metrics.endpoint import MetricsEndpoint
+
+        metrics = MetricsEndpoint(index.metrics.render, port=metrics_port)
     return LibraryController(
         root=root,
         search=SearchLibrary(index),
@@ -34,6 +43,10 @@ def build_container(root: Path, dispatch: Callable[[Callable[[], None]], None])
         preview=PreviewArtifact(index),
         status=GetIndexStatus(index),
         export=ExportQuery(index),
+        explain=ExplainQuery(index),
         runner=ThreadPoolTaskRunner(max_workers=2),
         dispatch=dispatch,
+        watcher=LibraryWatcher(index),
+        metrics=metrics,
+        on_close=index.write_metrics,
     )
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 
 
@@ -32,12 +32,78 @@ class SearchHit:
     rank: float
 
 
+@dataclass(frozen=True, slots=True)
+class SearchPage:
+    hits: tuple[SearchHit, ...]
+    cursor: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class QueryExplanation:
+    query: str
+    match_mode: str
+    terms: tuple[str, ...]
+    phrases: tuple[str, ...]
+    fts_expression: str
+    shards: tuple[str, ...] = ()
+    phrase_filter: str = "none"
+    phrase_expression: str = ""
+    node_filters: tuple[str, ...] = ()
+    node_rows: int | None = None
+    rowid_span: tuple[int, int] | None = None
+    match_rows: int = 0
+    filtered_rows: int = 0
+    hits: int = 0
+    plans: dict[str, tuple[str, ...]] = field(default_factory=dict)
+    timings_ms: dict[str, float] = field(default_factory=dict)
+
+
 @dataclass(frozen=True, slots=True)
 class BatchQueryResult:
     query: str
     hits: tuple[SearchHit, ...]
     export_path: str = ""
     error: str = ""
+    position: int = 0
+
+
+@dataclass(frozen=True, slots=True)
+class BatchQueryReport:
+    results: tuple[BatchQueryResult, ...]
+    workers: int = 1
+    duration_ms: float = 0.0
+    queries_per_second: float = 0.0
+
+
+@dataclass(frozen=True, slots=True)
+class PhaseTiming:
+    wall_ms: float
+    cpu_ms: float
+    calls: int
+
+
+@dataclass(frozen=True, slots=True)
+class ExtractorTiming:
+    files: int
+    cached: int
+    errors: int
+    bytes: int
+    duration_ms: float
+
+
+@dataclass(frozen=True, slots=True)
+class SlowFile:
+    path: str
+    extractor: str
+    duration_ms: float
+    bytes: int
+
+
+@dataclass(frozen=True, slots=True)
+class IndexProfile:
+    phases: dict[str, PhaseTiming]
+    extractors: dict[str, ExtractorTiming]
+    slowest_files: tuple[SlowFile, ...] = ()
 
 
 @dataclass(frozen=True, slots=True)
@@ -50,6 +116,10 @@ class IndexReport:
     added: int = 0
     updated: int = 0
     removed: int = 0
+    touched: int = 0
+    duration_ms: float = 0.0
+    rows_per_second: float = 0.0
+    profile: IndexProfile | None = None
 
 
 @dataclass(frozen=True, slots=True)
@@ -2,24 +2,41 @@
 
 from __future__ import annotations
 
-from collections.abc import Callable
+from collections.abc import Callable, Iterable, Iterator, Sequence
 from typing import Protocol
 
 from perfect_prompts.contracts.dto import (
     AddArtifactReceipt,
     AddArtifactRequest,
     IndexReport,
+    QueryExplanation,
     RemoveArtifactReceipt,
     RemoveArtifactRequest,
     SearchHit,
+    SearchPage,
     SearchRequest,
 )
 
 
 class SearchIndexPort(Protocol):
-    def search(self, request: SearchRequest) -> tuple[SearchHit, ...]: ...
-    def rebuild(self, cancelled: Callable[[], bool] | None = None) -> IndexReport: ...
-    def sync(self, cancelled: Callable[[], bool] | None = None) -> IndexReport: ...
+    def search(self, request: SearchRequest, cancelled: Callable[[], bool] | None = None) -> tuple[SearchHit, ...]: ...
+    def search_page(
+        self, request: SearchRequest, cursor: str | None = None, cancelled: Callable[[], bool] | None = None,
+    ) -> SearchPage: ...
+    def search_iter(self, request: SearchRequest, *, batch_size: int = 200) -> Iterator[SearchHit]: ...
+    def explain(self, request: SearchRequest) -> QueryExplanation: ...
+    def rebuild(
+        self,
+        cancelled: Callable[[], bool] | None = None,
+        *,
+        workers: int = 1,
+        prefix_lengths: Sequence[int] | None = None,
+        profile: bool = False,
+    ) -> IndexReport: ...
+    def sync(
+        self, cancelled: Callable[[], bool] | None = None, *, full: bool = False, profile: bool = False,
+    ) -> IndexReport: ...
+    def apply_changes(self, paths: Iterable[str], cancelled: Callable[[], bool] | None = None) -> IndexReport: ...
     def read_content(self, relative_path: str) -> str: ...
     def status(self) -> dict[str, object]: ...
     def export_query(self, request: SearchRequest, hits: tuple[SearchHit, ...]) -> str: ...
@@ -45,6 +62,23 @@ class TaskHandlePort(Protocol):
     def cancel(self) -> None: ...
 
 
+class LibraryWatcherPort(Protocol):
+    backend: str
+
+    def start(
+        self,
+        on_report: Callable[[IndexReport], None],
+        on_error: Callable[[BaseException], None] | None = None,
+    ) -> str: ...
+    def stop(self, timeout: float | None = 5.0) -> None: ...
+
+
+class MetricsEndpointPort(Protocol):
+    @property
+    def address(self) -> str: ...
+    def close(self) -> None: ...
+
+
 class TaskRunnerPort(Protocol):
     def submit(
         self,
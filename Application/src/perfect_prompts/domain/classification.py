@@ -59,6 +59,56 @@ LIBRARY_ROOT_DIRECTORIES = frozenset({
 })
 
 
+@dataclass(frozen=True, slots=True)
+class RootFacets:
+    areas: frozenset[str]
+    artifact_types: frozenset[str]
+    source_scope: str = "project"
+
+
+# Every facet value `classify_relative_path` can assign below each library root. Runtime
+# comes from deeper path parts and file suffixes, so it never rules a root out.
+LIBRARY_ROOT_FACETS = {
+    "Agent_Instructions": RootFacets(frozenset({"Agent Instructions"}), frozenset({"agent_instruction"})),
+    "Guidelines": RootFacets(frozenset({"Guidelines"}), frozenset({"reference"})),
+    "Methodologies": RootFacets(frozenset({"Methodologies"}), frozenset({"agent_instruction", "methodology"})),
+    "Personas": RootFacets(frozenset({"Personas"}), frozenset({"persona"})),
+    "Prompts": RootFacets(
+        frozenset({"Prompt Templates", "Prompt Implementations", "Context Builders"}),
+        frozenset({
+            "prompt_template", "agent_prompt", "summary_prompt", "context_builder", "education_prompt", "prompt",
+            "example",
+        }),
+    ),
+    "Rules": RootFacets(frozenset({"Rules"}), frozenset({"ruleset"})),
+    "Skills": RootFacets(frozenset({"Skills"}), frozenset({"skill"})),
+    "Standards": RootFacets(frozenset({"Standards"}), frozenset({"standard"})),
+    "External_References": RootFacets(
+        frozenset({"External References"}), frozenset({"reference"}), "external_reference",
+    ),
+}
+
+
+def library_roots_matching(
+    area: str | None = None, artifact_type: str | None = None, source_scope: str | None = None,
+    path_prefix: str | None = None,
+) -> frozenset[str]:
+    """Library roots that can hold a node with these facets below ``path_prefix``.
+
+    ``path_prefix`` is a plain string prefix of the root-relative path, as in
+    `SearchRequest`: ``"P"`` admits both ``Personas`` and ``Prompts``.
+    """
+    prefix = (path_prefix or "").replace("\\", "/").strip("/")
+    top, separator, _ = prefix.partition("/")
+    return frozenset(
+        root for root, facets in LIBRARY_ROOT_FACETS.items()
+        if (not area or area in facets.areas)
+        and (not artifact_type or artifact_type in facets.artifact_types)
+        and (not source_scope or source_scope == facets.source_scope)
+        and (root == top if separator else root.startswith(top))
+    )
+
+
 def is_library_relative_path(relative_path: str) -> bool:
     """Return whether a repository-relative path belongs to the library corpus."""
     normalized = relative_path.replace("\\", "/").strip("/")
@@ -0,0 +1,57 @@
+"""Optional localhost OpenMetrics endpoint for the GUI and `watch`.
+
+Serves ``GET /metrics`` from a daemon thread with the standard library's HTTP
+server, bound to the loopback interface only. `serve` does not need this: its
+query server answers ``GET /metrics`` itself.
+"""
+
+from __future__ import annotations
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+
+from perfect_prompts.infrastructure.metrics.registry import OPENMETRICS_CONTENT_TYPE
+
+DEFAULT_HOST = "127.0.0.1"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    server_version = "PerfectPromptsMetrics"
+
+    def do_GET(self) -> None:
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        data = self.server.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", OPENMETRICS_CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+class MetricsEndpoint:
+    """``http://127.0.0.1:<port>/metrics``; ``port=0`` picks a free port, see `address`."""
+
+    def __init__(self, render: Callable[[], str], *, port: int, host: str = DEFAULT_HOST) -> None:
+        self._server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        self._server.daemon_threads = True
+        self._server.render = render
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="perfect-prompts-metrics", daemon=True,
+        )
+        self._thread.start()
+
+    @property
+    def address(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"{host}:{port}"
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
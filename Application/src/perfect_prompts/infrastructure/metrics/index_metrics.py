@@ -0,0 +1,73 @@
+"""The Prompt Beacon metric families kept by every `PromptBeaconIndex`."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Callable
+
+from perfect_prompts.contracts.dto import IndexReport
+from perfect_prompts.infrastructure.metrics.registry import DURATION_BUCKETS, MetricsRegistry
+
+METRICS_FILE_NAME = "metrics.prom"
+
+
+class IndexMetrics:
+    """``database_path`` and ``cache_path`` may be tuples, for a sharded index; their sizes are summed."""
+
+    def __init__(
+        self, database_path: Path | tuple[Path, ...], cache_path: Path | tuple[Path, ...],
+        result_cache_hits: Callable[[], int],
+    ) -> None:
+        self.registry = registry = MetricsRegistry()
+        self.queries = registry.counter(
+            "perfect_prompts_queries", "Searches answered, by ParsedSearchQuery.match_mode.", ("match_mode",),
+        )
+        self.query_seconds = registry.histogram(
+            "perfect_prompts_query_duration_seconds", "Search latency, including result-cache hits.",
+            ("match_mode",), unit="seconds",
+        )
+        self.interrupted = registry.counter(
+            "perfect_prompts_queries_interrupted", "Searches stopped by cancellation or a timeout.", ("match_mode",),
+        )
+        registry.counter(
+            "perfect_prompts_result_cache_hits", "Searches answered from the per-generation result cache.",
+            function=result_cache_hits,
+        )
+        self.updates = registry.histogram(
+            "perfect_prompts_index_update_duration_seconds", "Rebuild, sync and watcher update durations.",
+            ("operation",), unit="seconds", buckets=DURATION_BUCKETS,
+        )
+        self.extraction_errors = registry.counter(
+            "perfect_prompts_extraction_errors", "Files that could not be read or extracted during index updates.",
+        )
+        self.nodes = registry.gauge("perfect_prompts_index_nodes", "Nodes in the index after the last update.")
+        registry.gauge(
+            "perfect_prompts_database_size_bytes", "Size of the index database file.", unit="bytes",
+            function=lambda: _file_size(database_path),
+        )
+        registry.gauge(
+            "perfect_prompts_extraction_cache_size_bytes", "Size of the extraction cache database file.", unit="bytes",
+            function=lambda: _file_size(cache_path),
+        )
+
+    def observe_query(self, match_mode: str, seconds: float) -> None:
+        self.queries.inc(match_mode=match_mode)
+        self.query_seconds.observe(seconds, match_mode=match_mode)
+
+    def observe_update(self, operation: str, report: IndexReport) -> None:
+        self.updates.observe(report.duration_ms / 1000, operation=operation)
+        self.extraction_errors.inc(report.errors)
+        self.nodes.set(report.nodes)
+
+    def render(self) -> str:
+        return self.registry.render()
+
+
+def _file_size(paths: Path | tuple[Path, ...]) -> int | None:
+    sizes = []
+    for path in (paths,) if isinstance(paths, Path) else paths:
+        try:
+            sizes.append(path.stat().st_size)
+        except OSError:
+            pass
+    return sum(sizes) if sizes else None
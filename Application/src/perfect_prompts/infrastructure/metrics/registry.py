@@ -0,0 +1,198 @@
+"""In-process counters, gauges and histograms rendered as OpenMetrics text.
+
+A deliberately small subset of the OpenMetrics exposition format, written with
+the standard library only: counter, gauge and histogram families with fixed
+label names. Every family is thread-safe; the query path pays one lock and a
+bisect per observation. A family built with ``function`` is read when the
+registry renders instead of being updated, which suits values that already
+live elsewhere (a file size, the result cache's hit count).
+"""
+
+from __future__ import annotations
+
+import bisect
+import math
+import os
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Callable
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+# Seconds; spans a result-cache hit through a slow unselective query on a large library.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+DURATION_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+
+class _Family(ABC):
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...], unit: str) -> None:
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.unit = unit
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name} takes labels {', '.join(self.labels) or '(none)'}")
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def header(self) -> list[str]:
+        lines = [f"# TYPE {self.name} {self.kind}"]
+        if self.unit:
+            lines.append(f"# UNIT {self.name} {self.unit}")
+        lines.append(f"# HELP {self.name} {_escape(self.help)}")
+        return lines
+
+    @abstractmethod
+    def samples(self) -> list[str]:
+        """The family's sample lines, without the header."""
+
+    def _labels(self, values: tuple[str, ...], extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labels, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter(_Family):
+    kind = "counter"
+
+    def __init__(self, name, help, labels=(), unit="", function: Callable[[], float] | None = None) -> None:
+        super().__init__(name, help, labels, unit)
+        self._values: dict[tuple[str, ...], float] = {}
+        self._function = function
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        if amount < 0:
+            raise ValueError("Counters only go up")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> list[str]:
+        if self._function is not None:
+            return [f"{self.name}_total {_number(self._function())}"]
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}_total{self._labels(key)} {_number(value)}" for key, value in values]
+
+
+class Gauge(_Family):
+    kind = "gauge"
+
+    def __init__(self, name, help, labels=(), unit="", function: Callable[[], float | None] | None = None) -> None:
+        super().__init__(name, help, labels, unit)
+        self._values: dict[tuple[str, ...], float] = {}
+        self._function = function
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def samples(self) -> list[str]:
+        if self._function is not None:
+            value = self._function()
+            return [] if value is None else [f"{self.name} {_number(value)}"]
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{self._labels(key)} {_number(value)}" for key, value in values]
+
+
+class Histogram(_Family):
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), unit="", buckets: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        super().__init__(name, help, labels, unit)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: a count per bucket (the last one is +Inf), then the sum.
+        self._values: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [0] * (len(self.buckets) + 2)
+            counts[position] += 1
+            counts[-1] += value
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            counts = self._values.get(self._key(labels))
+            return int(sum(counts[:-1])) if counts else 0
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            values = sorted((key, list(counts)) for key, counts in self._values.items())
+        lines = []
+        for key, counts in values:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts[:-1]):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{self._labels(key, f"le={_bound(bound)}")} {cumulative}')
+            lines.append(f"{self.name}_count{self._labels(key)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(key)} {_number(counts[-1])}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._families: dict[str, _Family] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help: str, labels: tuple[str, ...] = (), **options) -> Counter:
+        return self._register(Counter(name, help, labels, **options))
+
+    def gauge(self, name: str, help: str, labels: tuple[str, ...] = (), **options) -> Gauge:
+        return self._register(Gauge(name, help, labels, **options))
+
+    def histogram(self, name: str, help: str, labels: tuple[str, ...] = (), **options) -> Histogram:
+        return self._register(Histogram(name, help, labels, **options))
+
+    def _register(self, family):
+        with self._lock:
+            if family.name in self._families:
+                raise ValueError(f"Metric {family.name} is already registered")
+            self._families[family.name] = family
+        return family
+
+    def render(self) -> str:
+        """The whole registry in OpenMetrics text format, ending with ``# EOF``."""
+        with self._lock:
+            families = list(self._families.values())
+        lines: list[str] = []
+        for family in families:
+            lines += family.header()
+            lines += family.samples()
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: Path) -> None:
+        """Replace ``path`` atomically, so a scraper never reads a half-written file."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        temporary.write_text(self.render(), encoding="utf-8")
+        os.replace(temporary, path)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if isinstance(value, float) and not value.is_integer():
+        return repr(value)
+    return str(int(value))
+
+
+def _bound(bound: float) -> str:
+    return '"+Inf"' if math.isinf(bound) else f'"{bound}"'
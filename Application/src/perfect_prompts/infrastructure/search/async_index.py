@@ -0,0 +1,90 @@
+"""Asyncio facade over `PromptBeaconIndex` for agent services.
+
+SQLite calls block, so every query runs on a dedicated thread pool whose size
+is the concurrency limit; each worker thread keeps its own pooled read-only
+handle. Timeouts and task cancellation reach the running statement through
+the ``cancelled`` callback that `PromptBeaconIndex.search` polls from SQLite's
+progress handler. An abandoned query keeps its worker until that check stops
+it, so the limit also holds for queries nobody is waiting on any more.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, TypeVar
+
+from perfect_prompts.contracts.dto import SearchHit, SearchPage, SearchRequest
+from perfect_prompts.infrastructure.search.prompt_beacon import PromptBeaconIndex, QueryInterrupted
+
+T = TypeVar("T")
+DEFAULT_MAX_CONCURRENCY = 4
+
+
+class AsyncPromptBeaconIndex:
+    def __init__(
+        self,
+        index: PromptBeaconIndex,
+        *,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        timeout: float | None = None,
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be a positive integer")
+        self.index = index
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="perfect-prompts-search")
+
+    async def search(self, request: SearchRequest, *, timeout: float | None = None) -> tuple[SearchHit, ...]:
+        """Run `PromptBeaconIndex.search` off the event loop; raises `TimeoutError` past ``timeout`` seconds."""
+        return await self._run(lambda cancelled: self.index.search(request, cancelled=cancelled), timeout)
+
+    async def search_page(
+        self, request: SearchRequest, cursor: str | None = None, *, timeout: float | None = None,
+    ) -> SearchPage:
+        return await self._run(lambda cancelled: self.index.search_page(request, cursor, cancelled=cancelled), timeout)
+
+    async def batch(
+        self, requests: Iterable[SearchRequest], *, timeout: float | None = None,
+    ) -> list[tuple[SearchHit, ...]]:
+        """Run many searches concurrently, at most ``max_concurrency`` at a time, in request order."""
+        return list(await asyncio.gather(*(self.search(request, timeout=timeout) for request in requests)))
+
+    async def status(self) -> dict[str, object]:
+        return await self._run(lambda cancelled: self.index.status(), None)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def __aenter__(self) -> AsyncPromptBeaconIndex:
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.close()
+
+    async def _run(self, work: Callable[[Callable[[], bool]], T], timeout: float | None) -> T:
+        timeout = self.timeout if timeout is None else timeout
+        abandoned = threading.Event()
+        deadline: list[float | None] = [None]
+
+        def cancelled() -> bool:
+            return abandoned.is_set() or (deadline[0] is not None and time.monotonic() >= deadline[0])
+
+        def call() -> T:
+            # The clock starts when a worker picks the query up, not while it is queued.
+            deadline[0] = time.monotonic() + timeout if timeout is not None else None
+            return work(cancelled)
+
+        try:
+            return await asyncio.wrap_future(self._executor.submit(call))
+        except asyncio.CancelledError:
+            # A queued query is dropped by the executor; a running one stops at its next progress check.
+            abandoned.set()
+            raise
+        except QueryInterrupted:
+            if abandoned.is_set():
+                raise
+            raise TimeoutError(f"Search exceeded its {timeout} s timeout") from None
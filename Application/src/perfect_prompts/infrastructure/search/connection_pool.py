@@ -0,0 +1,113 @@
+"""Thread-local, read-only SQLite handles for the Prompt Beacon query path.
+
+Opening a connection, registering functions and warming SQLite's page cache
+cost more than a typical FTS5 query, so each thread keeps one read-only handle
+per index. Handles follow the database file's identity: when `rebuild()` swaps
+a new file in with `os.replace`, the next query on every thread reopens
+against it. The writer closes in-process handles before the swap so no reader
+keeps the old file (or its WAL) alive.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import weakref
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator
+
+DEFAULT_MMAP_BYTES = 256 * 1024 * 1024
+
+
+class _Slot:
+    __slots__ = ("connection", "identity", "epoch", "lock", "__weakref__")
+
+    def __init__(self) -> None:
+        self.connection: sqlite3.Connection | None = None
+        self.identity: tuple[int, int] | None = None
+        self.epoch = -1
+        self.lock = threading.RLock()
+
+    def close(self) -> None:
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+class ReadConnectionPool:
+    def __init__(
+        self,
+        db_path: Path,
+        *,
+        mmap_bytes: int = DEFAULT_MMAP_BYTES,
+        on_open: Callable[[sqlite3.Connection], None] | None = None,
+        timeout: float = 15,
+    ) -> None:
+        self.db_path = Path(db_path)
+        self.mmap_bytes = mmap_bytes
+        self.timeout = timeout
+        self._on_open = on_open
+        self._local = threading.local()
+        self._slots: weakref.WeakSet[_Slot] = weakref.WeakSet()
+        self._slots_lock = threading.Lock()
+        self._epoch = 0
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """Yield this thread's read-only connection, reopening it if the database file was replaced.
+
+        Raises ``FileNotFoundError`` when no index database exists.
+        """
+        stat = os.stat(self.db_path)
+        identity = (stat.st_dev, stat.st_ino)
+        slot = getattr(self._local, "slot", None)
+        if slot is None:
+            slot = self._local.slot = _Slot()
+            with self._slots_lock:
+                self._slots.add(slot)
+        with slot.lock:
+            if slot.connection is None or slot.identity != identity or slot.epoch != self._epoch:
+                slot.close()
+                slot.connection = self._open()
+                slot.identity, slot.epoch = identity, self._epoch
+            yield slot.connection
+
+    @contextmanager
+    def dedicated(self) -> Iterator[_Slot]:
+        """Yield a private handle for a long-lived read, such as a streamed result set.
+
+        Hold ``handle.lock`` while using ``handle.connection``. `close_all()` also closes
+        dedicated handles, leaving ``handle.connection`` as ``None``, so a rebuild never
+        waits on a reader that stopped consuming.
+        """
+        slot = _Slot()
+        slot.connection = self._open()
+        with self._slots_lock:
+            self._slots.add(slot)
+        try:
+            yield slot
+        finally:
+            with slot.lock:
+                slot.close()
+
+    def close_all(self) -> None:
+        """Close every thread's handle; threads reopen lazily on their next query."""
+        self._epoch += 1
+        with self._slots_lock:
+            slots = list(self._slots)
+        for slot in slots:
+            with slot.lock:
+                slot.close()
+
+    def _open(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(
+            f"{self.db_path.resolve().as_uri()}?mode=ro", uri=True, timeout=self.timeout, check_same_thread=False,
+        )
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA query_only=1")
+        connection.execute(f"PRAGMA mmap_size={int(self.mmap_bytes)}")
+        if self._on_open is not None:
+            self._on_open(connection)
+        return connection
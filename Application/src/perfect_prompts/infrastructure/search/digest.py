@@ -0,0 +1,17 @@
+"""Streaming content digests used to tell touched files from changed ones."""
+
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+
+DIGEST_CHUNK_BYTES = 1024 * 1024
+
+
+def file_digest(path: Path | str) -> str:
+    """Return the hex BLAKE2b-128 digest of a file without loading it whole."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as handle:
+        while chunk := handle.read(DIGEST_CHUNK_BYTES):
+            digest.update(chunk)
+    return digest.hexdigest()
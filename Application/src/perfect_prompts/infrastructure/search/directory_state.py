@@ -0,0 +1,67 @@
+"""Per-directory state that lets incremental sync skip unchanged directories.
+
+A directory's mtime changes whenever an entry is created, removed or renamed
+inside it (including editors' write-to-temp-then-rename saves), but not when an
+existing file is rewritten in place. Pruned sync therefore re-lists and
+re-stats only directories whose mtime moved; in-place rewrites inside an
+untouched directory are picked up by a full sync or the watcher.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from stat import S_ISDIR
+
+from perfect_prompts.infrastructure.search.walker import WalkEntry
+
+# Timestamps this close to when the state was recorded cannot prove anything on
+# coarse-grained filesystems (FAT has 2 s resolution), so such directories are
+# always re-listed on the next sync.
+RACY_WINDOW_NS = 2_000_000_000
+
+
+@dataclass(frozen=True, slots=True)
+class DirectoryState:
+    path: str
+    mtime_ns: int
+    names_digest: str
+
+
+def names_digest(entries: list[WalkEntry]) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for entry in entries:
+        digest.update(f"{entry.kind}\0{entry.name}\n".encode("utf-8", errors="surrogateescape"))
+    return digest.hexdigest()
+
+
+def directory_mtime_ns(root: Path, relative: str) -> int:
+    """Return a directory's own mtime; raises `OSError` when it is gone or not a directory."""
+    stat = os.lstat(root / relative) if relative else os.stat(root)
+    if not S_ISDIR(stat.st_mode):
+        raise NotADirectoryError(relative)
+    return stat.st_mtime_ns
+
+
+@dataclass(slots=True)
+class DirectoryStateRecorder:
+    """`walk_library` observer collecting one `DirectoryState` per listed directory.
+
+    A directory's mtime is taken from its own entry in the parent listing, i.e.
+    before the directory itself is read, so a concurrent change always leaves a
+    newer mtime behind for the next sync to notice.
+    """
+
+    mtimes: dict[str, int] = field(default_factory=dict)
+    states: list[DirectoryState] = field(default_factory=list)
+
+    def __call__(self, relative: str, entries: list[WalkEntry]) -> None:
+        mtime_ns = self.mtimes.pop(relative, None)
+        if mtime_ns is not None:
+            self.states.append(DirectoryState(relative, mtime_ns, names_digest(entries)))
+        for entry in entries:
+            if entry.kind == "directory" and not entry.error:
+                self.mtimes[entry.relative] = entry.mtime_ns
+
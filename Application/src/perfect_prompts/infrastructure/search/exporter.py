@@ -1,17 +1,34 @@
-"""Portable JSON exports for single and batched Prompt Beacon queries."""
+"""Portable JSON exports for single and batched Prompt Beacon queries.
+
+A single query is written as one indented ``query.v1`` JSON document. A batch
+is written as one append-only ``batch.v1`` JSON Lines file, optionally
+gzip-compressed: a header line carrying the ``batch_execution_id``, then one
+compact record per query, appended as each query completes. Records are in
+completion order and carry their ``position``.
+"""
 
 from __future__ import annotations
 
+import gzip
 import json
+import threading
 import time
 import uuid
 from dataclasses import asdict
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import IO, Iterator
 
 from perfect_prompts.contracts.dto import SearchHit, SearchRequest
 
 
+QUERY_SCHEMA = "perfect-prompts.prompt-beacon.query.v1"
+BATCH_SCHEMA = "perfect-prompts.prompt-beacon.batch.v1"
+BATCH_FORMATS = ("jsonl", "jsonl.gz", "json")
+# gzip.open defaults to level 9, which made compression the bottleneck of a large batch.
+EXPORT_COMPRESSION_LEVEL = 6
+
+
 class SearchResultsExporter:
     def __init__(self, root: Path):
         self.root = root
@@ -26,7 +43,7 @@ class SearchResultsExporter:
         batch: dict[str, object] | None = None,
     ) -> dict[str, object]:
         return {
-            "schema": "perfect-prompts.prompt-beacon.query.v1",
+            "schema": QUERY_SCHEMA,
             "captured_at": _utc_now(),
             "root": str(self.root),
             "query": {
@@ -53,6 +70,20 @@ class SearchResultsExporter:
         target.write_text(json.dumps(captured, indent=2, ensure_ascii=False), encoding="utf-8")
         return target
 
+    def open_batch(self, batch_id: str, query_count: int, *, compressed: bool = False) -> BatchExportWriter:
+        """Start a consolidated export for one batch; append each query's capture, then ``close()``."""
+        self.export_directory.mkdir(parents=True, exist_ok=True)
+        target = self.export_directory / f"{batch_id}.jsonl{'.gz' if compressed else ''}"
+        header = {
+            "schema": BATCH_SCHEMA,
+            "record": "header",
+            "batch_execution_id": batch_id,
+            "captured_at": _utc_now(),
+            "root": str(self.root),
+            "query_count": query_count,
+        }
+        return BatchExportWriter(target, header)
+
     def timed_capture(self, index, request: SearchRequest) -> tuple[tuple[SearchHit, ...], dict[str, object]]:
         started = time.perf_counter()
         hits = index.search(request)
@@ -60,6 +91,59 @@ class SearchResultsExporter:
         return hits, self.capture(request, hits, search_duration_ms=elapsed)
 
 
+class BatchExportWriter:
+    """Append-only JSON Lines sink for one batch; safe to share between threads."""
+
+    def __init__(self, path: Path, header: dict[str, object]):
+        self.path = path
+        self._lock = threading.Lock()
+        self._compressed = path.suffix == ".gz"
+        self._stream: IO[str] = (
+            gzip.open(path, "xt", compresslevel=EXPORT_COMPRESSION_LEVEL, encoding="utf-8")
+            if self._compressed else path.open("x", encoding="utf-8")
+        )
+        self._write_line(header)
+
+    def append(self, captured: dict[str, object]) -> Path:
+        """Append one query's capture, dropping the fields the header already carries."""
+        batch = captured.get("batch") or {}
+        record = {"record": "query", "position": batch.get("position")}
+        record.update((key, value) for key, value in captured.items() if key not in {"schema", "root", "batch"})
+        with self._lock:
+            self._write_line(record)
+        return self.path
+
+    def append_failure(self, position: int, query: str, error: str) -> None:
+        with self._lock:
+            self._write_line({"record": "query", "position": position, "query": {"text": query}, "error": error})
+
+    def close(self) -> None:
+        with self._lock:
+            self._stream.close()
+
+    def __enter__(self) -> BatchExportWriter:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _write_line(self, record: dict[str, object]) -> None:
+        self._stream.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+        # A plain file can be followed while the batch runs; flushing gzip per record would defeat compression.
+        if not self._compressed:
+            self._stream.flush()
+
+
+def read_batch_export(path: Path | str) -> Iterator[dict[str, object]]:
+    """Yield the header and then every query record of a ``batch.v1`` export."""
+    path = Path(path)
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8") as stream:
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+
+
 def _identifier() -> str:
     stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
     return f"{stamp}_{uuid.uuid4().hex[:10]}"
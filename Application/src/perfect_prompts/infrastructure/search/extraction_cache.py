@@ -0,0 +1,150 @@
+"""Content-addressed store of extracted document bodies under `.perfect-prompts/`.
+
+Entries are keyed by the file's BLAKE2b digest, the extractor its suffix selects
+(the same bytes saved as .docx and .zip extract differently) and the extractor
+signature, so a rebuild (which always starts from an empty index database) or a
+sync of an unchanged document only hashes it. Bodies are zlib-compressed; once
+the store exceeds its byte budget the least recently used entries are evicted.
+
+Only the process that owns the index writes. Extraction workers open the store
+read-only and report hits back, and the writer records their use and stores
+misses in batched transactions.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+
+from perfect_prompts.infrastructure.search.extractors import DOCUMENT_EXTENSIONS, extractor_name, extractor_signature
+
+CACHE_FILE_NAME = "extraction-cache.sqlite3"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# Evict down to this share of the budget so a full cache is not trimmed on every run.
+EVICT_TO_FRACTION = 0.9
+_COMMIT_EVERY = 256
+
+
+def cacheable(path: Path | str) -> bool:
+    return Path(path).suffix.casefold() in DOCUMENT_EXTENSIONS
+
+
+class ExtractionCache:
+    def __init__(self, path: Path, *, max_bytes: int = DEFAULT_MAX_BYTES, readonly: bool = False):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.readonly = readonly
+        self.signature = extractor_signature()
+        self._used: set[tuple[str, str]] = set()
+        self._pending_writes = 0
+        if readonly:
+            self._connection = sqlite3.connect(f"{self.path.as_uri()}?mode=ro", uri=True, timeout=30, check_same_thread=False)
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            columns = {row[1] for row in self._connection.execute("PRAGMA table_info(entries)")}
+            if columns and "extractor" not in columns:
+                # Stores from before entries were keyed by extractor: the bodies are only a cache.
+                self._connection.execute("DROP TABLE entries")
+            self._connection.executescript("""
+                CREATE TABLE IF NOT EXISTS entries(
+                    digest TEXT NOT NULL,
+                    extractor TEXT NOT NULL,
+                    signature TEXT NOT NULL,
+                    body BLOB NOT NULL,
+                    content_indexed INTEGER NOT NULL,
+                    bytes INTEGER NOT NULL,
+                    used_at INTEGER NOT NULL,
+                    PRIMARY KEY(digest, extractor, signature)
+                );
+                CREATE INDEX IF NOT EXISTS entries_used_at ON entries(used_at);
+            """)
+
+    def get(self, digest: str, extractor: str) -> tuple[str, int] | None:
+        """Return the cached ``(body, content_indexed)`` for a digest read by ``extractor``, or ``None``."""
+        if not digest:
+            return None
+        try:
+            row = self._connection.execute(
+                "SELECT body,content_indexed FROM entries WHERE digest=? AND extractor=? AND signature=?",
+                (digest, extractor, self.signature),
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        try:
+            body = zlib.decompress(row[0]).decode("utf-8")
+        except (zlib.error, UnicodeDecodeError):
+            return None
+        if not self.readonly:
+            self._used.add((digest, extractor))
+        return body, int(row[1])
+
+    def record(self, path: Path | str, extraction) -> None:
+        """Account for one extraction: mark a hit as used, store a clean miss of a document format."""
+        digest = extraction.digest
+        if self.readonly or not digest:
+            return
+        extractor = extractor_name(path)
+        if extraction.cached:
+            self._used.add((digest, extractor))
+            return
+        if extraction.error or not cacheable(path):
+            return
+        blob = zlib.compress(extraction.body.encode("utf-8"))
+        self._connection.execute(
+            """
+            INSERT OR REPLACE INTO entries(digest,extractor,signature,body,content_indexed,bytes,used_at)
+            VALUES (?,?,?,?,?,?,?)
+            """,
+            (digest, extractor, self.signature, blob, extraction.content_indexed, len(blob), time.time_ns()),
+        )
+        self._pending_writes += 1
+        if self._pending_writes >= _COMMIT_EVERY:
+            self._connection.commit()
+            self._pending_writes = 0
+
+    def size_bytes(self) -> int:
+        row = self._connection.execute("SELECT COALESCE(SUM(bytes),0) FROM entries").fetchone()
+        return int(row[0])
+
+    def evict(self) -> int:
+        """Drop least recently used entries until the store fits its budget; returns entries removed."""
+        total = self.size_bytes()
+        if total <= self.max_bytes:
+            return 0
+        target = int(self.max_bytes * EVICT_TO_FRACTION)
+        doomed: list[int] = []
+        for rowid, size in self._connection.execute("SELECT rowid,bytes FROM entries ORDER BY used_at"):
+            if total <= target:
+                break
+            doomed.append(rowid)
+            total -= size
+        self._connection.executemany("DELETE FROM entries WHERE rowid=?", ((rowid,) for rowid in doomed))
+        return len(doomed)
+
+    def close(self) -> None:
+        """Persist usage stamps and new entries, evict past the budget and release the store."""
+        try:
+            if not self.readonly:
+                now = time.time_ns()
+                self._connection.executemany(
+                    "UPDATE entries SET used_at=? WHERE digest=? AND extractor=? AND signature=?",
+                    ((now, digest, extractor, self.signature) for digest, extractor in self._used),
+                )
+                self._used.clear()
+                self.evict()
+                self._connection.commit()
+        finally:
+            self._connection.close()
+
+    def __enter__(self) -> ExtractionCache:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
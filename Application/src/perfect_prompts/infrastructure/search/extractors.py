@@ -1,12 +1,13 @@
 from __future__ import annotations
 
-import html
+import importlib.util
 import json
-import logging
 import re
-import zipfile
 from pathlib import Path
-from xml.etree import ElementTree
+from typing import Callable
+
+# zipfile, xml.etree, html and logging are imported by the readers that need them:
+# the query path imports this module for its constants but never extracts.
 
 TEXT_EXTENSIONS = {
     ".c", ".cc", ".cfg", ".conf", ".cpp", ".cs", ".css", ".csv", ".go",
@@ -15,26 +16,31 @@ TEXT_EXTENSIONS = {
     ".sh", ".sql", ".tex", ".toml", ".ts", ".tsv", ".tsx", ".txt",
     ".xml", ".yaml", ".yml",
 }
+# Formats whose extraction costs far more than reading the bytes; their bodies are
+# kept in the persistent extraction cache. Bump EXTRACTOR_VERSION whenever any
+# extractor's output changes so cached bodies from older code are never reused.
+DOCUMENT_EXTENSIONS = frozenset({".ipynb", ".pdf", ".docx", ".pptx", ".xlsx", ".odt", ".ods", ".odp", ".zip", ".skill"})
+EXTRACTOR_VERSION = 1
 MAX_TEXT_BYTES = 10 * 1024 * 1024
 MAX_ZIP_MEMBER_BYTES = 2 * 1024 * 1024
 MAX_ZIP_TOTAL_BYTES = 8 * 1024 * 1024
 
 
 def extract_searchable_text(path: Path) -> str:
-    suffix = path.suffix.casefold()
-    if suffix in TEXT_EXTENSIONS:
-        return _read_bounded_text(path)
-    if suffix == ".ipynb":
-        return _read_notebook(path)
-    if suffix == ".pdf":
-        return _read_pdf(path)
-    if suffix in {".docx", ".pptx", ".xlsx"}:
-        return _read_openxml(path, suffix)
-    if suffix in {".odt", ".ods", ".odp"}:
-        return _read_odf(path)
-    if suffix in {".zip", ".skill"}:
-        return _read_zip(path)
-    return ""
+    extractor = _EXTRACTORS.get(path.suffix.casefold())
+    return extractor[1](path) if extractor else ""
+
+
+def extractor_name(path: Path | str) -> str:
+    """Name the reader `extract_searchable_text` uses for ``path``; empty when nothing is extracted."""
+    extractor = _EXTRACTORS.get(Path(path).suffix.casefold())
+    return extractor[0] if extractor else ""
+
+
+def extractor_signature() -> str:
+    """Identify the extractor output: its version plus optional readers that change what is extracted."""
+    pdf = "+pdf" if importlib.util.find_spec("pypdf") is not None else ""
+    return f"{EXTRACTOR_VERSION}{pdf}"
 
 
 def _read_bounded_text(path: Path) -> str:
@@ -67,6 +73,8 @@ def _read_notebook(path: Path) -> str:
 
 
 def _read_pdf(path: Path) -> str:
+    import logging
+
     try:
         from pypdf import PdfReader
     except ImportError:
@@ -84,7 +92,10 @@ def _read_pdf(path: Path) -> str:
     return "\n".join(pieces)
 
 
-def _read_openxml(path: Path, suffix: str) -> str:
+def _read_openxml(path: Path) -> str:
+    import zipfile
+
+    suffix = path.suffix.casefold()
     with zipfile.ZipFile(path) as archive:
         names = archive.namelist()
         if suffix == ".docx":
@@ -98,12 +109,17 @@ def _read_openxml(path: Path, suffix: str) -> str:
 
 
 def _read_odf(path: Path) -> str:
+    import zipfile
+
     with zipfile.ZipFile(path) as archive:
         pieces = [_xml_text(archive.read(name)) for name in ("content.xml", "styles.xml", "meta.xml") if name in archive.namelist()]
     return "\n".join(piece for piece in pieces if piece)
 
 
 def _xml_text(raw: bytes) -> str:
+    import html
+    from xml.etree import ElementTree
+
     try:
         root = ElementTree.fromstring(raw)
         text = " ".join(part.strip() for part in root.itertext() if part and part.strip())
@@ -114,6 +130,8 @@ def _xml_text(raw: bytes) -> str:
 
 
 def _read_zip(path: Path) -> str:
+    import zipfile
+
     pieces: list[str] = []
     consumed = 0
     try:
@@ -133,3 +151,14 @@ def _read_zip(path: Path) -> str:
             if b"\x00" not in raw[:8192]:
                 pieces.append(raw.decode("utf-8", errors="replace"))
     return "\n".join(pieces)
+
+
+# Suffix -> (name reported by `extractor_name`, reader used by `extract_searchable_text`).
+_EXTRACTORS: dict[str, tuple[str, Callable[[Path], str]]] = {
+    **{suffix: ("text", _read_bounded_text) for suffix in TEXT_EXTENSIONS},
+    ".ipynb": ("notebook", _read_notebook),
+    ".pdf": ("pdf", _read_pdf),
+    **{suffix: ("openxml", _read_openxml) for suffix in (".docx", ".pptx", ".xlsx")},
+    **{suffix: ("odf", _read_odf) for suffix in (".odt", ".ods", ".odp")},
+    **{suffix: ("zip", _read_zip) for suffix in (".zip", ".skill")},
+}
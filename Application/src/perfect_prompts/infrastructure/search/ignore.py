@@ -19,22 +19,27 @@ class IgnoreRule:
 
 
 class IgnoreMatcher:
-    def __init__(self, root: Path, ignore_file: Path | None = None):
+    def __init__(self, root: Path, ignore_file: Path | None = None, library_roots: frozenset[str] = LIBRARY_ROOT_DIRECTORIES):
         self.root = root.resolve()
         self.rules = self._load(ignore_file)
+        self.library_roots = library_roots
 
     def ignored(self, path: Path) -> bool:
-        relative = path.relative_to(self.root).as_posix()
-        if path.is_dir() and path.name in DEFAULT_IGNORED_DIRECTORIES:
+        return self.ignored_relative(path.relative_to(self.root).as_posix(), path.is_dir())
+
+    def ignored_relative(self, relative: str, is_dir: bool) -> bool:
+        """Decide from a root-relative POSIX path and known type, without touching the filesystem."""
+        parent, _, name = relative.rpartition("/")
+        if is_dir and name in DEFAULT_IGNORED_DIRECTORIES:
             return True
         # The search corpus is the library, not every file in the repository root.
         # Only designated library roots are admitted; README/install/version/app source
         # and other repository infrastructure stay outside the index.
-        if path.parent == self.root and path.name not in LIBRARY_ROOT_DIRECTORIES:
+        if not parent and name not in self.library_roots:
             return True
         ignored = False
         for rule in self.rules:
-            if self._matches(relative, path.is_dir(), rule.pattern):
+            if self._matches(relative, is_dir, rule.pattern):
                 ignored = not rule.negate
         return ignored
 
@@ -0,0 +1,169 @@
+"""Ordered content extraction for Prompt Beacon index builds.
+
+Extraction is CPU-bound (PDF, OpenXML, ODF, notebooks, zip members) while the
+SQLite writes must stay on one connection. The pipeline therefore fans file
+extraction out to a bounded process pool and hands results back to the single
+caller in exactly the order the walker produced them, so node ids and report
+counts are identical to a sequential build.
+
+When an `ExtractionCache` is supplied, every file is still hashed but document
+bodies already extracted under the same digest are read back instead of being
+parsed again. Workers only read the cache; the caller's process records hits
+and stores new bodies.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from collections import deque
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, NamedTuple, TypeVar
+
+from perfect_prompts.infrastructure.search.digest import file_digest
+from perfect_prompts.infrastructure.search.extraction_cache import ExtractionCache, cacheable
+from perfect_prompts.infrastructure.search.extractors import extract_searchable_text, extractor_name
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future, ProcessPoolExecutor
+    from multiprocessing.context import SpawnContext
+
+T = TypeVar("T")
+
+
+class Extraction(NamedTuple):
+    body: str
+    content_indexed: int
+    error: int
+    digest: str = ""
+    cached: bool = False
+    # Wall time of hashing plus extraction or cache lookup, measured where it ran.
+    seconds: float = 0.0
+
+
+NO_BODY = Extraction("", 0, 0)
+# Results held per worker before the writer must catch up; bounds memory to a
+# handful of extracted bodies per process while keeping every worker busy.
+WINDOW_PER_WORKER = 4
+# Read-only cache handles opened lazily inside spawned workers, keyed by cache path.
+_WORKER_CACHES: dict[str, ExtractionCache | None] = {}
+
+
+def extract_file(
+    path: Path | str, digest: str | None = None, cache: ExtractionCache | str | None = None,
+) -> Extraction:
+    """Extract one regular file, hashing its bytes unless ``digest`` is already known.
+
+    Callers pass paths the walker already classified as regular files, so no
+    type checks are repeated here. ``cache`` is an open cache or, inside a
+    worker process, the path of one to open read-only.
+    """
+    started = time.perf_counter()
+    extraction = _extract(Path(path), digest, cache)
+    return extraction._replace(seconds=time.perf_counter() - started)
+
+
+def _extract(path: Path, digest: str | None, cache: ExtractionCache | str | None) -> Extraction:
+    try:
+        digest = digest or file_digest(path)
+    except OSError:
+        return Extraction("", 0, 1)
+    if cache is not None and cacheable(path):
+        handle = _cache_handle(cache)
+        hit = handle.get(digest, extractor_name(path)) if handle is not None else None
+        if hit is not None:
+            return Extraction(hit[0], hit[1], 0, digest, True)
+    try:
+        body = extract_searchable_text(path)
+        return Extraction(body, int(bool(body)), 0, digest)
+    except Exception:
+        return Extraction("", 0, 1, digest)
+
+
+def resolve_worker_count(workers: int | None) -> int:
+    """Normalize a requested extraction worker count; ``0`` means one per CPU."""
+    if workers is None:
+        return 1
+    if workers < 0:
+        raise ValueError("Extraction workers must be zero (automatic) or a positive integer")
+    if workers == 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+def spawn_context() -> SpawnContext:
+    """The multiprocessing context every index worker pool uses.
+
+    Spawned workers avoid forking a process that may host Qt or other threads.
+    Imported lazily: sequential builds, sync and the query path never start a pool.
+    """
+    import multiprocessing
+
+    return multiprocessing.get_context("spawn")
+
+
+def process_pool(max_workers: int, **options) -> ProcessPoolExecutor:
+    """A process pool of ``max_workers`` spawned workers; ``options`` go to `ProcessPoolExecutor`."""
+    from concurrent.futures import ProcessPoolExecutor
+
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=spawn_context(), **options)
+
+
+def _cache_handle(cache: ExtractionCache | str) -> ExtractionCache | None:
+    if isinstance(cache, ExtractionCache):
+        return cache
+    if cache not in _WORKER_CACHES:
+        try:
+            _WORKER_CACHES[cache] = ExtractionCache(Path(cache), readonly=True)
+        except Exception:
+            _WORKER_CACHES[cache] = None
+    return _WORKER_CACHES[cache]
+
+
+class ExtractionPipeline:
+    def __init__(self, workers: int | None = 1, cache: ExtractionCache | None = None):
+        self.workers = resolve_worker_count(workers)
+        self.cache = cache
+
+    def map(self, items: Iterable[T], path_of: Callable[[T], Path | None]) -> Iterator[tuple[T, Extraction]]:
+        """Yield ``(item, extraction)`` in input order.
+
+        ``path_of`` returns the file to extract for an item, or ``None`` when the
+        item carries no body (directories, symlinks). Closing the iterator early,
+        e.g. on cancellation, abandons queued work without waiting for it.
+        """
+        if self.workers <= 1:
+            for item in items:
+                path = path_of(item)
+                yield item, self._recorded(path, extract_file(path, None, self.cache)) if path is not None else NO_BODY
+            return
+        executor = process_pool(self.workers)
+        window: deque[tuple[T, Path | None, Future | Extraction]] = deque()
+        limit = self.workers * WINDOW_PER_WORKER
+        cache_path = str(self.cache.path) if self.cache is not None else None
+        try:
+            for item in items:
+                path = path_of(item)
+                pending = executor.submit(extract_file, str(path), None, cache_path) if path is not None else NO_BODY
+                window.append((item, path, pending))
+                while len(window) >= limit:
+                    yield self._resolved(window.popleft())
+            while window:
+                yield self._resolved(window.popleft())
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _resolved(self, pending: tuple[T, Path | None, Future | Extraction]) -> tuple[T, Extraction]:
+        item, path, result = pending
+        if isinstance(result, Extraction):
+            return item, result
+        try:
+            return item, self._recorded(path, result.result())
+        except Exception:
+            # A crashed or killed worker is counted like any other extraction error.
+            return item, Extraction("", 0, 1)
+
+    def _recorded(self, path: Path, extraction: Extraction) -> Extraction:
+        if self.cache is not None:
+            self.cache.record(path, extraction)
+        return extraction
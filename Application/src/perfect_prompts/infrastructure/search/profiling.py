@@ -0,0 +1,173 @@
+"""Opt-in timing of index builds and syncs.
+
+`IndexProfiler` accumulates wall and CPU time per named phase. Phases nest,
+and a phase's figures exclude the phases opened inside it, so the totals add
+up instead of double counting. CPU time is the indexing thread's own
+(`time.thread_time`); with an extraction process pool, the ``extract`` phase
+is the time spent waiting on workers, while the per-extractor durations are
+the workers' own measurements. The profiler also keeps per-extractor counters
+and the slowest files.
+
+`DISABLED` hands out one shared no-op context manager and returns iterables
+and matchers unchanged. With profiling off, an instrumented code path costs
+one method call per phase.
+"""
+
+from __future__ import annotations
+
+import heapq
+import time
+from contextlib import nullcontext
+from typing import ContextManager, Iterable, Iterator, TypeVar
+
+from perfect_prompts.contracts.dto import ExtractorTiming, IndexProfile, PhaseTiming, SlowFile
+from perfect_prompts.infrastructure.search.extractors import extractor_name
+
+T = TypeVar("T")
+DEFAULT_SLOWEST_FILES = 10
+_IDLE = nullcontext()
+
+
+class IndexProfiler:
+    def __init__(self, enabled: bool = True, *, slowest_files: int = DEFAULT_SLOWEST_FILES):
+        self.enabled = enabled
+        self.slowest_files = slowest_files
+        self._phases: dict[str, list[float]] = {}
+        self._extractors: dict[str, list[float]] = {}
+        self._slowest: list[tuple[float, str, str, int]] = []
+        # Wall and CPU seconds spent in child phases of each open phase.
+        self._open: list[list[float]] = []
+
+    def phase(self, name: str) -> ContextManager[object]:
+        return _Phase(self, name) if self.enabled else _IDLE
+
+    def iterate(self, name: str, items: Iterable[T]) -> Iterator[T]:
+        """Charge the time spent producing each item of ``items`` to phase ``name``."""
+        if not self.enabled:
+            return iter(items)
+        return self._timed(name, iter(items))
+
+    def _timed(self, name: str, iterator: Iterator[T]) -> Iterator[T]:
+        while True:
+            with self.phase(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def matcher(self, matcher):
+        """Wrap an `IgnoreMatcher` so its checks are charged to the ``ignore`` phase."""
+        return _TimedMatcher(matcher, self) if self.enabled else matcher
+
+    def record_file(self, relative: str, extraction, size: int) -> None:
+        """Account for one extracted (or cache-served) file under its extractor."""
+        if not self.enabled:
+            return
+        extractor = extractor_name(relative) or "other"
+        counters = self._extractors.setdefault(extractor, [0, 0, 0, 0, 0.0])
+        counters[0] += 1
+        counters[1] += extraction.cached
+        counters[2] += extraction.error
+        counters[3] += size
+        counters[4] += extraction.seconds
+        item = (extraction.seconds, relative, extractor, size)
+        if len(self._slowest) < self.slowest_files:
+            heapq.heappush(self._slowest, item)
+        elif item > self._slowest[0]:
+            heapq.heapreplace(self._slowest, item)
+
+    def profile(self) -> IndexProfile | None:
+        if not self.enabled:
+            return None
+        return IndexProfile(
+            phases={
+                name: PhaseTiming(round(wall * 1000, 3), round(cpu * 1000, 3), int(calls))
+                for name, (wall, cpu, calls) in self._phases.items()
+            },
+            extractors={
+                name: ExtractorTiming(int(files), int(cached), int(errors), int(size), round(seconds * 1000, 3))
+                for name, (files, cached, errors, size, seconds) in sorted(self._extractors.items())
+            },
+            slowest_files=tuple(
+                SlowFile(relative, extractor, round(seconds * 1000, 3), size)
+                for seconds, relative, extractor, size in sorted(self._slowest, reverse=True)
+            ),
+        )
+
+
+DISABLED = IndexProfiler(enabled=False)
+
+
+class _Phase:
+    __slots__ = ("profiler", "name", "wall", "cpu")
+
+    def __init__(self, profiler: IndexProfiler, name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.profiler._open.append([0.0, 0.0])
+        self.wall = time.perf_counter()
+        self.cpu = time.thread_time()
+
+    def __exit__(self, *exc) -> None:
+        wall = time.perf_counter() - self.wall
+        cpu = time.thread_time() - self.cpu
+        open_phases = self.profiler._open
+        child_wall, child_cpu = open_phases.pop()
+        totals = self.profiler._phases.setdefault(self.name, [0.0, 0.0, 0])
+        totals[0] += wall - child_wall
+        totals[1] += cpu - child_cpu
+        totals[2] += 1
+        if open_phases:
+            open_phases[-1][0] += wall
+            open_phases[-1][1] += cpu
+
+
+class _TimedMatcher:
+    def __init__(self, matcher, profiler: IndexProfiler):
+        self._matcher = matcher
+        self._profiler = profiler
+
+    def ignored(self, path) -> bool:
+        with self._profiler.phase("ignore"):
+            return self._matcher.ignored(path)
+
+    def ignored_relative(self, relative: str, is_dir: bool) -> bool:
+        with self._profiler.phase("ignore"):
+            return self._matcher.ignored_relative(relative, is_dir)
+
+
+def merge_profiles(profiles: Iterable[IndexProfile | None], *, slowest_files: int = DEFAULT_SLOWEST_FILES) -> IndexProfile | None:
+    """Add up several profiles, e.g. one per index shard, and keep the slowest files overall.
+
+    Shards that ran in parallel processes each contribute their own time, so the
+    merged phase totals can exceed the elapsed duration of the update.
+    """
+    profiles = [profile for profile in profiles if profile is not None]
+    if not profiles:
+        return None
+    phases: dict[str, list[float]] = {}
+    extractors: dict[str, list[float]] = {}
+    for profile in profiles:
+        for name, timing in profile.phases.items():
+            totals = phases.setdefault(name, [0.0, 0.0, 0])
+            totals[0] += timing.wall_ms
+            totals[1] += timing.cpu_ms
+            totals[2] += timing.calls
+        for name, timing in profile.extractors.items():
+            counters = extractors.setdefault(name, [0, 0, 0, 0, 0.0])
+            for position, value in enumerate((timing.files, timing.cached, timing.errors, timing.bytes, timing.duration_ms)):
+                counters[position] += value
+    slowest = heapq.nlargest(
+        slowest_files, (item for profile in profiles for item in profile.slowest_files), key=lambda item: item.duration_ms,
+    )
+    return IndexProfile(
+        phases={name: PhaseTiming(round(wall, 3), round(cpu, 3), int(calls)) for name, (wall, cpu, calls) in phases.items()},
+        extractors={
+            name: ExtractorTiming(int(files), int(cached), int(errors), int(size), round(duration, 3))
+            for name, (files, cached, errors, size, duration) in sorted(extractors.items())
+        },
+        slowest_files=tuple(slowest),
+    )
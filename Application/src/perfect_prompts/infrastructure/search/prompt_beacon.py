@@ -2,19 +2,120 @@
 
 from __future__ import annotations
 
+import base64
+import hashlib
+import json
 import os
 import sqlite3
-import tempfile
+import sys
+import time
+import zlib
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, replace
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import Callable, Iterator
+from typing import Callable, Iterable, Iterator, Sequence
 
-from perfect_prompts.contracts.dto import IndexReport, SearchHit, SearchRequest
-from perfect_prompts.domain.classification import classify_relative_path
-from perfect_prompts.infrastructure.search.exporter import SearchResultsExporter
+from perfect_prompts.contracts.dto import IndexReport, QueryExplanation, SearchHit, SearchPage, SearchRequest
+from perfect_prompts.domain.classification import LIBRARY_ROOT_DIRECTORIES, classify_relative_path
+from perfect_prompts.infrastructure.metrics.index_metrics import METRICS_FILE_NAME, IndexMetrics
+from perfect_prompts.infrastructure.search.connection_pool import ReadConnectionPool
+from perfect_prompts.infrastructure.search.digest import file_digest
+from perfect_prompts.infrastructure.search.directory_state import (
+    RACY_WINDOW_NS,
+    DirectoryState,
+    DirectoryStateRecorder,
+    directory_mtime_ns,
+    names_digest,
+)
+from perfect_prompts.infrastructure.search.extraction_cache import CACHE_FILE_NAME, DEFAULT_MAX_BYTES, ExtractionCache
 from perfect_prompts.infrastructure.search.extractors import extract_searchable_text
 from perfect_prompts.infrastructure.search.ignore import IgnoreMatcher
-from perfect_prompts.infrastructure.search.query import fields_match_all_phrases, parse_search_query
+from perfect_prompts.infrastructure.search.pipeline import ExtractionPipeline, extract_file
+from perfect_prompts.infrastructure.search.profiling import DISABLED, IndexProfiler
+from perfect_prompts.infrastructure.search.result_cache import QueryResultCache
+from perfect_prompts.infrastructure.search.query import (
+    QuotedPhrase,
+    fields_match_all_phrases,
+    parse_search_query,
+    searchable_text,
+)
+from perfect_prompts.infrastructure.search.walker import WalkEntry, scan_directory, stat_entry, walk_library
+
+# Bumped whenever the on-disk layout changes; `sync()` rebuilds older projections.
+SCHEMA_VERSION = 8
+# Fresh builds write into a private temp database, so durability is irrelevant until
+# the finished file is swapped in; rows are flushed with executemany in batches.
+BULK_LOAD_PRAGMAS = (
+    "PRAGMA synchronous=OFF",
+    "PRAGMA journal_mode=OFF",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA temp_store=MEMORY",
+)
+BULK_BATCH_ROWS = 512
+BULK_BATCH_BYTES = 32 * 1024 * 1024
+INSERT_NODE_SQL = """
+    INSERT INTO nodes(id,path,parent,name,area,artifact_type,runtime,source_scope,kind,extension,size,mtime_ns,
+                      content_indexed,digest)
+    VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?)
+"""
+INSERT_SEARCH_SQL = "INSERT INTO search(rowid,path,name,area,artifact_type,runtime,body) VALUES (?,?,?,?,?,?,?)"
+INSERT_PHRASES_SQL = "INSERT INTO phrases(rowid,path,name,body) VALUES (?,?,?,?)"
+INSERT_DOCUMENT_SQL = "INSERT INTO documents(id,body,raw_bytes) VALUES (?,?,?)"
+DOCUMENT_COMPRESSION_LEVEL = 6
+# Every unquoted query term is a prefix query (`"term"*`). FTS5 answers a prefix of a
+# length listed here from a dedicated index instead of merging the doclists of every
+# matching term; `benchmarks/prefix_indexes.py` measures the size/latency trade-off.
+DEFAULT_PREFIX_LENGTHS = (2, 3)
+MAX_PREFIX_LENGTH = 16
+# Metadata filters matching at most this many nodes bound the FTS5 scan to the rowid
+# span of those nodes; counting further than this would cost more than it saves.
+SELECTIVE_NODE_ROWS = 2000
+# Page size cap for `search()` and `search_page()`; `search_iter()` streams every match.
+MAX_SEARCH_LIMIT = 500
+# SQLite virtual-machine instructions between checks of a search's ``cancelled`` callback.
+PROGRESS_INTERVAL = 1000
+# Spare rows fetched past ``limit`` from FTS5's rank order so ties at the cut-off can be
+# broken by path without joining every match to `nodes`.
+TOP_K_SLACK = 16
+# Column weights for path, name, area, artifact_type, runtime and body, stored as the
+# table's persistent `rank` so every query ranks through the same configured function.
+RANK_FUNCTION = "bm25(3.5, 5.0, 1.2, 2.0, 1.2, 1.0)"
+NODE_SPAN_SQL = "SELECT COUNT(*),MIN(id),MAX(id) FROM (SELECT n.id AS id FROM nodes n WHERE {where} LIMIT ?)"
+
+
+class QueryInterrupted(RuntimeError):
+    """Raised when a search's ``cancelled`` callback stopped the running SQLite statement."""
+
+
+@dataclass(frozen=True, slots=True)
+class _CompiledQuery:
+    fts_expression: str
+    clauses: tuple[str, ...]
+    params: tuple[object, ...]
+    node_clauses: tuple[str, ...]
+    node_params: tuple[object, ...]
+    match_mode: str = ""
+    phrase_filter: str = "none"
+
+    @property
+    def key(self) -> tuple[object, ...]:
+        """Clause text with its parameters: filter values alone would conflate different columns."""
+        return (self.clauses, self.params)
+
+
+@dataclass(slots=True)
+class _SyncCounts:
+    added: int = 0
+    updated: int = 0
+    removed: int = 0
+    touched: int = 0
+    errors: int = 0
+
+    @property
+    def changed(self) -> int:
+        return self.added + self.updated + self.removed + self.touched
 
 
 class PromptBeaconIndex:
@@ -22,168 +123,687 @@ class PromptBeaconIndex:
 
     The database is disposable. `rebuild()` recreates the whole projection;
     `sync()` walks current repository metadata and only re-extracts new/changed
-    artifacts while removing deleted paths. That makes changes performed either
-    in the GUI or directly through the OS filesystem converge on the same index.
+    artifacts while removing deleted paths. Files whose metadata changed but
+    whose content digest did not are only re-stamped, never re-extracted, and
+    directories whose recorded state is unchanged are not re-listed at all.
+    That makes changes performed either in the GUI or directly through the OS
+    filesystem converge on the same index.
     """
 
-    def __init__(self, root: Path | str):
+    def __init__(
+        self, root: Path | str, *, library_roots: Iterable[str] | None = None, state_directory: Path | None = None,
+    ):
         self.root = Path(root).expanduser().resolve()
-        self.state_directory = self.root / ".perfect-prompts"
+        # A shard of `ShardedPromptBeaconIndex` covers some library roots and keeps its own state directory.
+        self.library_roots = LIBRARY_ROOT_DIRECTORIES if library_roots is None else frozenset(library_roots)
+        self.state_directory = state_directory or self.root / ".perfect-prompts"
         self.db_path = self.state_directory / "index.sqlite3"
         self.ignore_file = self.root / ".perfect-promptsignore"
-        self.exporter = SearchResultsExporter(self.root)
+        self.cache_path = self.state_directory / CACHE_FILE_NAME
+        self.extraction_cache_bytes = DEFAULT_MAX_BYTES
+        self._readers = ReadConnectionPool(self.db_path, on_open=_register_query_functions)
+        self._results = QueryResultCache()
+        self.native_phrase_filter = True
+        self.last_search_ms = 0.0
+        self.last_preview_ms = 0.0
+        self.metrics = IndexMetrics(self.db_path, self.cache_path, lambda: self.result_cache_hits)
+        self.metrics_path = self.state_directory / METRICS_FILE_NAME
+
+    def rebuild(
+        self,
+        cancelled: Callable[[], bool] | None = None,
+        *,
+        workers: int = 1,
+        prefix_lengths: Sequence[int] | None = None,
+        profile: bool = False,
+    ) -> IndexReport:
+        """Recreate the index; ``workers`` > 1 extracts files in a process pool (0 = one per CPU).
+
+        ``prefix_lengths`` selects the FTS5 prefix indexes; ``None`` keeps the
+        live index's setting (or `DEFAULT_PREFIX_LENGTHS`) and ``()`` builds none.
+        ``profile`` records per-phase and per-extractor timings in the report and
+        in `metadata` (see `IndexProfiler`).
+        """
+        import tempfile
 
-    def rebuild(self, cancelled: Callable[[], bool] | None = None) -> IndexReport:
+        started = time.perf_counter()
+        profiler = IndexProfiler() if profile else DISABLED
+        prefix_lengths = self._live_prefix_lengths() if prefix_lengths is None else resolve_prefix_lengths(prefix_lengths)
         self.state_directory.mkdir(parents=True, exist_ok=True)
         fd, tmp_name = tempfile.mkstemp(prefix="index-", suffix=".sqlite3", dir=self.state_directory)
         os.close(fd)
         temp_path = Path(tmp_name)
+        generation = self._live_generation() + 1
         try:
             connection = sqlite3.connect(temp_path, timeout=30)
+            _register_query_functions(connection)
+            cache = self._open_cache()
             try:
-                self._create_schema(connection)
-                report = self._populate_fresh(connection, cancelled)
+                self._create_schema(connection, prefix_lengths)
+                for pragma in BULK_LOAD_PRAGMAS:
+                    connection.execute(pragma)
+                report = self._populate_fresh(connection, cancelled, workers, cache, generation, profiler)
                 if report.cancelled:
-                    return report
-                connection.commit()
+                    return replace(_timed(report, started, report.nodes), profile=profiler.profile())
+                connection.execute(
+                    "INSERT OR REPLACE INTO metadata(key,value) VALUES ('prefix_lengths',?)",
+                    (" ".join(map(str, prefix_lengths)),),
+                )
+                with profiler.phase("optimize"):
+                    connection.execute("INSERT INTO search(search) VALUES('optimize')")
+                    connection.execute("INSERT INTO phrases(phrases) VALUES('optimize')")
+                with profiler.phase("commit"):
+                    connection.commit()
+                # 'optimize' merged every segment into one; the old segment pages are free pages
+                # that would otherwise ship with the swapped-in file.
+                with profiler.phase("vacuum"):
+                    connection.execute("VACUUM")
+                with profiler.phase("commit"):
+                    connection.execute("PRAGMA journal_mode=WAL")
             finally:
                 connection.close()
-            os.replace(temp_path, self.db_path)
-            return report
+                cache.close()
+            # Pooled readers must not hold the old file across the swap, and the old WAL must be
+            # folded back and removed, or SQLite would replay its frames onto the new file.
+            with profiler.phase("commit"):
+                self._readers.close_all()
+                self._checkpoint_live_database()
+                os.replace(temp_path, self.db_path)
+            return self._finish_update(_timed(report, started, report.nodes), "rebuild", profiler)
         finally:
             temp_path.unlink(missing_ok=True)
 
-    def sync(self, cancelled: Callable[[], bool] | None = None) -> IndexReport:
+    def sync(
+        self, cancelled: Callable[[], bool] | None = None, *, full: bool = False, profile: bool = False,
+    ) -> IndexReport:
+        """Bring the index up to date with the filesystem.
+
+        By default only directories whose recorded mtime moved are re-listed and
+        have their entries stat-compared; ``full=True`` walks and compares every
+        node, which also catches in-place rewrites inside untouched directories.
+        ``profile`` works as for `rebuild`.
+        """
+        if not self.db_path.exists():
+            return self.rebuild(cancelled=cancelled, profile=profile)
+        started = time.perf_counter()
+        profiler = IndexProfiler() if profile else DISABLED
+        matcher = profiler.matcher(IgnoreMatcher(self.root, self.ignore_file, self.library_roots))
+        connection = sqlite3.connect(self.db_path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        _register_query_functions(connection)
+        cache = None
+        try:
+            if _schema_version(connection) != SCHEMA_VERSION:
+                connection.close()
+                return self.rebuild(cancelled=cancelled, profile=profile)
+            cache = self._open_cache()
+            counts = _SyncCounts()
+            state_started_ns = time.time_ns()
+            if full or self._directory_state_stale(connection):
+                finished = self._sync_exhaustive(connection, matcher, cancelled, counts, cache, profiler)
+            else:
+                finished = self._sync_pruned(connection, matcher, cancelled, counts, cache, profiler)
+            if not finished:
+                connection.rollback()
+                report = self._report_from_db(connection, counts, cancelled=True)
+                return replace(_timed(report, started, counts.added + counts.updated), profile=profiler.profile())
+            with profiler.phase("insert"):
+                self._update_metadata(connection, errors_delta=counts.errors, recount=counts.changed)
+                connection.executemany(
+                    "INSERT OR REPLACE INTO metadata(key,value) VALUES (?,?)",
+                    (("directory_state_at", str(state_started_ns)), ("ignore_mtime_ns", str(self._ignore_mtime_ns()))),
+                )
+            with profiler.phase("commit"):
+                connection.commit()
+            report = self._report_from_db(connection, counts, cancelled=False)
+            return self._finish_update(_timed(report, started, counts.changed), "sync", profiler)
+        finally:
+            connection.close()
+            if cache is not None:
+                cache.close()
+
+    def apply_changes(self, paths: Iterable[str], cancelled: Callable[[], bool] | None = None) -> IndexReport:
+        """Upsert or delete specific root-relative paths reported by a filesystem watcher.
+
+        New directories are indexed with their whole subtree; vanished or newly
+        ignored paths are removed together with everything below them.
+        """
         if not self.db_path.exists():
             return self.rebuild(cancelled=cancelled)
-        matcher = IgnoreMatcher(self.root, self.ignore_file)
+        started = time.perf_counter()
+        matcher = IgnoreMatcher(self.root, self.ignore_file, self.library_roots)
         connection = sqlite3.connect(self.db_path, timeout=30)
         connection.row_factory = sqlite3.Row
+        _register_query_functions(connection)
+        cache = None
         try:
+            if _schema_version(connection) != SCHEMA_VERSION:
+                connection.close()
+                return self.rebuild(cancelled=cancelled)
+            cache = self._open_cache()
+            counts = _SyncCounts()
+            relatives = sorted({path.replace("\\", "/").strip("/") for path in paths} - {""})
+            for relative in relatives:
+                if cancelled and cancelled():
+                    connection.rollback()
+                    return _timed(self._report_from_db(connection, counts, cancelled=True), started, counts.changed)
+                prior = connection.execute(
+                    "SELECT id,path,kind,size,mtime_ns,content_indexed,digest FROM nodes WHERE path=?", (relative,),
+                ).fetchone()
+                entry = stat_entry(self.root, relative, matcher)
+                if entry is None:
+                    if prior is not None:
+                        counts.removed += self._delete_subtree(connection, relative, {})
+                    continue
+                if prior is not None and (prior["kind"] == "directory") != (entry.kind == "directory"):
+                    counts.removed += self._delete_subtree(connection, relative, {})
+                    prior = None
+                self._reconcile_entry(connection, entry, prior, counts, cache)
+                if entry.kind == "directory" and prior is None:
+                    self._add_subtree(connection, matcher, entry, None, counts, {}, cache)
+            # Entries appearing or vanishing move their parent's mtime; re-stamp it like the pruned sync does.
+            for parent in {relative.rpartition("/")[0] for relative in relatives} - {""}:
+                try:
+                    mtime_ns = directory_mtime_ns(self.root, parent)
+                except OSError:
+                    continue
+                connection.execute("UPDATE nodes SET mtime_ns=? WHERE path=? AND kind='directory'", (mtime_ns, parent))
+            self._update_metadata(connection, errors_delta=counts.errors, recount=counts.changed)
+            connection.commit()
+            report = _timed(self._report_from_db(connection, counts, cancelled=False), started, counts.changed)
+            return self._finish_update(report, "apply_changes")
+        finally:
+            connection.close()
+            if cache is not None:
+                cache.close()
+
+    def _sync_exhaustive(
+        self,
+        connection: sqlite3.Connection,
+        matcher: IgnoreMatcher,
+        cancelled: Callable[[], bool] | None,
+        counts: _SyncCounts,
+        cache: ExtractionCache,
+        profiler: IndexProfiler,
+    ) -> bool:
+        with profiler.phase("lookup"):
             existing = {
                 row["path"]: row
-                for row in connection.execute(
-                    "SELECT id,path,kind,size,mtime_ns,content_indexed FROM nodes"
-                ).fetchall()
+                for row in connection.execute("SELECT id,path,kind,size,mtime_ns,content_indexed,digest FROM nodes").fetchall()
             }
-            seen: set[str] = set()
-            added = updated = removed = errors = 0
-            for path in self._walk(matcher):
+        recorder = DirectoryStateRecorder({"": directory_mtime_ns(self.root, "")})
+        seen: set[str] = set()
+        for entry in profiler.iterate("walk", walk_library(self.root, matcher, on_directory=recorder)):
+            if cancelled and cancelled():
+                return False
+            seen.add(entry.relative)
+            self._reconcile_entry(connection, entry, existing.get(entry.relative), counts, cache, profiler=profiler)
+        with profiler.phase("delete"):
+            for relative in set(existing) - seen:
+                self._delete_node(connection, int(existing[relative]["id"]))
+                counts.removed += 1
+        with profiler.phase("insert"):
+            connection.execute("DELETE FROM directories")
+            _insert_directory_states(connection, recorder.states)
+        return True
+
+    def _sync_pruned(
+        self,
+        connection: sqlite3.Connection,
+        matcher: IgnoreMatcher,
+        cancelled: Callable[[], bool] | None,
+        counts: _SyncCounts,
+        cache: ExtractionCache,
+        profiler: IndexProfiler,
+    ) -> bool:
+        with profiler.phase("lookup"):
+            states = {row["path"]: row for row in connection.execute("SELECT path,mtime_ns,names_digest FROM directories")}
+            recorded_at = connection.execute("SELECT value FROM metadata WHERE key='directory_state_at'").fetchone()
+        racy_from = int(recorded_at[0]) - RACY_WINDOW_NS
+        dirty: dict[str, int | None] = {}
+        with profiler.phase("stat"):
+            for relative, state in states.items():
                 if cancelled and cancelled():
-                    connection.rollback()
-                    return self._report_from_db(connection, errors=errors, cancelled=True, added=added, updated=updated, removed=removed)
-                relative = path.relative_to(self.root).as_posix()
-                seen.add(relative)
+                    return False
                 try:
-                    stat = path.stat(follow_symlinks=False)
+                    mtime_ns = directory_mtime_ns(self.root, relative)
                 except OSError:
-                    errors += 1
+                    # Gone or no longer a directory: the parent listing changed too.
+                    dirty.setdefault(relative.rpartition("/")[0], None)
                     continue
-                kind = "symlink" if path.is_symlink() else ("file" if path.is_file() else "directory")
-                size = stat.st_size if path.is_file() else 0
-                prior = existing.get(relative)
-                if prior is not None and prior["kind"] == kind and prior["size"] == size and prior["mtime_ns"] == stat.st_mtime_ns:
-                    continue
-                body, content_indexed, extraction_error = self._extract(path)
-                errors += extraction_error
-                classification = classify_relative_path(relative)
-                if prior is None:
-                    cursor = connection.execute(
-                        """
-                        INSERT INTO nodes(path,name,area,artifact_type,runtime,source_scope,kind,extension,size,mtime_ns,content_indexed)
-                        VALUES (?,?,?,?,?,?,?,?,?,?,?)
-                        """,
-                        (
-                            relative, path.name, classification.area, classification.artifact_type,
-                            classification.runtime, classification.source_scope, kind,
-                            path.suffix.casefold() if path.is_file() else "", size, stat.st_mtime_ns, content_indexed,
-                        ),
-                    )
-                    node_id = int(cursor.lastrowid)
-                    added += 1
-                else:
-                    node_id = int(prior["id"])
-                    connection.execute(
-                        """
-                        UPDATE nodes SET name=?,area=?,artifact_type=?,runtime=?,source_scope=?,kind=?,extension=?,size=?,mtime_ns=?,content_indexed=?
-                        WHERE id=?
-                        """,
-                        (
-                            path.name, classification.area, classification.artifact_type, classification.runtime,
-                            classification.source_scope, kind, path.suffix.casefold() if path.is_file() else "",
-                            size, stat.st_mtime_ns, content_indexed, node_id,
-                        ),
+                if mtime_ns != state["mtime_ns"] or state["mtime_ns"] >= racy_from:
+                    dirty[relative] = mtime_ns
+        for relative in sorted(dirty):
+            if cancelled and cancelled():
+                return False
+            if relative not in states:
+                continue
+            try:
+                mtime_ns = dirty[relative] if dirty[relative] is not None else directory_mtime_ns(self.root, relative)
+            except OSError:
+                continue
+            with profiler.phase("walk"):
+                entries = scan_directory(self.root, relative, matcher)
+            with profiler.phase("lookup"):
+                prior_rows = {
+                    row["path"]: row
+                    for row in connection.execute(
+                        "SELECT id,path,kind,size,mtime_ns,content_indexed,digest FROM nodes WHERE parent=?", (relative,),
                     )
-                    connection.execute("DELETE FROM search WHERE rowid=?", (node_id,))
-                    updated += 1
-                connection.execute(
-                    "INSERT INTO search(rowid,path,name,area,artifact_type,runtime,body) VALUES (?,?,?,?,?,?,?)",
-                    (node_id, relative, path.name, classification.area, classification.artifact_type, classification.runtime, body),
-                )
+                }
+            listing_digest = names_digest(entries)
+            if listing_digest != states[relative]["names_digest"]:
+                # Entries that failed to stat keep their rows, exactly as the exhaustive walk does.
+                current = {entry.relative for entry in entries}
+                with profiler.phase("delete"):
+                    for path, row in prior_rows.items():
+                        if path not in current:
+                            counts.removed += self._delete_subtree(connection, path, states)
+            for entry in entries:
+                prior = prior_rows.get(entry.relative)
+                if prior is not None and not entry.error and prior["kind"] == "directory" and entry.kind != "directory":
+                    with profiler.phase("delete"):
+                        counts.removed += self._delete_subtree(connection, entry.relative, states)
+                    prior = None
+                self._reconcile_entry(connection, entry, prior, counts, cache, profiler=profiler)
+                if entry.kind == "directory" and not entry.error and entry.relative not in states:
+                    if not self._add_subtree(
+                        connection, matcher, entry, cancelled, counts, states, cache, profiler=profiler,
+                    ):
+                        return False
+            with profiler.phase("insert"):
+                if relative:
+                    connection.execute("UPDATE nodes SET mtime_ns=? WHERE path=? AND kind='directory'", (mtime_ns, relative))
+                _insert_directory_states(connection, [DirectoryState(relative, mtime_ns, listing_digest)])
+        return True
 
-            missing = set(existing) - seen
-            for relative in missing:
-                node_id = int(existing[relative]["id"])
-                connection.execute("DELETE FROM search WHERE rowid=?", (node_id,))
-                connection.execute("DELETE FROM nodes WHERE id=?", (node_id,))
-                removed += 1
+    def _add_subtree(
+        self,
+        connection: sqlite3.Connection,
+        matcher: IgnoreMatcher,
+        directory: WalkEntry,
+        cancelled: Callable[[], bool] | None,
+        counts: _SyncCounts,
+        states: dict[str, object],
+        cache: ExtractionCache,
+        *,
+        profiler: IndexProfiler = DISABLED,
+    ) -> bool:
+        recorder = DirectoryStateRecorder({directory.relative: directory.mtime_ns})
+        walk = walk_library(self.root, matcher, start=directory.relative, on_directory=recorder)
+        for entry in profiler.iterate("walk", walk):
+            if cancelled and cancelled():
+                return False
+            self._reconcile_entry(connection, entry, None, counts, cache, profiler=profiler)
+        _insert_directory_states(connection, recorder.states)
+        states.update((state.path, state) for state in recorder.states)
+        return True
 
-            self._update_metadata(connection, errors_delta=errors)
-            connection.commit()
-            return self._report_from_db(connection, errors=errors, cancelled=False, added=added, updated=updated, removed=removed)
-        finally:
-            connection.close()
+    def _reconcile_entry(
+        self,
+        connection: sqlite3.Connection,
+        entry: WalkEntry,
+        prior: sqlite3.Row | None,
+        counts: _SyncCounts,
+        cache: ExtractionCache,
+        *,
+        profiler: IndexProfiler = DISABLED,
+    ) -> None:
+        relative, kind, size, mtime_ns = entry.relative, entry.kind, entry.size, entry.mtime_ns
+        if entry.error:
+            counts.errors += 1
+            return
+        if prior is not None and prior["kind"] == kind and prior["size"] == size and prior["mtime_ns"] == mtime_ns:
+            return
+        path = self.root / relative
+        digest = None
+        if prior is not None and kind == "file" and prior["kind"] == "file" and prior["digest"]:
+            try:
+                with profiler.phase("hash"):
+                    digest = file_digest(path)
+            except OSError:
+                counts.errors += 1
+                return
+            if digest == prior["digest"]:
+                # Touched by checkout/rsync/deploy tooling but byte-identical: keep the FTS row.
+                connection.execute("UPDATE nodes SET size=?,mtime_ns=? WHERE id=?", (size, mtime_ns, prior["id"]))
+                counts.touched += 1
+                return
+        if kind == "file":
+            with profiler.phase("extract"):
+                extraction = extract_file(path, digest, cache)
+                cache.record(path, extraction)
+            profiler.record_file(relative, extraction, size)
+            body, content_indexed, extraction_error, digest = extraction[:4]
+            body = searchable_text(body)
+        else:
+            body, content_indexed, extraction_error, digest = "", 0, 0, ""
+        counts.errors += extraction_error
+        with profiler.phase("insert"):
+            self._write_entry(connection, entry, prior, counts, body, content_indexed, digest)
 
-    def search(self, request: SearchRequest) -> tuple[SearchHit, ...]:
-        parsed = parse_search_query(request.query)
-        if not parsed.fts_expression or not self.db_path.exists():
+    def _write_entry(
+        self,
+        connection: sqlite3.Connection,
+        entry: WalkEntry,
+        prior: sqlite3.Row | None,
+        counts: _SyncCounts,
+        body: str,
+        content_indexed: int,
+        digest: str,
+    ) -> None:
+        relative, kind, size, mtime_ns = entry.relative, entry.kind, entry.size, entry.mtime_ns
+        classification = classify_relative_path(relative)
+        if prior is None:
+            cursor = connection.execute(
+                """
+                INSERT INTO nodes(path,parent,name,area,artifact_type,runtime,source_scope,kind,extension,size,mtime_ns,
+                                  content_indexed,digest)
+                VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)
+                """,
+                (
+                    relative, entry.parent, entry.name, classification.area, classification.artifact_type,
+                    classification.runtime, classification.source_scope, kind,
+                    entry.extension, size, mtime_ns, content_indexed, digest,
+                ),
+            )
+            node_id = int(cursor.lastrowid)
+            counts.added += 1
+        else:
+            node_id = int(prior["id"])
+            # The FTS 'delete' replays the old column values, so it must run before `nodes` changes.
+            _delete_search_row(connection, node_id)
+            connection.execute(
+                """
+                UPDATE nodes SET name=?,area=?,artifact_type=?,runtime=?,source_scope=?,kind=?,extension=?,size=?,mtime_ns=?,
+                                 content_indexed=?,digest=?
+                WHERE id=?
+                """,
+                (
+                    entry.name, classification.area, classification.artifact_type, classification.runtime,
+                    classification.source_scope, kind, entry.extension, size, mtime_ns, content_indexed, digest, node_id,
+                ),
+            )
+            counts.updated += 1
+        path, name = searchable_text(relative), searchable_text(entry.name)
+        connection.execute(
+            INSERT_SEARCH_SQL,
+            (node_id, path, name, classification.area, classification.artifact_type, classification.runtime, body),
+        )
+        connection.execute(INSERT_PHRASES_SQL, (node_id, path, name, body))
+        if body:
+            connection.execute(INSERT_DOCUMENT_SQL, (node_id, *_pack_body(body)))
+
+    def _delete_subtree(self, connection: sqlite3.Connection, relative: str, states: dict[str, object]) -> int:
+        lower, upper = f"{relative}/", f"{relative}0"
+        ids = [
+            int(row[0]) for row in connection.execute(
+                "SELECT id FROM nodes WHERE path=? OR (path>=? AND path<?)", (relative, lower, upper),
+            )
+        ]
+        for node_id in ids:
+            self._delete_node(connection, node_id)
+        connection.execute("DELETE FROM directories WHERE path=? OR (path>=? AND path<?)", (relative, lower, upper))
+        for path in [path for path in states if path == relative or lower <= path < upper]:
+            del states[path]
+        return len(ids)
+
+    @staticmethod
+    def _delete_node(connection: sqlite3.Connection, node_id: int) -> None:
+        _delete_search_row(connection, node_id)
+        connection.execute("DELETE FROM nodes WHERE id=?", (node_id,))
+
+    def _directory_state_stale(self, connection: sqlite3.Connection) -> bool:
+        metadata = dict(connection.execute(
+            "SELECT key,value FROM metadata WHERE key IN ('directory_state_at','ignore_mtime_ns')",
+        ).fetchall())
+        return "directory_state_at" not in metadata or metadata.get("ignore_mtime_ns") != str(self._ignore_mtime_ns())
+
+    def _ignore_mtime_ns(self) -> int:
+        try:
+            return self.ignore_file.stat().st_mtime_ns
+        except OSError:
+            return -1
+
+    def search(self, request: SearchRequest, cancelled: Callable[[], bool] | None = None) -> tuple[SearchHit, ...]:
+        """Return the best ``request.limit`` hits.
+
+        ``cancelled`` is polled from SQLite's progress handler while statements run;
+        once it returns true the query stops with `QueryInterrupted`.
+        """
+        query = self._compile(request)
+        if query is None or not self.db_path.exists():
             return ()
-        connection = sqlite3.connect(self.db_path, timeout=15)
-        connection.row_factory = sqlite3.Row
+        limit = _clamp_limit(request.limit)
+        key = (*query.key, limit)
+        started = time.perf_counter()
         try:
-            clauses = ["search MATCH ?"]
-            params: list[object] = [parsed.fts_expression]
-            if parsed.quoted_phrases:
-                connection.create_function(
-                    "prompt_beacon_phrases_match", 3,
-                    lambda path, name, body: int(fields_match_all_phrases(parsed.quoted_phrases, path, name, body)),
-                    deterministic=True,
-                )
-                clauses.append("prompt_beacon_phrases_match(search.path,search.name,search.body)=1")
-            for column, value in (
-                ("area", request.area), ("artifact_type", request.artifact_type),
-                ("runtime", request.runtime), ("source_scope", request.source_scope),
-            ):
-                if value:
-                    clauses.append(f"n.{column} = ?")
-                    params.append(value)
-            if request.path_prefix:
-                clauses.append("n.path LIKE ?")
-                prefix = request.path_prefix.strip().replace("\\", "/").strip("/")
-                params.append(prefix + "%")
-            params.append(max(1, min(int(request.limit), 500)))
-            rows = connection.execute(
-                f"""
-                SELECT n.path,n.name,n.area,n.artifact_type,n.runtime,n.source_scope,n.kind,n.extension,n.content_indexed,
-                       snippet(search,5,'<mark>','</mark>',' … ',36) AS snippet,
-                       bm25(search,3.5,5.0,1.2,2.0,1.2,1.0) AS rank
-                FROM search JOIN nodes n ON n.id=search.rowid
-                WHERE {' AND '.join(clauses)}
-                ORDER BY rank, n.path
-                LIMIT ?
-                """, params,
-            ).fetchall()
-        finally:
-            connection.close()
-        return tuple(SearchHit(
-            path=row["path"], name=row["name"], area=row["area"], artifact_type=row["artifact_type"],
-            runtime=row["runtime"], source_scope=row["source_scope"], kind=row["kind"], extension=row["extension"],
-            content_indexed=bool(row["content_indexed"]), snippet=row["snippet"] or row["path"], rank=float(row["rank"]),
-        ) for row in rows)
+            with self._readers.reader() as connection:
+                # One read transaction, so the generation matches the rows the query sees.
+                connection.execute("BEGIN")
+                try:
+                    generation = _generation(connection)
+                    cached = self._results.get(generation, key)
+                    if cached is not None:
+                        self.metrics.observe_query(query.match_mode, time.perf_counter() - started)
+                        return cached
+                    with _interruptible(connection, cancelled):
+                        ranked = _top_k(connection, query, limit)
+                        rows = _hit_rows(connection, query.fts_expression, ranked)
+                finally:
+                    connection.rollback()
+        except FileNotFoundError:
+            return ()
+        except QueryInterrupted:
+            self.metrics.interrupted.inc(match_mode=query.match_mode)
+            raise
+        hits = _to_hits(ranked, rows)
+        self._results.put(generation, key, hits)
+        elapsed = time.perf_counter() - started
+        self.last_search_ms = round(elapsed * 1000, 3)
+        self.metrics.observe_query(query.match_mode, elapsed)
+        return hits
+
+    def search_page(
+        self, request: SearchRequest, cursor: str | None = None, cancelled: Callable[[], bool] | None = None,
+    ) -> SearchPage:
+        """Return one page of ``request.limit`` hits after ``cursor``, plus the cursor of the next page.
+
+        Pages are keyset-paginated on ``(rank, path)``. A cursor is only valid for
+        the same request against the same index generation; otherwise this raises
+        ``ValueError`` and the caller starts over.
+        """
+        query = self._compile(request)
+        if query is None or not self.db_path.exists():
+            return SearchPage(())
+        fingerprint = _fingerprint(query)
+        after = issued_generation = None
+        if cursor:
+            issued_generation, issued_fingerprint, after = _decode_cursor(cursor)
+            if issued_fingerprint != fingerprint:
+                raise ValueError("Search cursor belongs to a different query")
+        generation, hits, more = self.page_after(request, after, cancelled, generation=issued_generation)
+        following = _encode_cursor(generation, fingerprint, (hits[-1].rank, hits[-1].path)) if more else None
+        return SearchPage(hits, following)
+
+    def page_after(
+        self,
+        request: SearchRequest,
+        after: tuple[float, str] | None = None,
+        cancelled: Callable[[], bool] | None = None,
+        *,
+        generation: int | None = None,
+    ) -> tuple[int, tuple[SearchHit, ...], bool]:
+        """The ``request.limit`` hits ranked after ``after`` (a ``(rank, path)`` key), the index
+        generation they were read at, and whether more hits follow.
+
+        With ``generation`` given, a different live generation raises ``ValueError``.
+        `search_page` wraps this in cursors; `ShardedPromptBeaconIndex` pages its shards with it.
+        """
+        query = self._compile(request)
+        if query is None or not self.db_path.exists():
+            return 0, (), False
+        limit = _clamp_limit(request.limit)
+        issued_generation = generation
+        started = time.perf_counter()
+        try:
+            with self._readers.reader() as connection:
+                connection.execute("BEGIN")
+                try:
+                    generation = _generation(connection)
+                    if issued_generation is not None and generation != issued_generation:
+                        raise ValueError("Search cursor is stale: the index changed since it was issued")
+                    with _interruptible(connection, cancelled):
+                        ranked = _top_k(connection, query, limit + 1, after=after)
+                        more = len(ranked) > limit
+                        ranked = ranked[:limit]
+                        rows = _hit_rows(connection, query.fts_expression, ranked)
+                finally:
+                    connection.rollback()
+        except FileNotFoundError:
+            return 0, (), False
+        except QueryInterrupted:
+            self.metrics.interrupted.inc(match_mode=query.match_mode)
+            raise
+        self.metrics.observe_query(query.match_mode, time.perf_counter() - started)
+        return generation, _to_hits(ranked, rows), more
+
+    def search_iter(self, request: SearchRequest, *, batch_size: int = 200) -> Iterator[SearchHit]:
+        """Yield every match in rank order, ignoring ``request.limit``.
+
+        One statement on a dedicated read-only handle ranks all matches inside a
+        single read transaction; SQLite's sorter spills to temporary storage, and
+        node rows and snippets are fetched ``batch_size`` hits at a time. A
+        `rebuild()` in this process closes the handle and the iterator raises
+        ``RuntimeError``.
+        """
+        query = self._compile(request)
+        if query is None or not self.db_path.exists():
+            return
+        with self._readers.dedicated() as handle:
+            with handle.lock:
+                connection = handle.connection
+                connection.execute("BEGIN")
+                bounded = _bounded_clauses(connection, query)
+                if bounded is None:
+                    return
+                ranked_rows = connection.execute(_ranked_sql(bounded[0], join_nodes=True, limited=False), bounded[1])
+            while True:
+                with handle.lock:
+                    if handle.connection is None:
+                        raise RuntimeError("The index was rebuilt while its results were being streamed")
+                    ranked = [tuple(row) for row in ranked_rows.fetchmany(max(1, batch_size))]
+                    rows = _hit_rows(connection, query.fts_expression, ranked)
+                if not ranked:
+                    return
+                yield from _to_hits(ranked, rows)
+
+    def explain(self, request: SearchRequest) -> QueryExplanation:
+        """Describe how ``request`` is parsed, planned and run, timing each phase of a fresh search.
+
+        The result cache is bypassed. Both candidate counts visit every match, so
+        explaining an unselective query takes longer than running it; the ranking,
+        join and snippet phases are timed exactly as `search()` runs them.
+        """
+        parsed = parse_search_query(request.query)
+        query = self._compile(request)
+        explanation = QueryExplanation(
+            query=request.query, match_mode=parsed.match_mode, terms=parsed.terms,
+            phrases=tuple(" ".join(phrase.tokens) for phrase in parsed.quoted_phrases),
+            fts_expression=parsed.fts_expression,
+        )
+        if query is None:
+            return explanation
+        # Every node clause takes exactly one parameter; show it inline, quoted as SQL would.
+        node_filters = tuple(
+            clause.replace("?", "'" + str(value).replace("'", "''") + "'")
+            for clause, value in zip(query.node_clauses, query.node_params)
+        )
+        explanation = replace(
+            explanation, phrase_filter=query.phrase_filter, node_filters=node_filters,
+            phrase_expression=query.params[1] if query.phrase_filter == "native" else "",
+        )
+        if not self.db_path.exists():
+            return explanation
+        limit = _clamp_limit(request.limit)
+        timings: dict[str, float] = {}
+
+        def timed(phase: str, work: Callable[[], object]):
+            started = time.perf_counter()
+            result = work()
+            timings[phase] = round((time.perf_counter() - started) * 1000, 3)
+            return result
+
+        with self._readers.reader() as connection:
+            connection.execute("BEGIN")
+            try:
+                match_rows = timed("match", lambda: connection.execute(
+                    "SELECT COUNT(*) FROM search WHERE search MATCH ?", (query.fts_expression,),
+                ).fetchone()[0])
+                node_rows = rowid_span = None
+                if query.node_clauses:
+                    count, low, high = connection.execute(
+                        NODE_SPAN_SQL.format(where=" AND ".join(query.node_clauses)),
+                        (*query.node_params, SELECTIVE_NODE_ROWS + 1),
+                    ).fetchone()
+                    node_rows = count
+                    rowid_span = (low, high) if 0 < count <= SELECTIVE_NODE_ROWS else None
+                bounded = _bounded_clauses(connection, query)
+                if bounded is None:
+                    return replace(explanation, match_rows=match_rows, node_rows=node_rows, timings_ms=timings)
+                clauses, params = bounded
+                join_nodes = bool(query.node_clauses)
+                source = "search JOIN nodes n ON n.id=search.rowid" if join_nodes else "search"
+                filtered_rows = timed("filter", lambda: connection.execute(
+                    f"SELECT COUNT(*) FROM {source} WHERE {' AND '.join(clauses)}", params,
+                ).fetchone()[0])
+                ranked = timed("rank", lambda: _top_k(connection, query, limit))
+                ids = [row[0] for row in ranked]
+                timed("join", lambda: _hit_rows(connection, query.fts_expression, ranked, snippets=False))
+                timed("snippet", lambda: _hit_rows(connection, query.fts_expression, ranked))
+                timings["snippet"] = round(max(0.0, timings["snippet"] - timings["join"]), 3)
+                plans = {"rank": _query_plan(connection, _ranked_sql(clauses, join_nodes=join_nodes), (*params, limit))}
+                if ids:
+                    plans["hits"] = _query_plan(
+                        connection, _hit_rows_sql(len(ids)), (query.fts_expression, min(ids), max(ids), *ids),
+                    )
+            finally:
+                connection.rollback()
+        return replace(
+            explanation, node_rows=node_rows, rowid_span=rowid_span, match_rows=match_rows,
+            filtered_rows=filtered_rows, hits=len(ranked), plans=plans, timings_ms=timings,
+        )
+
+    def _compile(self, request: SearchRequest) -> _CompiledQuery | None:
+        parsed = parse_search_query(request.query)
+        if not parsed.fts_expression:
+            return None
+        clauses = ["search MATCH ?"]
+        params: list[object] = [parsed.fts_expression]
+        native_phrases = parsed.native_phrase_expression if self.native_phrase_filter else None
+        phrase_filter = "none"
+        if native_phrases:
+            # Unary + keeps SQLite from feeding the phrase rowids to `search` one MATCH at a time.
+            clauses.append("+search.rowid IN (SELECT rowid FROM phrases WHERE phrases MATCH ?)")
+            params.append(native_phrases)
+            phrase_filter = "native"
+        elif parsed.quoted_phrases:
+            # Phrases with non-ASCII tokens keep the Python check: casefolding and word boundaries
+            # can differ from the unicode61 tokenizer outside ASCII.
+            clauses.append("prompt_beacon_phrases_match(?,search.path,search.name,search.body)=1")
+            params.append(_encode_phrases(parsed.quoted_phrases))
+            phrase_filter = "python"
+        node_clauses, node_params = _node_filters(request)
+        return _CompiledQuery(
+            parsed.fts_expression, (*clauses, *node_clauses), (*params, *node_params), tuple(node_clauses), tuple(node_params),
+            parsed.match_mode, phrase_filter,
+        )
 
     def export_query(self, request: SearchRequest, hits: tuple[SearchHit, ...]) -> str:
-        captured = self.exporter.capture(request, hits)
-        return str(self.exporter.write(captured))
+        from perfect_prompts.infrastructure.search.exporter import SearchResultsExporter
+
+        exporter = SearchResultsExporter(self.root)
+        return str(exporter.write(exporter.capture(request, hits)))
 
     def read_content(self, relative_path: str) -> str:
         absolute = (self.root / relative_path).resolve()
@@ -191,97 +811,215 @@ class PromptBeaconIndex:
             raise ValueError("Path escapes the selected repository root")
         if not absolute.is_file():
             return ""
-        return extract_searchable_text(absolute)
+        started = time.perf_counter()
+        body = self._stored_body(relative_path.replace("\\", "/").strip("/"))
+        if body is None:
+            body = extract_searchable_text(absolute)
+        self.last_preview_ms = round((time.perf_counter() - started) * 1000, 3)
+        return body
+
+    def _stored_body(self, relative: str) -> str | None:
+        """Return the indexed body when the file still has the size and mtime it was indexed with."""
+        try:
+            stat = (self.root / relative).stat()
+            with self._readers.reader() as connection:
+                row = connection.execute(
+                    """
+                    SELECT n.size,n.mtime_ns,d.body FROM nodes n JOIN documents d ON d.id=n.id
+                    WHERE n.path=? AND n.kind='file' AND n.content_indexed=1
+                    """, (relative,),
+                ).fetchone()
+        except (OSError, sqlite3.Error):
+            return None
+        if row is None or row["size"] != stat.st_size or row["mtime_ns"] != stat.st_mtime_ns:
+            return None
+        return _inflate(row["body"])
+
+    @property
+    def result_cache_hits(self) -> int:
+        return self._results.hits
+
+    def node_count(self) -> int:
+        """Nodes recorded by the last completed update; 0 before the first build."""
+        try:
+            with self._readers.reader() as connection:
+                counts = _stored_counts(connection)
+        except (OSError, sqlite3.Error):
+            return 0
+        return counts[0] if counts is not None else 0
 
     def status(self) -> dict[str, object]:
         if not self.db_path.exists():
             return {"exists": False, "database_path": str(self.db_path), "root": str(self.root)}
-        connection = sqlite3.connect(self.db_path, timeout=15)
         try:
-            metadata = dict(connection.execute("SELECT key,value FROM metadata").fetchall())
-            area_counts = dict(connection.execute("SELECT area,COUNT(*) FROM nodes GROUP BY area ORDER BY area").fetchall())
-            type_counts = dict(connection.execute("SELECT artifact_type,COUNT(*) FROM nodes GROUP BY artifact_type ORDER BY artifact_type").fetchall())
-        finally:
-            connection.close()
+            with self._readers.reader() as connection:
+                metadata = dict(connection.execute("SELECT key,value FROM metadata").fetchall())
+                area_counts = dict(connection.execute("SELECT area,COUNT(*) FROM nodes GROUP BY area ORDER BY area").fetchall())
+                type_counts = dict(connection.execute(
+                    "SELECT artifact_type,COUNT(*) FROM nodes GROUP BY artifact_type ORDER BY artifact_type",
+                ).fetchall())
+                stored, raw = connection.execute(
+                    "SELECT COALESCE(SUM(length(body)),0),COALESCE(SUM(raw_bytes),0) FROM documents",
+                ).fetchone()
+        except FileNotFoundError:
+            return {"exists": False, "database_path": str(self.db_path), "root": str(self.root)}
+        if "index_profile" in metadata:
+            metadata["index_profile"] = json.loads(metadata["index_profile"])
         return {
             "exists": True, "database_path": str(self.db_path), "database_size_bytes": self.db_path.stat().st_size,
-            "area_counts": area_counts, "type_counts": type_counts, **metadata,
+            "extraction_cache_bytes": self.cache_path.stat().st_size if self.cache_path.exists() else 0,
+            "area_counts": area_counts, "type_counts": type_counts, **metadata, **self._results.stats(),
+            "document_store_bytes": stored, "document_store_raw_bytes": raw,
+            "document_store_ratio": round(stored / raw, 3) if raw else 0.0,
+            "last_search_ms": self.last_search_ms, "last_preview_ms": self.last_preview_ms,
         }
 
-    def _populate_fresh(self, connection: sqlite3.Connection, cancelled: Callable[[], bool] | None) -> IndexReport:
-        matcher = IgnoreMatcher(self.root, self.ignore_file)
-        indexed_files = skipped_files = errors = nodes = 0
-        for path in self._walk(matcher):
-            if cancelled and cancelled():
-                connection.rollback()
-                return IndexReport(nodes, indexed_files, skipped_files, errors, True, added=nodes)
-            relative = path.relative_to(self.root).as_posix()
-            try:
-                stat = path.stat(follow_symlinks=False)
-            except OSError:
-                errors += 1
-                continue
-            body, content_indexed, extraction_error = self._extract(path)
-            errors += extraction_error
-            if path.is_file() and not path.is_symlink():
-                if content_indexed:
-                    indexed_files += 1
-                else:
-                    skipped_files += 1
-            classification = classify_relative_path(relative)
-            kind = "symlink" if path.is_symlink() else ("file" if path.is_file() else "directory")
-            cursor = connection.execute(
-                """
-                INSERT INTO nodes(path,name,area,artifact_type,runtime,source_scope,kind,extension,size,mtime_ns,content_indexed)
-                VALUES (?,?,?,?,?,?,?,?,?,?,?)
-                """,
-                (
-                    relative, path.name, classification.area, classification.artifact_type,
-                    classification.runtime, classification.source_scope, kind,
-                    path.suffix.casefold() if path.is_file() else "",
-                    stat.st_size if path.is_file() else 0, stat.st_mtime_ns, content_indexed,
-                ),
+    def _populate_fresh(
+        self,
+        connection: sqlite3.Connection,
+        cancelled: Callable[[], bool] | None,
+        workers: int = 1,
+        cache: ExtractionCache | None = None,
+        generation: int = 1,
+        profiler: IndexProfiler = DISABLED,
+    ) -> IndexReport:
+        matcher = profiler.matcher(IgnoreMatcher(self.root, self.ignore_file, self.library_roots))
+        indexed_files = skipped_files = errors = nodes = pending_bytes = 0
+        node_rows: list[tuple[object, ...]] = []
+        search_rows: list[tuple[object, ...]] = []
+        state_started_ns = time.time_ns()
+        recorder = DirectoryStateRecorder({"": directory_mtime_ns(self.root, "")})
+        extracted = ExtractionPipeline(workers, cache).map(
+            profiler.iterate("walk", walk_library(self.root, matcher, on_directory=recorder)), self._extraction_target,
+        )
+        try:
+            for entry, extraction in profiler.iterate("extract", extracted):
+                body, content_indexed, extraction_error, digest = extraction[:4]
+                if cancelled and cancelled():
+                    connection.rollback()
+                    return IndexReport(nodes, indexed_files, skipped_files, errors, True, added=nodes)
+                if entry.error:
+                    errors += 1
+                    continue
+                errors += extraction_error
+                body = searchable_text(body)
+                if entry.kind == "file":
+                    profiler.record_file(entry.relative, extraction, entry.size)
+                    if content_indexed:
+                        indexed_files += 1
+                    else:
+                        skipped_files += 1
+                relative = entry.relative
+                classification = classify_relative_path(relative)
+                nodes += 1
+                node_rows.append((
+                    nodes, relative, entry.parent, entry.name, classification.area, classification.artifact_type,
+                    classification.runtime, classification.source_scope, entry.kind,
+                    entry.extension, entry.size, entry.mtime_ns, content_indexed, digest,
+                ))
+                search_rows.append(
+                    (
+                        nodes, searchable_text(relative), searchable_text(entry.name), classification.area,
+                        classification.artifact_type, classification.runtime, body,
+                    ),
+                )
+                pending_bytes += len(body)
+                if len(node_rows) >= BULK_BATCH_ROWS or pending_bytes >= BULK_BATCH_BYTES:
+                    with profiler.phase("insert"):
+                        _flush_bulk_rows(connection, node_rows, search_rows)
+                    pending_bytes = 0
+            with profiler.phase("insert"):
+                _flush_bulk_rows(connection, node_rows, search_rows)
+        finally:
+            extracted.close()
+        with profiler.phase("insert"):
+            _insert_directory_states(connection, recorder.states)
+            self._update_metadata(connection, absolute_errors=errors, generation=generation)
+            connection.executemany(
+                "INSERT OR REPLACE INTO metadata(key,value) VALUES (?,?)",
+                (("directory_state_at", str(state_started_ns)), ("ignore_mtime_ns", str(self._ignore_mtime_ns()))),
             )
-            node_id = int(cursor.lastrowid)
+        return IndexReport(nodes, indexed_files, skipped_files, errors, False, added=nodes)
+
+    def write_metrics(self) -> Path:
+        """Write the OpenMetrics text of `metrics` to ``.perfect-prompts/metrics.prom``."""
+        self.metrics.registry.write(self.metrics_path)
+        return self.metrics_path
+
+    def _finish_update(self, report: IndexReport, operation: str, profiler: IndexProfiler = DISABLED) -> IndexReport:
+        """Record a completed update in `metrics` and its metrics file, and attach and store its profile."""
+        self.metrics.observe_update(operation, report)
+        try:
+            self.write_metrics()
+        except OSError:
+            pass
+        profile = profiler.profile()
+        if profile is None:
+            return report
+        stored = {"operation": operation, "recorded_at": _utc_now(), "duration_ms": report.duration_ms, **asdict(profile)}
+        connection = sqlite3.connect(self.db_path, timeout=30)
+        try:
             connection.execute(
-                "INSERT INTO search(rowid,path,name,area,artifact_type,runtime,body) VALUES (?,?,?,?,?,?,?)",
-                (node_id, relative, path.name, classification.area, classification.artifact_type, classification.runtime, body),
+                "INSERT OR REPLACE INTO metadata(key,value) VALUES ('index_profile',?)", (json.dumps(stored),),
             )
-            nodes += 1
-        self._update_metadata(connection, absolute_errors=errors)
-        return IndexReport(nodes, indexed_files, skipped_files, errors, False, added=nodes)
+            connection.commit()
+        finally:
+            connection.close()
+        return replace(report, profile=profile)
 
-    @staticmethod
-    def _extract(path: Path) -> tuple[str, int, int]:
-        if not path.is_file() or path.is_symlink():
-            return "", 0, 0
+    def _checkpoint_live_database(self) -> None:
+        if not self.db_path.exists():
+            return
+        connection = sqlite3.connect(self.db_path, timeout=30)
         try:
-            body = extract_searchable_text(path)
-            return body, int(bool(body)), 0
-        except Exception:
-            return "", 0, 1
-
-    def _walk(self, matcher: IgnoreMatcher) -> Iterator[Path]:
-        stack = [self.root]
-        while stack:
-            directory = stack.pop()
-            try:
-                entries = sorted(directory.iterdir(), key=lambda p: (not p.is_dir(), p.name.casefold()))
-            except OSError:
-                continue
-            children: list[Path] = []
-            for entry in entries:
-                if matcher.ignored(entry):
-                    continue
-                yield entry
-                if entry.is_dir() and not entry.is_symlink():
-                    children.append(entry)
-            stack.extend(reversed(children))
-
-    def _update_metadata(self, connection: sqlite3.Connection, *, absolute_errors: int | None = None, errors_delta: int = 0) -> None:
-        nodes = int(connection.execute("SELECT COUNT(*) FROM nodes").fetchone()[0])
-        indexed = int(connection.execute("SELECT COUNT(*) FROM nodes WHERE kind='file' AND content_indexed=1").fetchone()[0])
-        skipped = int(connection.execute("SELECT COUNT(*) FROM nodes WHERE kind='file' AND content_indexed=0").fetchone()[0])
+            connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        except sqlite3.Error:
+            pass
+        finally:
+            connection.close()
+
+    def _live_generation(self) -> int:
+        try:
+            with self._readers.reader() as connection:
+                return _generation(connection)
+        except (OSError, sqlite3.Error):
+            return 0
+
+    def _live_prefix_lengths(self) -> tuple[int, ...]:
+        try:
+            with self._readers.reader() as connection:
+                row = connection.execute("SELECT value FROM metadata WHERE key='prefix_lengths'").fetchone()
+        except (OSError, sqlite3.Error):
+            return DEFAULT_PREFIX_LENGTHS
+        if row is None:
+            return DEFAULT_PREFIX_LENGTHS
+        try:
+            return resolve_prefix_lengths(int(value) for value in row[0].split())
+        except ValueError:
+            return DEFAULT_PREFIX_LENGTHS
+
+    def _open_cache(self) -> ExtractionCache:
+        self.state_directory.mkdir(parents=True, exist_ok=True)
+        return ExtractionCache(self.cache_path, max_bytes=self.extraction_cache_bytes)
+
+    def _extraction_target(self, entry: WalkEntry) -> Path | None:
+        return self.root / entry.relative if entry.kind == "file" and not entry.error else None
+
+    def _update_metadata(
+        self,
+        connection: sqlite3.Connection,
+        *,
+        absolute_errors: int | None = None,
+        errors_delta: int = 0,
+        recount: bool = True,
+        generation: int | None = None,
+    ) -> None:
+        """Write counts and timestamps; a write that changed rows (``recount``) also advances the generation."""
+        # A sync that changed nothing keeps the stored counts instead of rescanning `nodes`.
+        counted = None if recount else _stored_counts(connection)
+        if counted is None:
+            counted = _count_nodes(connection)
+        nodes, indexed, skipped = counted
         if absolute_errors is None:
             prior = connection.execute("SELECT value FROM metadata WHERE key='error_count'").fetchone()
             total_errors = int(prior[0]) + errors_delta if prior else errors_delta
@@ -292,32 +1030,39 @@ class PromptBeaconIndex:
         metadata = {
             "root": str(self.root), "built_at": prior_built[0] if prior_built else now, "synced_at": now,
             "node_count": str(nodes), "indexed_file_count": str(indexed), "skipped_file_count": str(skipped),
-            "error_count": str(total_errors),
+            "error_count": str(total_errors), "schema_version": str(SCHEMA_VERSION),
         }
+        if generation is None and recount:
+            generation = _generation(connection) + 1
+        if generation is not None:
+            metadata["generation"] = str(generation)
         connection.executemany("INSERT OR REPLACE INTO metadata(key,value) VALUES (?,?)", metadata.items())
 
     @staticmethod
-    def _report_from_db(
-        connection: sqlite3.Connection, *, errors: int, cancelled: bool,
-        added: int, updated: int, removed: int,
-    ) -> IndexReport:
-        nodes = int(connection.execute("SELECT COUNT(*) FROM nodes").fetchone()[0])
-        indexed = int(connection.execute("SELECT COUNT(*) FROM nodes WHERE kind='file' AND content_indexed=1").fetchone()[0])
-        skipped = int(connection.execute("SELECT COUNT(*) FROM nodes WHERE kind='file' AND content_indexed=0").fetchone()[0])
-        return IndexReport(nodes, indexed, skipped, errors, cancelled, added=added, updated=updated, removed=removed)
+    def _report_from_db(connection: sqlite3.Connection, counts: _SyncCounts, *, cancelled: bool) -> IndexReport:
+        nodes, indexed, skipped = _stored_counts(connection) or _count_nodes(connection)
+        return IndexReport(
+            nodes, indexed, skipped, counts.errors, cancelled,
+            added=counts.added, updated=counts.updated, removed=counts.removed, touched=counts.touched,
+        )
 
     @staticmethod
-    def _create_schema(connection: sqlite3.Connection) -> None:
+    def _create_schema(connection: sqlite3.Connection, prefix_lengths: Sequence[int] = DEFAULT_PREFIX_LENGTHS) -> None:
+        prefix = f"prefix='{' '.join(map(str, prefix_lengths))}'," if prefix_lengths else ""
         try:
-            connection.executescript("""
-                PRAGMA journal_mode=WAL;
+            connection.executescript(f"""
                 DROP TABLE IF EXISTS metadata;
                 DROP TABLE IF EXISTS nodes;
                 DROP TABLE IF EXISTS search;
+                DROP TABLE IF EXISTS directories;
+                DROP TABLE IF EXISTS phrases;
+                DROP TABLE IF EXISTS documents;
+                DROP VIEW IF EXISTS search_content;
                 CREATE TABLE metadata(key TEXT PRIMARY KEY,value TEXT NOT NULL);
                 CREATE TABLE nodes(
                     id INTEGER PRIMARY KEY,
                     path TEXT NOT NULL UNIQUE,
+                    parent TEXT NOT NULL,
                     name TEXT NOT NULL,
                     area TEXT NOT NULL,
                     artifact_type TEXT NOT NULL,
@@ -327,17 +1072,339 @@ class PromptBeaconIndex:
                     extension TEXT NOT NULL,
                     size INTEGER NOT NULL,
                     mtime_ns INTEGER NOT NULL,
-                    content_indexed INTEGER NOT NULL
+                    content_indexed INTEGER NOT NULL,
+                    digest TEXT NOT NULL DEFAULT ''
+                );
+                CREATE INDEX nodes_parent ON nodes(parent);
+                -- Facet filters; each index also ends in the implicit rowid, so an equality
+                -- lookup yields node ids in order and MIN/MAX(id) need no scan.
+                CREATE INDEX nodes_area ON nodes(area,artifact_type,runtime);
+                CREATE INDEX nodes_artifact_type ON nodes(artifact_type,runtime);
+                CREATE INDEX nodes_runtime ON nodes(runtime);
+                CREATE INDEX nodes_source_scope ON nodes(source_scope,area);
+                CREATE TABLE directories(
+                    path TEXT PRIMARY KEY,
+                    mtime_ns INTEGER NOT NULL,
+                    names_digest TEXT NOT NULL
                 );
+                -- Extracted bodies, zlib-compressed, one row per node with a non-empty body.
+                CREATE TABLE documents(
+                    id INTEGER PRIMARY KEY,
+                    body BLOB NOT NULL,
+                    raw_bytes INTEGER NOT NULL
+                );
+                -- `search` stores only its inverted index; snippet() and column reads go through this
+                -- view, which inflates bodies with the `prompt_beacon_inflate` connection function.
+                CREATE VIEW search_content AS
+                    SELECT n.id AS id,n.path AS path,n.name AS name,n.area AS area,n.artifact_type AS artifact_type,
+                           n.runtime AS runtime,prompt_beacon_inflate(d.body) AS body
+                    FROM nodes n LEFT JOIN documents d ON d.id=n.id;
                 CREATE VIRTUAL TABLE search USING fts5(
-                    path,name,area,artifact_type,runtime,body,tokenize='porter unicode61'
+                    path,name,area,artifact_type,runtime,body,content='search_content',content_rowid='id',{prefix}
+                    tokenize='porter unicode61'
+                );
+                -- Exact-token positions for quoted phrases: no stemming, no diacritic folding, and
+                -- '_' kept inside tokens to mirror `query.WORD_PATTERN`. Contentless as well; deletes
+                -- replay the old values from `nodes` and `documents`. All text arrives NFC-normalized.
+                CREATE VIRTUAL TABLE phrases USING fts5(
+                    path,name,body,content='',tokenize="unicode61 remove_diacritics 0 tokenchars '_'"
                 );
             """)
+            connection.execute("INSERT INTO search(search,rank) VALUES('rank',?)", (RANK_FUNCTION,))
+            connection.commit()
         except sqlite3.OperationalError as error:
             if "fts5" in str(error).casefold():
                 raise RuntimeError("Perfect Prompts requires Python SQLite with FTS5 enabled.") from error
             raise
 
 
+@contextmanager
+def _interruptible(connection: sqlite3.Connection, cancelled: Callable[[], bool] | None) -> Iterator[None]:
+    if cancelled is None:
+        yield
+        return
+    connection.set_progress_handler(lambda: int(bool(cancelled())), PROGRESS_INTERVAL)
+    try:
+        yield
+    except sqlite3.OperationalError as error:
+        if "interrupted" in str(error):
+            raise QueryInterrupted("Search was interrupted") from error
+        raise
+    finally:
+        connection.set_progress_handler(None, 0)
+
+
+def _top_k(
+    connection: sqlite3.Connection, query: _CompiledQuery, limit: int, *, after: tuple[float, str] | None = None,
+) -> list[tuple[int, float, str]]:
+    """Phase one: the ``(id, rank, path)`` of the best ``limit`` matches after ``after``, ordered by rank then path."""
+    bounded = _bounded_clauses(connection, query)
+    if bounded is None:
+        return []
+    clauses, params = bounded
+    if after is not None:
+        clauses.append("(search.rank > ? OR (search.rank = ? AND n.path > ?))")
+        params += [after[0], after[0], after[1]]
+    if query.node_clauses or after is not None:
+        return [tuple(row) for row in connection.execute(_ranked_sql(clauses, join_nodes=True), (*params, limit))]
+    # Unfiltered: rank inside FTS5 alone, keep a few spare rows, then break ties by path. If the
+    # tie at the cut-off reaches the last spare row, rows beyond it could still sort first by
+    # path, so fall back to the exact join.
+    candidates = connection.execute(_ranked_sql(clauses, join_nodes=False), (*params, limit + TOP_K_SLACK)).fetchall()
+    if len(candidates) == limit + TOP_K_SLACK and candidates[limit - 1][1] == candidates[-1][1]:
+        return [tuple(row) for row in connection.execute(_ranked_sql(clauses, join_nodes=True), (*params, limit))]
+    paths = dict(connection.execute(
+        f"SELECT id,path FROM nodes WHERE id IN ({','.join('?' * len(candidates))})", [row[0] for row in candidates],
+    ).fetchall())
+    ranked = sorted(((row[0], row[1], paths[row[0]]) for row in candidates if row[0] in paths), key=lambda row: row[1:])
+    return ranked[:limit]
+
+
+def _bounded_clauses(connection: sqlite3.Connection, query: _CompiledQuery) -> tuple[list[str], list[object]] | None:
+    """Return the query's clauses, bounded to the filtered nodes' rowid span; ``None`` when no node passes the filters."""
+    clauses, params = list(query.clauses), list(query.params)
+    if not query.node_clauses:
+        return clauses, params
+    # FTS5 re-evaluates MATCH for every rowid it is handed, so driving the join from `nodes`
+    # row by row is far slower than one FTS scan. Selective filters instead bound that scan
+    # to the rowid span of the matching nodes, found through the facet and path indexes.
+    count, low, high = connection.execute(
+        NODE_SPAN_SQL.format(where=" AND ".join(query.node_clauses)), (*query.node_params, SELECTIVE_NODE_ROWS + 1),
+    ).fetchone()
+    if count == 0:
+        return None
+    if count <= SELECTIVE_NODE_ROWS:
+        clauses.append("search.rowid BETWEEN ? AND ?")
+        params += [low, high]
+    return clauses, params
+
+
+def _ranked_sql(clauses: list[str], *, join_nodes: bool, limited: bool = True) -> str:
+    limit = " LIMIT ?" if limited else ""
+    if not join_nodes:
+        # `+` keeps the ORDER BY away from FTS5: its sorted-rank mode re-runs the query in a nested
+        # statement and sorts every match, while SQLite's sorter keeps only the LIMIT best rows.
+        return f"SELECT search.rowid,search.rank FROM search WHERE {' AND '.join(clauses)} ORDER BY +search.rank{limit}"
+    return f"""
+        SELECT search.rowid,search.rank,n.path FROM search JOIN nodes n ON n.id=search.rowid
+        WHERE {' AND '.join(clauses)} ORDER BY search.rank, n.path{limit}
+    """
+
+
+def _hit_rows(
+    connection: sqlite3.Connection, fts_expression: str, ranked: list[tuple[int, float, str]], *, snippets: bool = True,
+) -> list[sqlite3.Row]:
+    """Phase two: node columns and a snippet for the ranked rows only, returned in ranked order.
+
+    snippet() needs an FTS cursor positioned on each row. Handing FTS5 the ids one at a
+    time would re-run the MATCH per row, so a single scan is bounded to the ids' span and
+    the unary ``+`` keeps the id list out of FTS5's constraints.
+    """
+    if not ranked:
+        return []
+    ids = [row[0] for row in ranked]
+    rows = connection.execute(
+        _hit_rows_sql(len(ids), snippets=snippets), (fts_expression, min(ids), max(ids), *ids),
+    ).fetchall()
+    by_id = {row["id"]: row for row in rows}
+    return [by_id[node_id] for node_id in ids]
+
+
+def _hit_rows_sql(count: int, *, snippets: bool = True) -> str:
+    snippet = ",snippet(search,5,'<mark>','</mark>',' … ',36) AS snippet" if snippets else ""
+    return f"""
+        SELECT search.rowid AS id,n.path,n.name,n.area,n.artifact_type,n.runtime,n.source_scope,n.kind,n.extension,
+               n.content_indexed{snippet}
+        FROM search CROSS JOIN nodes n ON n.id=search.rowid
+        WHERE search MATCH ? AND search.rowid BETWEEN ? AND ? AND +search.rowid IN ({','.join('?' * count)})
+    """
+
+
+def _query_plan(connection: sqlite3.Connection, sql: str, params: Sequence[object]) -> tuple[str, ...]:
+    """EXPLAIN QUERY PLAN of ``sql`` as indented lines, the way the sqlite3 shell prints it."""
+    depth: dict[int, int] = {0: -1}
+    lines = []
+    for node, parent, _, detail in connection.execute(f"EXPLAIN QUERY PLAN {sql}", tuple(params)):
+        depth[node] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node] + detail)
+    return tuple(lines)
+
+
+def _to_hits(ranked: list[tuple[int, float, str]], rows: list[sqlite3.Row]) -> tuple[SearchHit, ...]:
+    return tuple(SearchHit(
+        path=row["path"], name=row["name"], area=row["area"], artifact_type=row["artifact_type"],
+        runtime=row["runtime"], source_scope=row["source_scope"], kind=row["kind"], extension=row["extension"],
+        content_indexed=bool(row["content_indexed"]), snippet=row["snippet"] or row["path"], rank=rank,
+    ) for (_, rank, _), row in zip(ranked, rows))
+
+
+def _clamp_limit(limit: int) -> int:
+    return max(1, min(int(limit), MAX_SEARCH_LIMIT))
+
+
+def _fingerprint(query: _CompiledQuery) -> str:
+    return hashlib.blake2b(repr(query.key).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _encode_cursor(generation: int, fingerprint: str, after: tuple[float, str]) -> str:
+    payload = json.dumps([generation, fingerprint, after[0], after[1]], ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[int, str, tuple[float, str]]:
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        generation, fingerprint, rank, path = json.loads(payload)
+        return int(generation), str(fingerprint), (float(rank), str(path))
+    except (ValueError, TypeError) as error:
+        raise ValueError("Malformed search cursor") from error
+
+
+def _node_filters(request: SearchRequest) -> tuple[list[str], list[object]]:
+    """Translate facet and path-prefix filters into index-friendly clauses over ``nodes n``."""
+    clauses: list[str] = []
+    params: list[object] = []
+    for column, value in (
+        ("area", request.area), ("artifact_type", request.artifact_type),
+        ("runtime", request.runtime), ("source_scope", request.source_scope),
+    ):
+        if value:
+            clauses.append(f"n.{column} = ?")
+            params.append(value)
+    prefix = (request.path_prefix or "").strip().replace("\\", "/").strip("/")
+    if prefix:
+        # Half-open range over the UNIQUE path index; unlike LIKE it treats '%' and '_'
+        # literally and compares case-sensitively, as the filesystem does.
+        lower, upper = _prefix_range(prefix)
+        clauses.append("n.path >= ?")
+        params.append(lower)
+        if upper is not None:
+            clauses.append("n.path < ?")
+            params.append(upper)
+    return clauses, params
+
+
+def _prefix_range(prefix: str) -> tuple[str, str | None]:
+    """Return ``(lower, upper)`` so that ``lower <= path < upper`` holds exactly for paths starting with prefix."""
+    stripped = prefix.rstrip(chr(sys.maxunicode))
+    if not stripped:
+        return prefix, None
+    following = ord(stripped[-1]) + 1
+    if 0xD800 <= following <= 0xDFFF:
+        following = 0xE000  # surrogates never occur in stored (UTF-8) paths
+    return prefix, stripped[:-1] + chr(following)
+
+
+def resolve_prefix_lengths(lengths: Iterable[int]) -> tuple[int, ...]:
+    """Normalize requested FTS5 prefix index lengths into a sorted, duplicate-free tuple."""
+    resolved = tuple(sorted({int(length) for length in lengths}))
+    if any(length < 1 or length > MAX_PREFIX_LENGTH for length in resolved):
+        raise ValueError(f"Prefix index lengths must be between 1 and {MAX_PREFIX_LENGTH}")
+    return resolved
+
+
+def _delete_search_row(connection: sqlite3.Connection, node_id: int) -> None:
+    """Remove a node's FTS entries and stored body; call before its `nodes` row changes."""
+    old = connection.execute(
+        """
+        SELECT n.path,n.name,n.area,n.artifact_type,n.runtime,d.body
+        FROM nodes n LEFT JOIN documents d ON d.id=n.id WHERE n.id=?
+        """, (node_id,),
+    ).fetchone()
+    if old is None:
+        return
+    path, name, area, artifact_type, runtime, blob = tuple(old)
+    path, name, body = searchable_text(path), searchable_text(name), _inflate(blob) or ""
+    connection.execute(
+        "INSERT INTO search(search,rowid,path,name,area,artifact_type,runtime,body) VALUES('delete',?,?,?,?,?,?,?)",
+        (node_id, path, name, area, artifact_type, runtime, body),
+    )
+    connection.execute("INSERT INTO phrases(phrases,rowid,path,name,body) VALUES('delete',?,?,?,?)", (node_id, path, name, body))
+    connection.execute("DELETE FROM documents WHERE id=?", (node_id,))
+
+
+def _pack_body(body: str) -> tuple[bytes, int]:
+    raw = body.encode("utf-8")
+    return zlib.compress(raw, DOCUMENT_COMPRESSION_LEVEL), len(raw)
+
+
+def _inflate(blob: bytes | None) -> str | None:
+    return None if blob is None else zlib.decompress(blob).decode("utf-8")
+
+
+def _register_query_functions(connection: sqlite3.Connection) -> None:
+    connection.create_function("prompt_beacon_inflate", 1, _inflate, deterministic=True)
+    connection.create_function(
+        "prompt_beacon_phrases_match", 4,
+        lambda phrases, path, name, body: int(fields_match_all_phrases(_decode_phrases(phrases), path, name, body)),
+        deterministic=True,
+    )
+
+
+def _encode_phrases(phrases: tuple[QuotedPhrase, ...]) -> str:
+    # Bound as a query parameter so one function registration serves every query on a pooled handle.
+    return "\n".join(" ".join(phrase.tokens) for phrase in phrases)
+
+
+@lru_cache(maxsize=256)
+def _decode_phrases(encoded: str) -> tuple[QuotedPhrase, ...]:
+    return tuple(QuotedPhrase(line, tuple(line.split(" "))) for line in encoded.split("\n"))
+
+
+def _generation(connection: sqlite3.Connection) -> int:
+    row = connection.execute("SELECT value FROM metadata WHERE key='generation'").fetchone()
+    return int(row[0]) if row else 0
+
+
+def _schema_version(connection: sqlite3.Connection) -> int:
+    try:
+        row = connection.execute("SELECT value FROM metadata WHERE key='schema_version'").fetchone()
+    except sqlite3.DatabaseError:
+        return 0
+    return int(row[0]) if row else 1
+
+
+def _count_nodes(connection: sqlite3.Connection) -> tuple[int, int, int]:
+    nodes = int(connection.execute("SELECT COUNT(*) FROM nodes").fetchone()[0])
+    indexed = int(connection.execute("SELECT COUNT(*) FROM nodes WHERE kind='file' AND content_indexed=1").fetchone()[0])
+    skipped = int(connection.execute("SELECT COUNT(*) FROM nodes WHERE kind='file' AND content_indexed=0").fetchone()[0])
+    return nodes, indexed, skipped
+
+
+def _stored_counts(connection: sqlite3.Connection) -> tuple[int, int, int] | None:
+    stored = dict(connection.execute(
+        "SELECT key,value FROM metadata WHERE key IN ('node_count','indexed_file_count','skipped_file_count')",
+    ).fetchall())
+    if len(stored) != 3:
+        return None
+    return int(stored["node_count"]), int(stored["indexed_file_count"]), int(stored["skipped_file_count"])
+
+
+def _insert_directory_states(connection: sqlite3.Connection, states: list[DirectoryState]) -> None:
+    connection.executemany(
+        "INSERT OR REPLACE INTO directories(path,mtime_ns,names_digest) VALUES (?,?,?)",
+        ((state.path, state.mtime_ns, state.names_digest) for state in states),
+    )
+
+
+def _flush_bulk_rows(
+    connection: sqlite3.Connection, node_rows: list[tuple[object, ...]], search_rows: list[tuple[object, ...]],
+) -> None:
+    if node_rows:
+        connection.executemany(INSERT_NODE_SQL, node_rows)
+        connection.executemany(INSERT_SEARCH_SQL, search_rows)
+        connection.executemany(INSERT_PHRASES_SQL, ((row[0], row[1], row[2], row[6]) for row in search_rows))
+        connection.executemany(INSERT_DOCUMENT_SQL, ((row[0], *_pack_body(row[6])) for row in search_rows if row[6]))
+    node_rows.clear()
+    search_rows.clear()
+
+
+def _timed(report: IndexReport, started: float, rows: int) -> IndexReport:
+    elapsed = time.perf_counter() - started
+    return replace(
+        report, duration_ms=round(elapsed * 1000, 3), rows_per_second=round(rows / elapsed, 1) if elapsed > 0 else 0.0,
+    )
+
+
 def _utc_now() -> str:
     return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
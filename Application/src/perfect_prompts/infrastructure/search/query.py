@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import re
+import unicodedata
 from collections import deque
 from dataclasses import dataclass
 from typing import Iterable
@@ -49,6 +50,19 @@ class ParsedSearchQuery:
             return f"({phrase_expression}) AND ({term_expression})"
         return phrase_expression or term_expression
 
+    @property
+    def native_phrase_expression(self) -> str | None:
+        """FTS5 expression over the exact-token `phrases` table, or ``None`` when Python must check phrases.
+
+        Each phrase must occur as a consecutive token run in one of path, name or
+        body, exactly like `fields_match_all_phrases`. Only ASCII tokens are
+        delegated, where the tokenizer and `WORD_PATTERN` agree on boundaries
+        and case folding.
+        """
+        if not self.quoted_phrases or not all(token.isascii() for phrase in self.quoted_phrases for token in phrase.tokens):
+            return None
+        return " AND ".join(f'{{path name body}} : "{" ".join(phrase.tokens)}"' for phrase in self.quoted_phrases)
+
 
 def query_terms(query: str) -> list[str]:
     raw = WORD_PATTERN.findall(query.casefold())
@@ -63,6 +77,7 @@ def query_terms(query: str) -> list[str]:
 
 
 def parse_search_query(query: str) -> ParsedSearchQuery:
+    query = searchable_text(query)
     if query.count('"') % 2:
         raise ValueError("A quoted phrase is missing its closing double quote.")
     phrases: list[QuotedPhrase] = []
@@ -80,12 +95,22 @@ def parse_search_query(query: str) -> ParsedSearchQuery:
     return ParsedSearchQuery(query, tuple(query_terms(" ".join(unquoted_parts))), tuple(phrases))
 
 
+def searchable_text(text: str) -> str:
+    """NFC form of ``text``, as indexed and queried.
+
+    The unicode61 tokenizer keeps a combining accent inside its token while
+    `WORD_PATTERN` breaks on it, so decomposed text would tokenize differently
+    in FTS5 and in the Python phrase check.
+    """
+    return text if text.isascii() else unicodedata.normalize("NFC", text)
+
+
 def normalized_word_tokens(text: str) -> tuple[str, ...]:
     return tuple(match.group(0).casefold() for match in WORD_PATTERN.finditer(text))
 
 
 def fields_match_all_phrases(phrases: Iterable[QuotedPhrase], *fields: str | None) -> bool:
-    searchable_fields = tuple(field or "" for field in fields)
+    searchable_fields = tuple(searchable_text(field or "") for field in fields)
     return all(any(_contains_token_sequence(field, phrase.tokens) for field in searchable_fields) for phrase in phrases)
 
 
@@ -0,0 +1,57 @@
+"""In-process LRU cache of search results, scoped to an index generation.
+
+Every write that changes the projection (`rebuild()`, a sync or watcher batch
+that changed rows) stores a new `generation` in the index metadata. Cache keys
+include the generation read alongside the query, so results computed against
+an older projection are never returned; they simply age out of the LRU.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Hashable
+
+from perfect_prompts.contracts.dto import SearchHit
+
+DEFAULT_MAX_ENTRIES = 512
+
+
+class QueryResultCache:
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[int, Hashable], tuple[SearchHit, ...]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, generation: int, key: Hashable) -> tuple[SearchHit, ...] | None:
+        with self._lock:
+            hits = self._entries.get((generation, key))
+            if hits is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((generation, key))
+            self.hits += 1
+            return hits
+
+    def put(self, generation: int, key: Hashable, hits: tuple[SearchHit, ...]) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[(generation, key)] = hits
+            self._entries.move_to_end((generation, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "result_cache_hits": self.hits,
+                "result_cache_misses": self.misses,
+                "result_cache_entries": len(self._entries),
+            }
@@ -0,0 +1,393 @@
+"""Optional sharded Prompt Beacon layout: one index database per library root.
+
+`ShardedPromptBeaconIndex` keeps a `PromptBeaconIndex` for each of the
+`LIBRARY_ROOT_DIRECTORIES` under ``.perfect-prompts/shards/<root>/``, each with
+its own database, extraction cache and writer. Rebuilds and syncs run the
+shards in a pool of spawned processes, and a rebuild can be limited to the
+shards whose trees changed. A search only visits the shards whose root can
+hold a node matching the request's area, artifact type, source scope and path
+prefix, runs them on a small thread pool and merges their hits with a k-way
+merge on ``(rank, path)``, the order every shard already returns them in.
+
+bm25 weighs terms by each shard's own document statistics, so scores, and the
+merged order of near ties across shards, differ slightly from a single index
+over the same library.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import heapq
+import itertools
+import json
+import shutil
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import replace
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Sequence
+
+from perfect_prompts.contracts.dto import IndexReport, QueryExplanation, SearchHit, SearchPage, SearchRequest
+from perfect_prompts.domain.classification import LIBRARY_ROOT_DIRECTORIES, library_roots_matching
+from perfect_prompts.infrastructure.metrics.index_metrics import METRICS_FILE_NAME, IndexMetrics
+from perfect_prompts.infrastructure.search.pipeline import process_pool, resolve_worker_count, spawn_context
+from perfect_prompts.infrastructure.search.profiling import merge_profiles
+from perfect_prompts.infrastructure.search.prompt_beacon import MAX_SEARCH_LIMIT, PromptBeaconIndex, QueryInterrupted
+from perfect_prompts.infrastructure.search.query import parse_search_query
+
+LAYOUTS = ("single", "sharded")
+SHARDS_DIRECTORY = "shards"
+# Threads that search different shards at once; SQLite releases the GIL while a statement runs.
+SEARCH_THREADS = 4
+# How often the parent checks ``cancelled`` while shard processes run.
+CANCEL_POLL_SECONDS = 0.1
+# Set inside shard worker processes: the pool-wide stop event behind their ``cancelled`` callback.
+_WORKER_STOP = None
+
+
+class ShardedPromptBeaconIndex:
+    """`PromptBeaconIndex`'s interface over one index per library root.
+
+    ``workers`` is the number of shard processes `sync()` uses (0 = one per
+    CPU); `rebuild()` takes its own. With one worker, shards are updated one
+    after another in this process.
+    """
+
+    def __init__(self, root: Path | str, *, workers: int = 1):
+        self.root = Path(root).expanduser().resolve()
+        self.state_directory = self.root / ".perfect-prompts"
+        self.shards_directory = self.state_directory / SHARDS_DIRECTORY
+        self.ignore_file = self.root / ".perfect-promptsignore"
+        self.workers = workers
+        self.shards = {name: shard_index(self.root, name) for name in sorted(LIBRARY_ROOT_DIRECTORIES)}
+        self.last_search_ms = 0.0
+        self.metrics = IndexMetrics(
+            tuple(shard.db_path for shard in self.shards.values()),
+            tuple(shard.cache_path for shard in self.shards.values()),
+            lambda: sum(shard.result_cache_hits for shard in self.shards.values()),
+        )
+        self.metrics_path = self.state_directory / METRICS_FILE_NAME
+        self._threads: ThreadPoolExecutor | None = None
+        self._threads_lock = threading.Lock()
+
+    def rebuild(
+        self,
+        cancelled: Callable[[], bool] | None = None,
+        *,
+        workers: int = 1,
+        prefix_lengths: Sequence[int] | None = None,
+        profile: bool = False,
+        shards: Iterable[str] | None = None,
+    ) -> IndexReport:
+        """Rebuild ``shards`` (default: all) in ``workers`` processes (0 = one per CPU).
+
+        Each shard is rebuilt sequentially inside its process and swapped in on
+        its own; a cancelled rebuild keeps the previous database of every shard
+        that had not finished.
+        """
+        names = self._names(shards)
+        started = time.perf_counter()
+        reports = self._run(
+            "rebuild", names, resolve_worker_count(workers), cancelled, prefix_lengths=prefix_lengths, profile=profile,
+        )
+        return self._finish_update(self._combined(reports, started), "rebuild")
+
+    def sync(
+        self, cancelled: Callable[[], bool] | None = None, *, full: bool = False, profile: bool = False,
+    ) -> IndexReport:
+        """Sync every shard; shards whose tree did not change only check their recorded directory state."""
+        started = time.perf_counter()
+        reports = self._run("sync", list(self.shards), resolve_worker_count(self.workers), cancelled, full=full, profile=profile)
+        return self._finish_update(self._combined(reports, started), "sync")
+
+    def apply_changes(self, paths: Iterable[str], cancelled: Callable[[], bool] | None = None) -> IndexReport:
+        """Hand each watcher path to the shard of its library root; paths outside every root are dropped."""
+        started = time.perf_counter()
+        grouped: dict[str, list[str]] = {}
+        for path in paths:
+            top = path.replace("\\", "/").strip("/").split("/", 1)[0]
+            if top in self.shards:
+                grouped.setdefault(top, []).append(path)
+        reports = {name: self.shards[name].apply_changes(grouped[name], cancelled) for name in sorted(grouped)}
+        return self._finish_update(self._combined(reports, started), "apply_changes")
+
+    def search(self, request: SearchRequest, cancelled: Callable[[], bool] | None = None) -> tuple[SearchHit, ...]:
+        parsed = parse_search_query(request.query)
+        if not parsed.fts_expression:
+            return ()
+        started = time.perf_counter()
+        try:
+            results = self._fan_out([
+                lambda shard=shard: shard.search(request, cancelled) for shard in self._shards_for(request).values()
+            ])
+        except QueryInterrupted:
+            self.metrics.interrupted.inc(match_mode=parsed.match_mode)
+            raise
+        hits = tuple(itertools.islice(heapq.merge(*results, key=_order), _clamp_limit(request.limit)))
+        elapsed = time.perf_counter() - started
+        self.last_search_ms = round(elapsed * 1000, 3)
+        self.metrics.observe_query(parsed.match_mode, elapsed)
+        return hits
+
+    def search_page(
+        self, request: SearchRequest, cursor: str | None = None, cancelled: Callable[[], bool] | None = None,
+    ) -> SearchPage:
+        """Keyset pages over the merged shards; a cursor records every shard's generation.
+
+        As with `PromptBeaconIndex.search_page`, a cursor from another request or
+        from before any searched shard changed raises ``ValueError``.
+        """
+        parsed = parse_search_query(request.query)
+        if not parsed.fts_expression:
+            return SearchPage(())
+        fingerprint = _fingerprint(request)
+        after = None
+        generations: dict[str, int] = {}
+        if cursor:
+            generations, issued_fingerprint, after = _decode_cursor(cursor)
+            if issued_fingerprint != fingerprint:
+                raise ValueError("Search cursor belongs to a different query")
+        shards = self._shards_for(request)
+        started = time.perf_counter()
+        try:
+            pages = self._fan_out([
+                lambda name=name, shard=shard: shard.page_after(request, after, cancelled, generation=generations.get(name))
+                for name, shard in shards.items()
+            ])
+        except QueryInterrupted:
+            self.metrics.interrupted.inc(match_mode=parsed.match_mode)
+            raise
+        limit = _clamp_limit(request.limit)
+        merged = list(itertools.islice(heapq.merge(*(hits for _, hits, _ in pages), key=_order), limit + 1))
+        more = len(merged) > limit or any(shard_more for _, _, shard_more in pages)
+        hits = tuple(merged[:limit])
+        self.metrics.observe_query(parsed.match_mode, time.perf_counter() - started)
+        if not more or not hits:
+            return SearchPage(hits)
+        issued = {name: generation for name, (generation, _, _) in zip(shards, pages)}
+        return SearchPage(hits, _encode_cursor(issued, fingerprint, (hits[-1].rank, hits[-1].path)))
+
+    def search_iter(self, request: SearchRequest, *, batch_size: int = 200) -> Iterator[SearchHit]:
+        """Merge every searched shard's `search_iter` stream; each holds its own read transaction."""
+        streams = [shard.search_iter(request, batch_size=batch_size) for shard in self._shards_for(request).values()]
+        return heapq.merge(*streams, key=_order)
+
+    def explain(self, request: SearchRequest) -> QueryExplanation:
+        """Explain ``request`` in every searched shard, one after another, and add the figures up.
+
+        Plans are keyed ``"<shard> rank"`` and ``"<shard> hits"``; ``shards``
+        lists the shards left after pruning.
+        """
+        shards = self._shards_for(request)
+        explanations = [shard.explain(request) for shard in shards.values()]
+        if not explanations:
+            parsed = parse_search_query(request.query)
+            return QueryExplanation(
+                request.query, parsed.match_mode, parsed.terms,
+                tuple(" ".join(phrase.tokens) for phrase in parsed.quoted_phrases), parsed.fts_expression,
+            )
+        timings: Counter[str] = Counter()
+        for explanation in explanations:
+            timings.update(explanation.timings_ms)
+        counted = [explanation.node_rows for explanation in explanations if explanation.node_rows is not None]
+        return replace(
+            explanations[0], shards=tuple(shards), rowid_span=None,
+            node_rows=sum(counted) if counted else None,
+            match_rows=sum(explanation.match_rows for explanation in explanations),
+            filtered_rows=sum(explanation.filtered_rows for explanation in explanations),
+            hits=min(_clamp_limit(request.limit), sum(explanation.hits for explanation in explanations)),
+            plans={
+                f"{name} {statement}": plan
+                for name, explanation in zip(shards, explanations) for statement, plan in explanation.plans.items()
+            },
+            timings_ms={phase: round(total, 3) for phase, total in timings.items()},
+        )
+
+    def read_content(self, relative_path: str) -> str:
+        top = relative_path.replace("\\", "/").strip("/").split("/", 1)[0]
+        shard = self.shards.get(top) or next(iter(self.shards.values()))
+        return shard.read_content(relative_path)
+
+    def status(self) -> dict[str, object]:
+        statuses = {name: shard.status() for name, shard in self.shards.items()}
+        built = [status for status in statuses.values() if status.get("exists")]
+        if not built:
+            return {"exists": False, "layout": "sharded", "database_path": str(self.shards_directory), "root": str(self.root)}
+        summed = {
+            key: sum(int(status.get(key, 0)) for status in built)
+            for key in (
+                "node_count", "indexed_file_count", "skipped_file_count", "error_count", "database_size_bytes",
+                "extraction_cache_bytes", "document_store_bytes", "document_store_raw_bytes", "result_cache_hits",
+                "result_cache_misses", "result_cache_entries",
+            )
+        }
+        area_counts: Counter[str] = Counter()
+        type_counts: Counter[str] = Counter()
+        for status in built:
+            area_counts.update(status["area_counts"])
+            type_counts.update(status["type_counts"])
+        stored, raw = summed["document_store_bytes"], summed["document_store_raw_bytes"]
+        return {
+            "exists": True, "layout": "sharded", "database_path": str(self.shards_directory), "root": str(self.root),
+            **{key: str(value) for key, value in summed.items() if key.endswith("_count")},
+            **{key: value for key, value in summed.items() if not key.endswith("_count")},
+            "area_counts": dict(sorted(area_counts.items())), "type_counts": dict(sorted(type_counts.items())),
+            "document_store_ratio": round(stored / raw, 3) if raw else 0.0,
+            "built_at": min(str(status.get("built_at", "")) for status in built),
+            "synced_at": max(str(status.get("synced_at", "")) for status in built),
+            "last_search_ms": self.last_search_ms,
+            "shards": {
+                name: {key: status.get(key) for key in ("exists", "node_count", "generation", "synced_at", "database_size_bytes")}
+                for name, status in statuses.items()
+            },
+        }
+
+    def export_query(self, request: SearchRequest, hits: tuple[SearchHit, ...]) -> str:
+        from perfect_prompts.infrastructure.search.exporter import SearchResultsExporter
+
+        exporter = SearchResultsExporter(self.root)
+        return str(exporter.write(exporter.capture(request, hits)))
+
+    def write_metrics(self) -> Path:
+        """Write the OpenMetrics text of `metrics` to ``.perfect-prompts/metrics.prom``."""
+        self.metrics.registry.write(self.metrics_path)
+        return self.metrics_path
+
+    def _names(self, shards: Iterable[str] | None) -> list[str]:
+        if shards is None:
+            return list(self.shards)
+        names = sorted(set(shards))
+        unknown = [name for name in names if name not in self.shards]
+        if unknown:
+            raise ValueError(f"Unknown shard(s) {', '.join(unknown)}; expected library roots: {', '.join(self.shards)}")
+        return names
+
+    def _shards_for(self, request: SearchRequest) -> dict[str, PromptBeaconIndex]:
+        """The shards whose library root can hold a hit for ``request``, in name order."""
+        roots = library_roots_matching(request.area, request.artifact_type, request.source_scope, request.path_prefix)
+        return {name: shard for name, shard in self.shards.items() if name in roots}
+
+    def _fan_out(self, calls: list[Callable[[], object]]) -> list:
+        if len(calls) <= 1:
+            return [call() for call in calls]
+        with self._threads_lock:
+            if self._threads is None:
+                self._threads = ThreadPoolExecutor(max_workers=SEARCH_THREADS, thread_name_prefix="shard-search")
+        futures = [self._threads.submit(call) for call in calls]
+        return [future.result() for future in futures]
+
+    def _run(
+        self, operation: str, names: list[str], processes: int, cancelled: Callable[[], bool] | None, **options,
+    ) -> dict[str, IndexReport]:
+        """Run ``operation`` ("rebuild" or "sync") on each named shard, in parallel processes when asked to."""
+        if processes <= 1 or len(names) <= 1:
+            return {name: getattr(self.shards[name], operation)(cancelled, **options) for name in names}
+        stop = spawn_context().Event()
+        with process_pool(min(processes, len(names)), initializer=_start_worker, initargs=(stop,)) as executor:
+            futures = {name: executor.submit(_run_shard, str(self.root), name, operation, options) for name in names}
+            pending = set(futures.values())
+            while pending:
+                _, pending = wait(pending, timeout=CANCEL_POLL_SECONDS)
+                if cancelled is not None and not stop.is_set() and cancelled():
+                    stop.set()
+            return {name: future.result() for name, future in futures.items()}
+
+    def _combined(self, reports: dict[str, IndexReport], started: float) -> IndexReport:
+        """One report for the whole library; shards that did not take part contribute their node counts."""
+        elapsed = time.perf_counter() - started
+        values = list(reports.values())
+        rows = sum(report.rows_per_second * report.duration_ms / 1000 for report in values)
+        idle_nodes = sum(shard.node_count() for name, shard in self.shards.items() if name not in reports)
+        return IndexReport(
+            nodes=sum(report.nodes for report in values) + idle_nodes,
+            indexed_files=sum(report.indexed_files for report in values),
+            skipped_files=sum(report.skipped_files for report in values),
+            errors=sum(report.errors for report in values),
+            cancelled=any(report.cancelled for report in values),
+            added=sum(report.added for report in values),
+            updated=sum(report.updated for report in values),
+            removed=sum(report.removed for report in values),
+            touched=sum(report.touched for report in values),
+            duration_ms=round(elapsed * 1000, 3),
+            rows_per_second=round(rows / elapsed, 1) if elapsed > 0 else 0.0,
+            profile=merge_profiles(report.profile for report in values),
+        )
+
+    def _finish_update(self, report: IndexReport, operation: str) -> IndexReport:
+        self.metrics.observe_update(operation, report)
+        try:
+            self.write_metrics()
+        except OSError:
+            pass
+        return report
+
+
+def shard_index(root: Path, name: str) -> PromptBeaconIndex:
+    """The `PromptBeaconIndex` holding library root ``name`` of a sharded layout."""
+    return PromptBeaconIndex(root, library_roots=(name,), state_directory=root / ".perfect-prompts" / SHARDS_DIRECTORY / name)
+
+
+def current_layout(root: Path) -> str:
+    return "sharded" if (root / ".perfect-prompts" / SHARDS_DIRECTORY).is_dir() else "single"
+
+
+def open_index(
+    root: Path | str, layout: str | None = None, *, workers: int = 1,
+) -> PromptBeaconIndex | ShardedPromptBeaconIndex:
+    """The index of ``root`` in ``layout``, or in the layout ``root`` already uses.
+
+    ``workers`` only applies to the sharded layout, as its `sync()` process count.
+    """
+    root = Path(root).expanduser().resolve()
+    layout = layout or current_layout(root)
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown index layout {layout!r}; expected one of {', '.join(LAYOUTS)}")
+    return ShardedPromptBeaconIndex(root, workers=workers) if layout == "sharded" else PromptBeaconIndex(root)
+
+
+def discard_layout(root: Path, layout: str) -> None:
+    """Delete the index databases of ``layout``, after switching to the other one; extraction caches stay."""
+    state = Path(root) / ".perfect-prompts"
+    if layout == "sharded":
+        shutil.rmtree(state / SHARDS_DIRECTORY, ignore_errors=True)
+        return
+    for suffix in ("", "-wal", "-shm"):
+        (state / f"index.sqlite3{suffix}").unlink(missing_ok=True)
+
+
+def _start_worker(stop) -> None:
+    global _WORKER_STOP
+    _WORKER_STOP = stop
+
+
+def _run_shard(root: str, name: str, operation: str, options: dict) -> IndexReport:
+    return getattr(shard_index(Path(root), name), operation)(_WORKER_STOP.is_set, **options)
+
+
+def _order(hit: SearchHit) -> tuple[float, str]:
+    return hit.rank, hit.path
+
+
+def _clamp_limit(limit: int) -> int:
+    return max(1, min(int(limit), MAX_SEARCH_LIMIT))
+
+
+def _fingerprint(request: SearchRequest) -> str:
+    return hashlib.blake2b(repr(replace(request, limit=0)).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _encode_cursor(generations: dict[str, int], fingerprint: str, after: tuple[float, str]) -> str:
+    payload = json.dumps([generations, fingerprint, after[0], after[1]], ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[dict[str, int], str, tuple[float, str]]:
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        generations, fingerprint, rank, path = json.loads(payload)
+        return {str(name): int(value) for name, value in generations.items()}, str(fingerprint), (float(rank), str(path))
+    except (ValueError, TypeError, AttributeError) as error:
+        raise ValueError("Malformed search cursor") from error
@@ -0,0 +1,129 @@
+"""`os.scandir`-based library walker shared by rebuild and sync.
+
+Each directory is read once with `os.scandir`; file type comes from the
+directory entry itself and the only per-entry syscall is one `lstat` for size
+and modification time. Consumers receive a compact `WalkEntry` and never touch
+the path again unless they need its bytes.
+"""
+
+from __future__ import annotations
+
+import os
+import stat as stat_module
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import Callable, Iterator
+
+from perfect_prompts.domain.classification import is_library_relative_path
+from perfect_prompts.infrastructure.search.ignore import IgnoreMatcher
+
+
+@dataclass(frozen=True, slots=True)
+class WalkEntry:
+    relative: str
+    name: str
+    kind: str
+    size: int
+    mtime_ns: int
+    error: bool = False
+
+    @property
+    def parent(self) -> str:
+        return self.relative.rpartition("/")[0]
+
+    @property
+    def extension(self) -> str:
+        return PurePosixPath(self.name).suffix.casefold() if self.kind == "file" else ""
+
+
+def walk_library(
+    root: Path,
+    matcher: IgnoreMatcher,
+    *,
+    start: str = "",
+    on_directory: Callable[[str, list[WalkEntry]], None] | None = None,
+) -> Iterator[WalkEntry]:
+    """Yield visible library entries depth-first, directories before files, names case-folded.
+
+    ``start`` walks only the subtree below one root-relative directory.
+    ``on_directory`` observes each directory's complete visible listing before
+    its entries are yielded.
+    """
+    stack = [start]
+    while stack:
+        directory = stack.pop()
+        children: list[str] = []
+        entries = scan_directory(root, directory, matcher)
+        if on_directory is not None:
+            on_directory(directory, entries)
+        for entry in entries:
+            yield entry
+            if entry.kind == "directory":
+                children.append(entry.relative)
+        stack.extend(reversed(children))
+
+
+def scan_directory(root: Path, relative_directory: str, matcher: IgnoreMatcher) -> list[WalkEntry]:
+    """Return the visible, ordered entries of one directory (empty when unreadable)."""
+    prefix = f"{relative_directory}/" if relative_directory else ""
+    try:
+        with os.scandir(root / relative_directory if relative_directory else root) as iterator:
+            raw = list(iterator)
+    except OSError:
+        return []
+    ordered: list[tuple[bool, str, os.DirEntry[str]]] = []
+    for entry in raw:
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+        ordered.append((not is_dir, entry.name.casefold(), entry))
+    ordered.sort(key=lambda item: (item[0], item[1]))
+    entries: list[WalkEntry] = []
+    for not_dir, _, entry in ordered:
+        relative = prefix + entry.name
+        if matcher.ignored_relative(relative, not not_dir):
+            continue
+        try:
+            if entry.is_symlink():
+                kind = "symlink"
+            elif entry.is_dir(follow_symlinks=False):
+                kind = "directory"
+            elif entry.is_file(follow_symlinks=False):
+                kind = "file"
+            else:
+                # FIFOs, sockets and devices are never library artifacts and could block a reader.
+                continue
+            stat = entry.stat(follow_symlinks=False)
+        except OSError:
+            entries.append(WalkEntry(relative, entry.name, "file", 0, 0, error=True))
+            continue
+        entries.append(WalkEntry(relative, entry.name, kind, stat.st_size if kind == "file" else 0, stat.st_mtime_ns))
+    return entries
+
+
+def stat_entry(root: Path, relative: str, matcher: IgnoreMatcher) -> WalkEntry | None:
+    """Describe one root-relative path the way the walker would, or ``None`` if it is gone or hidden."""
+    if not is_library_relative_path(relative):
+        return None
+    parts = relative.split("/")
+    for depth in range(1, len(parts)):
+        if matcher.ignored_relative("/".join(parts[:depth]), True):
+            return None
+    path = root / relative
+    try:
+        stat = os.lstat(path)
+    except OSError:
+        return None
+    mode = stat.st_mode
+    if stat_module.S_ISLNK(mode):
+        kind, is_dir = "symlink", os.path.isdir(path)
+    elif stat_module.S_ISDIR(mode):
+        kind, is_dir = "directory", True
+    elif stat_module.S_ISREG(mode):
+        kind, is_dir = "file", False
+    else:
+        return None
+    if matcher.ignored_relative(relative, is_dir):
+        return None
+    return WalkEntry(relative, parts[-1], kind, stat.st_size if kind == "file" else 0, stat.st_mtime_ns)
@@ -0,0 +1,71 @@
+"""Thin client for ``perfect-prompts-cli serve``.
+
+Kept to the standard library and the contract DTOs so that
+``perfect-prompts-cli query --server`` does not import the index, SQLite
+helpers or extractors it never uses.
+"""
+
+from __future__ import annotations
+
+import http.client
+import json
+import os
+import socket
+from dataclasses import asdict
+
+from perfect_prompts.contracts.dto import SearchHit, SearchRequest
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+
+class QueryServiceError(RuntimeError):
+    """Raised by `QueryClient` when the server rejects a request or cannot be reached."""
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class QueryClient:
+    """Thin client for `serve`. ``address`` is ``host:port``, ``:port``, or a Unix socket path."""
+
+    def __init__(self, address: str, *, timeout: float = 30):
+        self.address = address
+        self.timeout = timeout
+
+    def status(self) -> dict:
+        return self.request("GET", "/status")
+
+    def search(self, request: SearchRequest) -> tuple[tuple[SearchHit, ...], dict]:
+        body = self.request("POST", "/query", asdict(request))
+        return tuple(SearchHit(**hit) for hit in body["hits"]), body
+
+    def request(self, method: str, path: str, payload: dict | None = None) -> dict:
+        connection = self._connection()
+        try:
+            data = json.dumps(payload).encode("utf-8") if payload is not None else None
+            headers = {"Content-Type": "application/json"} if data is not None else {}
+            connection.request(method, path, body=data, headers=headers)
+            response = connection.getresponse()
+            body = json.loads(response.read() or b"{}")
+        except OSError as error:
+            raise QueryServiceError(f"Query server at {self.address} is unavailable: {error}") from error
+        finally:
+            connection.close()
+        if response.status != 200:
+            raise QueryServiceError(body.get("error") or f"HTTP {response.status}")
+        return body
+
+    def _connection(self) -> http.client.HTTPConnection:
+        if "/" in self.address or os.sep in self.address:
+            return _UnixHTTPConnection(self.address, self.timeout)
+        host, _, port = self.address.rpartition(":")
+        return http.client.HTTPConnection(host or DEFAULT_HOST, int(port), timeout=self.timeout)
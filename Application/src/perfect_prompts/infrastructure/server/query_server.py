@@ -0,0 +1,236 @@
+"""Long-lived local JSON query server for Prompt Beacon, using only the standard library.
+
+A one-shot ``perfect-prompts-cli query`` pays interpreter startup, imports, a
+connection open and a cold page cache on every call. `serve` keeps one index
+(`PromptBeaconIndex` or `ShardedPromptBeaconIndex`) hot instead and answers
+small JSON requests over localhost HTTP or a Unix domain socket; both
+transports speak the same HTTP/1.0 protocol.
+
+Requests are handled by a fixed pool of worker threads rather than a thread
+per connection, so each worker keeps its pooled read-only handle and page
+cache across requests. The pool already reopens handles when `rebuild()`
+swaps the database file, so a server picks up a rebuild done by another
+process on its next query.
+
+    GET  /status
+    GET  /metrics  (OpenMetrics text)
+    POST /query    {"query": "...", "area": ..., "limit": 40}
+    POST /page     {"query": "...", "limit": 100, "cursor": null}
+    POST /batch    {"queries": ["...", ...], "limit": 40}  or  {"text": "a, b"}
+    POST /explain  {"query": "...", "path_prefix": ...}
+    POST /preview  {"path": "Prompts/..."}
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import socketserver
+import stat
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, fields
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+from typing import Callable
+
+from perfect_prompts.application.use_cases.batch_query import split_batch_queries
+from perfect_prompts.contracts.dto import SearchHit, SearchRequest
+from perfect_prompts.infrastructure.metrics.registry import OPENMETRICS_CONTENT_TYPE
+from perfect_prompts.infrastructure.search.prompt_beacon import PromptBeaconIndex
+from perfect_prompts.infrastructure.search.sharded import ShardedPromptBeaconIndex
+from perfect_prompts.infrastructure.server.client import DEFAULT_HOST, DEFAULT_PORT
+
+DEFAULT_WORKERS = 8
+MAX_REQUEST_BYTES = 1024 * 1024
+REQUEST_FIELDS = frozenset(field.name for field in fields(SearchRequest))
+HIT_FIELDS = tuple(field.name for field in fields(SearchHit))
+
+
+class QueryService:
+    """Route table for the server: each handler takes a JSON object and returns one."""
+
+    def __init__(self, index: PromptBeaconIndex | ShardedPromptBeaconIndex):
+        self.index = index
+        self.routes: dict[tuple[str, str], Callable[[dict], dict]] = {
+            ("GET", "/status"): lambda payload: self.index.status(),
+            ("POST", "/query"): self.query,
+            ("POST", "/page"): self.page,
+            ("POST", "/batch"): self.batch,
+            ("POST", "/explain"): lambda payload: asdict(self.index.explain(search_request(payload))),
+            ("POST", "/preview"): self.preview,
+        }
+
+    def query(self, payload: dict) -> dict:
+        request = search_request(payload)
+        started = time.perf_counter()
+        hits = self.index.search(request)
+        elapsed = (time.perf_counter() - started) * 1000
+        return {"root": str(self.index.root), "elapsed_ms": round(elapsed, 3), "hits": _hit_rows(hits)}
+
+    def page(self, payload: dict) -> dict:
+        payload = dict(payload)
+        cursor = payload.pop("cursor", None)
+        page = self.index.search_page(search_request(payload), cursor)
+        return {"hits": _hit_rows(page.hits), "cursor": page.cursor}
+
+    def batch(self, payload: dict) -> dict:
+        payload = dict(payload)
+        queries = payload.pop("queries", None)
+        text = payload.pop("text", None)
+        if queries is None:
+            queries = split_batch_queries(str(text or ""))
+        if not isinstance(queries, list) or not all(isinstance(query, str) for query in queries):
+            raise ValueError("'queries' must be a list of strings")
+        results = []
+        for query in queries:
+            try:
+                hits = self.index.search(search_request({**payload, "query": query}))
+                results.append({"query": query, "hits": _hit_rows(hits), "error": None})
+            except (ValueError, RuntimeError, OSError) as error:
+                results.append({"query": query, "hits": [], "error": str(error)})
+        return {"results": results}
+
+    def preview(self, payload: dict) -> dict:
+        path = payload.get("path")
+        if not isinstance(path, str) or not path:
+            raise ValueError("'path' is required")
+        return {"path": path, "content": self.index.read_content(path)}
+
+
+def _hit_rows(hits) -> list[dict[str, object]]:
+    # dataclasses.asdict deep-copies every field and costs more than a cached search.
+    return [{name: getattr(hit, name) for name in HIT_FIELDS} for hit in hits]
+
+
+def search_request(payload: dict) -> SearchRequest:
+    unknown = set(payload) - REQUEST_FIELDS
+    if unknown:
+        raise ValueError(f"Unknown request field(s): {', '.join(sorted(unknown))}")
+    if not isinstance(payload.get("query"), str):
+        raise ValueError("'query' must be a string")
+    if not isinstance(payload.get("limit", 0), int):
+        raise ValueError("'limit' must be an integer")
+    return SearchRequest(**payload)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "PerfectPromptsQueryServer"
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:
+        self._dispatch("POST")
+
+    def _dispatch(self, method: str) -> None:
+        if method == "GET" and self.path.split("?", 1)[0] == "/metrics":
+            self._send(200, self.server.service.index.metrics.render().encode("utf-8"), OPENMETRICS_CONTENT_TYPE)
+            return
+        route = self.server.service.routes.get((method, self.path.split("?", 1)[0]))
+        if route is None:
+            self._reply(404, {"error": f"No route for {method} {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            if length > MAX_REQUEST_BYTES:
+                raise ValueError("Request body is too large")
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(payload, dict):
+                raise ValueError("Request body must be a JSON object")
+            self._reply(200, route(payload))
+        except (ValueError, TypeError) as error:
+            self._reply(400, {"error": str(error)})
+        except Exception as error:  # noqa: BLE001 - a failing query must not take the server down
+            self._reply(500, {"error": f"{type(error).__name__}: {error}"})
+
+    def _reply(self, status: int, body: dict) -> None:
+        self._send(status, json.dumps(body, ensure_ascii=False, default=str).encode("utf-8"))
+
+    def _send(self, status: int, data: bytes, content_type: str = "application/json; charset=utf-8") -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def address_string(self) -> str:
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+class _WorkerPoolMixIn(socketserver.ThreadingMixIn):
+    """Serve connections on a fixed thread pool so every worker keeps a warm read handle."""
+
+    def __init__(self, address, handler, *, service: QueryService, workers: int) -> None:
+        self.service = service
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="perfect-prompts-serve")
+        super().__init__(address, handler)
+
+    def process_request(self, request, client_address) -> None:
+        self._pool.submit(self.process_request_thread, request, client_address)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self._pool.shutdown(wait=True)
+
+
+class _TCPQueryServer(_WorkerPoolMixIn, socketserver.TCPServer):
+    allow_reuse_address = True
+
+    def get_request(self):
+        # Headers and body go out in separate writes; without TCP_NODELAY the
+        # second waits on the client's delayed ACK.
+        connection, address = super().get_request()
+        connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return connection, address
+
+
+class _UnixQueryServer(_WorkerPoolMixIn, socketserver.UnixStreamServer):
+    def server_close(self) -> None:
+        super().server_close()
+        Path(self.server_address).unlink(missing_ok=True)
+
+
+def create_server(
+    index: PromptBeaconIndex | ShardedPromptBeaconIndex,
+    *,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    socket_path: Path | None = None,
+    workers: int = DEFAULT_WORKERS,
+) -> socketserver.BaseServer:
+    """Bind a query server; call ``serve_forever()`` on the result and ``server_close()`` when done.
+
+    A ``socket_path`` selects a Unix domain socket (created mode 0600) instead of TCP.
+    A stale socket file left by a crashed server is replaced; a live one is an error.
+    """
+    if workers < 1:
+        raise ValueError("workers must be a positive integer")
+    service = QueryService(index)
+    if socket_path is not None:
+        socket_path = Path(socket_path)
+        if socket_path.exists():
+            if not stat.S_ISSOCK(socket_path.stat().st_mode):
+                raise ValueError(f"{socket_path} exists and is not a socket")
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                if probe.connect_ex(str(socket_path)) == 0:
+                    raise ValueError(f"A server is already listening on {socket_path}")
+            socket_path.unlink()
+        umask = os.umask(0o177)
+        try:
+            return _UnixQueryServer(str(socket_path), _Handler, service=service, workers=workers)
+        finally:
+            os.umask(umask)
+    return _TCPQueryServer((host, port), _Handler, service=service, workers=workers)
+
+
+def server_address(server: socketserver.BaseServer) -> str:
+    """The address a client passes to `QueryClient`: ``host:port`` or the socket path."""
+    if isinstance(server.server_address, tuple):
+        host, port = server.server_address[:2]
+        return f"{host}:{port}"
+    return str(server.server_address)
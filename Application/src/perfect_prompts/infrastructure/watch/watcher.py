@@ -0,0 +1,221 @@
+"""Filesystem watcher that keeps the Prompt Beacon index current between syncs.
+
+On Linux every visible library directory gets an inotify watch; bursts of
+events are collapsed into a set of root-relative paths and applied with
+`PromptBeaconIndex.apply_changes` once the burst goes quiet. A queue overflow,
+an edited ignore file or a failed update falls back to a full sync. Where
+inotify is unavailable, or the per-user watch limit is exhausted, the watcher
+polls with `sync(full=True)` instead: the pruned sync would miss files
+rewritten in place, which no event announces.
+"""
+
+from __future__ import annotations
+
+import errno
+import threading
+import time
+from typing import Callable
+
+from perfect_prompts.contracts.dto import IndexReport
+from perfect_prompts.domain.classification import LIBRARY_ROOT_DIRECTORIES
+from perfect_prompts.infrastructure.search.ignore import IgnoreMatcher
+from perfect_prompts.infrastructure.search.prompt_beacon import PromptBeaconIndex
+from perfect_prompts.infrastructure.search.walker import walk_library
+from perfect_prompts.infrastructure.watch.inotify import (
+    IN_CREATE,
+    IN_DELETE_SELF,
+    IN_IGNORED,
+    IN_MOVE_SELF,
+    IN_MOVED_FROM,
+    IN_MOVED_TO,
+    IN_Q_OVERFLOW,
+    Inotify,
+)
+
+BACKENDS = ("auto", "inotify", "polling")
+# Upper bound on how long the watcher waits before checking whether it was stopped.
+_IDLE_SECONDS = 0.5
+
+
+class _WatchLimitReached(Exception):
+    pass
+
+
+class LibraryWatcher:
+    def __init__(
+        self,
+        index: PromptBeaconIndex,
+        *,
+        backend: str = "auto",
+        debounce_seconds: float = 0.3,
+        max_delay_seconds: float = 2.0,
+        poll_seconds: float = 5.0,
+    ) -> None:
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown watch backend {backend!r}; expected one of {', '.join(BACKENDS)}")
+        if backend == "inotify" and not Inotify.available():
+            raise RuntimeError("inotify is not available on this platform")
+        self.index = index
+        self.backend = "inotify" if backend != "polling" and Inotify.available() else "polling"
+        self.debounce_seconds = debounce_seconds
+        self.max_delay_seconds = max(max_delay_seconds, debounce_seconds)
+        self.poll_seconds = poll_seconds
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._watches: dict[int, str] = {}
+
+    def start(
+        self,
+        on_report: Callable[[IndexReport], None],
+        on_error: Callable[[BaseException], None] | None = None,
+    ) -> str:
+        """Run the watcher on a daemon thread and return the backend in use."""
+        if self._thread is not None and self._thread.is_alive():
+            return self.backend
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self.run, args=(on_report, on_error), name="perfect-prompts-watch", daemon=True,
+        )
+        self._thread.start()
+        return self.backend
+
+    def stop(self, timeout: float | None = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def run(
+        self,
+        on_report: Callable[[IndexReport], None],
+        on_error: Callable[[BaseException], None] | None = None,
+    ) -> None:
+        """Watch until `stop()` is called; blocks the calling thread."""
+        if self.backend == "inotify":
+            try:
+                self._run_inotify(on_report, on_error)
+            except _WatchLimitReached:
+                self.backend = "polling"
+        if self.backend == "polling" and not self._stop.is_set():
+            self._run_polling(on_report, on_error)
+
+    def _run_polling(self, on_report, on_error) -> None:
+        while not self._stop.is_set():
+            self._deliver(
+                lambda: self.index.sync(cancelled=self._stop.is_set, full=True), on_report, on_error, quiet=True,
+            )
+            self._stop.wait(self.poll_seconds)
+
+    def _run_inotify(self, on_report, on_error) -> None:
+        inotify = Inotify()
+        try:
+            matcher = self._watch_library(inotify)
+            # Catch up on anything that changed before the watches existed.
+            self._deliver(lambda: self.index.sync(cancelled=self._stop.is_set), on_report, on_error, quiet=True)
+            pending: set[str] = set()
+            resync = False
+            first_at = last_at = 0.0
+            while not self._stop.is_set():
+                timeout = _IDLE_SECONDS
+                if pending or resync:
+                    now = time.monotonic()
+                    timeout = max(0.0, min(last_at + self.debounce_seconds, first_at + self.max_delay_seconds) - now)
+                events = inotify.read(min(timeout, _IDLE_SECONDS))
+                if events:
+                    now = time.monotonic()
+                    if not pending and not resync:
+                        first_at = now
+                    last_at = now
+                for event in events:
+                    if event.mask & IN_Q_OVERFLOW:
+                        resync = True
+                        continue
+                    directory = self._watches.get(event.wd)
+                    if event.mask & IN_IGNORED:
+                        self._watches.pop(event.wd, None)
+                        continue
+                    if directory is None:
+                        continue
+                    if not event.name:
+                        if event.mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                            if directory:
+                                pending.add(directory)
+                            else:
+                                resync = True
+                        continue
+                    relative = f"{directory}/{event.name}" if directory else event.name
+                    if not directory and relative == self.index.ignore_file.name:
+                        resync = True
+                        continue
+                    if not directory and event.name not in LIBRARY_ROOT_DIRECTORIES:
+                        continue
+                    pending.add(relative)
+                    if event.is_dir and event.mask & IN_MOVED_FROM:
+                        self._unwatch_subtree(inotify, relative)
+                    elif event.is_dir and event.mask & (IN_CREATE | IN_MOVED_TO):
+                        self._watch_subtree(inotify, matcher, relative)
+                if not (pending or resync):
+                    continue
+                now = time.monotonic()
+                if now - last_at < self.debounce_seconds and now - first_at < self.max_delay_seconds:
+                    continue
+                if resync:
+                    inotify.close()
+                    self._watches.clear()
+                    inotify = Inotify()
+                    matcher = self._watch_library(inotify)
+                    work = lambda: self.index.sync(cancelled=self._stop.is_set, full=True)
+                else:
+                    paths = tuple(pending)
+                    work = lambda: self.index.apply_changes(paths, cancelled=self._stop.is_set)
+                pending.clear()
+                resync = not self._deliver(work, on_report, on_error)
+                first_at = last_at = time.monotonic()
+        finally:
+            inotify.close()
+            self._watches.clear()
+
+    def _watch_library(self, inotify: Inotify) -> IgnoreMatcher:
+        matcher = IgnoreMatcher(self.index.root, self.index.ignore_file)
+        self._add_watch(inotify, "")
+        self._watch_subtree(inotify, matcher, "")
+        return matcher
+
+    def _watch_subtree(self, inotify: Inotify, matcher: IgnoreMatcher, relative: str) -> None:
+        if relative:
+            self._add_watch(inotify, relative)
+        for entry in walk_library(self.index.root, matcher, start=relative):
+            if entry.kind == "directory" and not entry.error:
+                self._add_watch(inotify, entry.relative)
+
+    def _add_watch(self, inotify: Inotify, relative: str) -> None:
+        try:
+            wd = inotify.add_watch(self.index.root / relative if relative else self.index.root)
+        except OSError as error:
+            if error.errno == errno.ENOSPC:
+                raise _WatchLimitReached() from error
+            # Vanished before the watch was placed; its deletion is already queued.
+            return
+        self._watches[wd] = relative
+
+    def _unwatch_subtree(self, inotify: Inotify, relative: str) -> None:
+        lower, upper = f"{relative}/", f"{relative}0"
+        for wd, path in list(self._watches.items()):
+            if path == relative or lower <= path < upper:
+                inotify.remove_watch(wd)
+                del self._watches[wd]
+
+    def _deliver(self, work, on_report, on_error, *, quiet: bool = False) -> bool:
+        try:
+            report = work()
+        except Exception as error:
+            if on_error is not None:
+                on_error(error)
+            return False
+        if not report.cancelled and (not quiet or report.added + report.updated + report.removed + report.touched):
+            on_report(report)
+        return True
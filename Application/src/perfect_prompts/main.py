@@ -15,6 +15,9 @@ def main(argv: list[str] | None = None) -> int:
     parser = argparse.ArgumentParser(prog="perfect-prompts", add_help=True)
     parser.add_argument("--root", type=Path, default=None, help="Perfect Prompts repository root to open")
     parser.add_argument("--version", action="version", version=f"Perfect Prompts {__version__}")
+    parser.add_argument(
+        "--metrics-port", type=int, default=None, help="Serve OpenMetrics at http://127.0.0.1:PORT/metrics while open",
+    )
     parser.add_argument("--smoke-test", action="store_true", help=argparse.SUPPRESS)
     args, qt_args = parser.parse_known_args(argv)
     try:
@@ -64,7 +67,11 @@ def main(argv: list[str] | None = None) -> int:
             return 0
         root = Path(selected)
     dispatcher = GuiDispatcher()
-    window = MainWindow(root, lambda selected_root: build_container(selected_root, dispatcher.post), settings.save_last_root)
+    window = MainWindow(
+        root,
+        lambda selected_root: build_container(selected_root, dispatcher.post, metrics_port=args.metrics_port),
+        settings.save_last_root,
+    )
     window.show()
     return app.exec()
 
@@ -7,6 +7,7 @@ from typing import Callable
 
 from perfect_prompts.application.use_cases.add_artifact import AddArtifact
 from perfect_prompts.application.use_cases.batch_query import BatchQuery
+from perfect_prompts.application.use_cases.explain_query import ExplainQuery
 from perfect_prompts.application.use_cases.export_query import ExportQuery
 from perfect_prompts.application.use_cases.get_index_status import GetIndexStatus
 from perfect_prompts.application.use_cases.preview_artifact import PreviewArtifact
@@ -17,14 +18,15 @@ from perfect_prompts.application.use_cases.sync_index import SyncIndex
 from perfect_prompts.contracts.dto import (
     AddArtifactReceipt,
     AddArtifactRequest,
-    BatchQueryResult,
+    BatchQueryReport,
     IndexReport,
+    QueryExplanation,
     RemoveArtifactReceipt,
     RemoveArtifactRequest,
     SearchHit,
     SearchRequest,
 )
-from perfect_prompts.contracts.ports import TaskRunnerPort
+from perfect_prompts.contracts.ports import LibraryWatcherPort, MetricsEndpointPort, TaskRunnerPort
 
 
 class LibraryController:
@@ -40,8 +42,12 @@ class LibraryController:
         preview: PreviewArtifact,
         status: GetIndexStatus,
         export: ExportQuery,
+        explain: ExplainQuery,
         runner: TaskRunnerPort,
         dispatch: Callable[[Callable[[], None]], None],
+        watcher: LibraryWatcherPort | None = None,
+        metrics: MetricsEndpointPort | None = None,
+        on_close: Callable[[], object] | None = None,
     ) -> None:
         self.root = root
         self._search = search
@@ -53,13 +59,20 @@ class LibraryController:
         self._preview = preview
         self._status = status
         self._export = export
+        self._explain = explain
         self._runner = runner
         self._dispatch = dispatch
+        self._watcher = watcher
+        self._metrics = metrics
+        self._on_close = on_close
         self._index_handle = None
 
     def search(self, request: SearchRequest) -> tuple[SearchHit, ...]:
         return self._search.execute(request)
 
+    def explain(self, request: SearchRequest) -> QueryExplanation:
+        return self._explain.execute(request)
+
     def preview(self, relative_path: str) -> str:
         return self._preview.execute(relative_path)
 
@@ -75,11 +88,26 @@ class LibraryController:
     def export_query(self, request: SearchRequest, hits: tuple[SearchHit, ...]) -> str:
         return self._export.execute(request, hits)
 
-    def rebuild_index(self, callback: Callable[[IndexReport | None, BaseException | None], None]) -> None:
-        self._run_index_work(lambda token: self._rebuild.execute(cancelled=lambda: token.is_cancelled), callback)
+    def rebuild_index(
+        self,
+        callback: Callable[[IndexReport | None, BaseException | None], None],
+        workers: int = 1,
+        profile: bool = False,
+    ) -> None:
+        self._run_index_work(
+            lambda token: self._rebuild.execute(cancelled=lambda: token.is_cancelled, workers=workers, profile=profile),
+            callback,
+        )
 
-    def sync_index(self, callback: Callable[[IndexReport | None, BaseException | None], None]) -> None:
-        self._run_index_work(lambda token: self._sync.execute(cancelled=lambda: token.is_cancelled), callback)
+    def sync_index(
+        self,
+        callback: Callable[[IndexReport | None, BaseException | None], None],
+        full: bool = False,
+        profile: bool = False,
+    ) -> None:
+        self._run_index_work(
+            lambda token: self._sync.execute(cancelled=lambda: token.is_cancelled, full=full, profile=profile), callback,
+        )
 
     def _run_index_work(self, work, callback) -> None:
         if self._index_handle is not None and not self._index_handle.is_done:
@@ -89,15 +117,34 @@ class LibraryController:
             lambda result, error: self._dispatch(lambda: callback(result, error)),
         )
 
+    @property
+    def watch_backend(self) -> str | None:
+        return self._watcher.backend if self._watcher is not None else None
+
+    def start_watching(self, callback: Callable[[IndexReport | None, BaseException | None], None]) -> str | None:
+        """Apply filesystem changes as they happen; ``callback`` runs on the GUI thread per applied batch."""
+        if self._watcher is None:
+            return None
+        return self._watcher.start(
+            lambda report: self._dispatch(lambda: callback(report, None)),
+            lambda error: self._dispatch(lambda: callback(None, error)),
+        )
+
     def run_batch(
         self,
         text: str,
-        callback: Callable[[tuple[BatchQueryResult, ...] | None, BaseException | None], None],
+        callback: Callable[[BatchQueryReport | None, BaseException | None], None],
     ) -> None:
         self._runner.submit(
-            lambda token: self._batch.execute(text),
+            lambda token: self._batch.run(text),
             lambda result, error: self._dispatch(lambda: callback(result, error)),
         )
 
     def close(self) -> None:
+        if self._watcher is not None:
+            self._watcher.stop()
         self._runner.shutdown(wait=True)
+        if self._metrics is not None:
+            self._metrics.close()
+        if self._on_close is not None:
+            self._on_close()
@@ -2,19 +2,19 @@
 
 from __future__ import annotations
 
+import os
+from dataclasses import asdict
 from pathlib import Path
 
 from PySide6.QtCore import QEvent, Qt, QTimer
 from PySide6.QtGui import QAction, QKeySequence, QPixmap
 from PySide6.QtWidgets import (
-    QFileDialog, QHBoxLayout, QLabel, QLineEdit, QMainWindow, QMessageBox, QPushButton,
-    QTabWidget, QVBoxLayout, QWidget,
+    QCheckBox, QFileDialog, QHBoxLayout, QLabel, QLineEdit, QMainWindow, QMessageBox, QPushButton,
+    QSpinBox, QTabWidget, QVBoxLayout, QWidget,
 )
 
 from perfect_prompts.presentation.controllers.library_controller import LibraryController
 from perfect_prompts.presentation.qt.theme import STYLE
-from perfect_prompts.presentation.qt.widgets.batch_page import BatchPage
-from perfect_prompts.presentation.qt.widgets.library_page import LibraryPage
 from perfect_prompts.presentation.qt.widgets.search_page import SearchPage
 from perfect_prompts.resources import application_icon, icon_png_path
 
@@ -28,8 +28,10 @@ class MainWindow(QMainWindow):
         self._remember_root = remember_root
         self._controller: LibraryController | None = None
         self._index_busy = False
+        self._watching = False
         self._build_shell()
-        self._load_root(initial_root)
+        # Wiring the index and its use cases waits for the event loop so the window paints first.
+        QTimer.singleShot(0, lambda: self._load_root(initial_root))
         self._auto_sync = QTimer(self)
         self._auto_sync.setInterval(self.AUTO_SYNC_MS)
         self._auto_sync.timeout.connect(lambda: self._start_sync(True))
@@ -56,11 +58,19 @@ class MainWindow(QMainWindow):
         self._choose_root = QPushButton("Open Repository…"); self._choose_root.setObjectName("secondaryButton")
         self._sync = QPushButton("Sync")
         self._rebuild = QPushButton("Rebuild Index"); self._rebuild.setObjectName("secondaryButton")
+        self._workers = QSpinBox(); self._workers.setRange(0, os.cpu_count() or 1); self._workers.setValue(1)
+        self._workers.setSpecialValueText("Auto")
+        self._workers.setToolTip("Extraction processes used by Rebuild Index (Auto = one per CPU)")
+        self._profile = QCheckBox("Profile")
+        self._profile.setToolTip("Time each phase and extractor of Sync and Rebuild Index and report the slowest files")
         self._status = QLabel("No repository loaded"); self._status.setObjectName("statusLabel")
         root_row = QHBoxLayout()
         root_row.addWidget(QLabel("Repository")); root_row.addWidget(self._root_field, 1)
-        root_row.addWidget(self._choose_root); root_row.addWidget(self._sync); root_row.addWidget(self._rebuild)
+        root_row.addWidget(self._choose_root); root_row.addWidget(self._sync)
+        root_row.addWidget(QLabel("Workers")); root_row.addWidget(self._workers); root_row.addWidget(self._rebuild)
+        root_row.addWidget(self._profile)
         self._tabs = QTabWidget()
+        self._tabs.currentChanged.connect(self._open_tab)
         wrapper = QWidget(); layout = QVBoxLayout(wrapper)
         layout.addLayout(brand); layout.addLayout(root_row); layout.addWidget(self._status); layout.addWidget(self._tabs, 1)
         self.setCentralWidget(wrapper)
@@ -76,15 +86,21 @@ class MainWindow(QMainWindow):
         if self._controller is not None:
             self._controller.close()
         self._controller = self._controller_factory(root)
+        self._watching = False
+        if hasattr(self, "_auto_sync"):
+            self._auto_sync.start()
         self._root_field.setText(str(root))
         self._remember_root(root)
+        self._tabs.blockSignals(True)
         self._tabs.clear()
+        for name in ("_batch_page", "_library_page"):
+            if hasattr(self, name):
+                delattr(self, name)
         self._search_page = SearchPage(self._controller, self._start_sync)
-        self._batch_page = BatchPage(self._controller)
-        self._library_page = LibraryPage(self._controller, self._start_sync)
         self._tabs.addTab(self._search_page, "Search")
-        self._tabs.addTab(self._batch_page, "Batch")
-        self._tabs.addTab(self._library_page, "Library")
+        self._tabs.addTab(QWidget(), "Batch")
+        self._tabs.addTab(QWidget(), "Library")
+        self._tabs.blockSignals(False)
         status = self._controller.status()
         self._render_status(status)
         if not status.get("exists"):
@@ -92,6 +108,30 @@ class MainWindow(QMainWindow):
         else:
             QTimer.singleShot(0, lambda: self._start_sync(True))
 
+    def _open_tab(self, position: int) -> None:
+        """Build the Batch and Library pages, and import their modules, the first time they are shown."""
+        if self._controller is None:
+            return
+        if position == 1 and not hasattr(self, "_batch_page"):
+            from perfect_prompts.presentation.qt.widgets.batch_page import BatchPage
+
+            self._batch_page = BatchPage(self._controller)
+            self._replace_placeholder(position, self._batch_page, "Batch")
+        elif position == 2 and not hasattr(self, "_library_page"):
+            from perfect_prompts.presentation.qt.widgets.library_page import LibraryPage
+
+            self._library_page = LibraryPage(self._controller, self._start_sync)
+            self._replace_placeholder(position, self._library_page, "Library")
+
+    def _replace_placeholder(self, position: int, page: QWidget, label: str) -> None:
+        placeholder = self._tabs.widget(position)
+        self._tabs.blockSignals(True)
+        self._tabs.removeTab(position)
+        self._tabs.insertTab(position, page, label)
+        self._tabs.setCurrentIndex(position)
+        self._tabs.blockSignals(False)
+        placeholder.deleteLater()
+
     def _choose_repository(self) -> None:
         path = QFileDialog.getExistingDirectory(self, "Open Perfect Prompts repository", self._root_field.text())
         if path:
@@ -103,7 +143,10 @@ class MainWindow(QMainWindow):
         self._index_busy = True
         self._set_index_buttons(False)
         self._status.setText("Rebuilding the Prompt Beacon index in the background…")
-        self._controller.rebuild_index(lambda report, error: self._index_done(report, error, "Rebuild"))
+        self._controller.rebuild_index(
+            lambda report, error: self._index_done(report, error, "Rebuild"),
+            workers=self._workers.value(), profile=self._profile.isChecked(),
+        )
 
     def _start_sync(self, silent: bool = False) -> None:
         if self._controller is None or self._index_busy:
@@ -112,7 +155,12 @@ class MainWindow(QMainWindow):
         self._set_index_buttons(False)
         if not silent:
             self._status.setText("Synchronizing filesystem changes with the Prompt Beacon index…")
-        self._controller.sync_index(lambda report, error: self._index_done(report, error, "Sync", silent=silent))
+        # With inotify running, background syncs only re-list changed directories. Without a watcher,
+        # they are the only thing that notices files rewritten in place, so they walk everything.
+        self._controller.sync_index(
+            lambda report, error: self._index_done(report, error, "Sync", silent=silent),
+            full=not silent or not self._watching, profile=not silent and self._profile.isChecked(),
+        )
 
     def _index_done(self, report, error, operation: str, *, silent: bool = False) -> None:
         self._index_busy = False
@@ -124,27 +172,77 @@ class MainWindow(QMainWindow):
             return
         if report is None:
             return
-        changed = report.added + report.updated + report.removed
+        changed = report.added + report.updated + report.removed + report.touched
         if operation == "Rebuild" or changed or not silent:
-            self._status.setText(
-                f"Index ready · {report.nodes:,} nodes · {report.indexed_files:,} searchable files · "
-                f"{report.added} added · {report.updated} updated · {report.removed} removed · {report.errors} extraction errors"
-            )
+            self._status.setText(self._report_text(report, operation))
+        if report.profile is not None:
+            self._status.setToolTip(self._profile_text(asdict(report.profile)))
         if hasattr(self, "_library_page"):
             self._library_page.refresh()
+        if not self._watching and not report.cancelled:
+            self._start_watching()
+
+    def _start_watching(self) -> None:
+        # Polling would only duplicate the auto-sync timer, so the GUI watches with inotify or not at all.
+        if self._controller is None or self._controller.watch_backend != "inotify":
+            return
+        self._watching = self._controller.start_watching(self._watch_done) is not None
+        if self._watching:
+            self._auto_sync.stop()
+
+    def _watch_done(self, report, error) -> None:
+        if error:
+            self._status.setText(f"Watch update failed: {error}")
+            return
+        if report is None:
+            return
+        self._status.setText(self._report_text(report, "Watch"))
+        if hasattr(self, "_library_page"):
+            self._library_page.refresh()
+
+    @staticmethod
+    def _report_text(report, operation: str) -> str:
+        slowest = report.profile.slowest_files if report.profile is not None else ()
+        return (
+            f"Index ready · {report.nodes:,} nodes · {report.indexed_files:,} searchable files · "
+            f"{report.added} added · {report.updated} updated · {report.removed} removed · "
+            f"{report.touched} touched · {report.errors} extraction errors"
+            + (f" · {report.rows_per_second:,.0f} rows/s" if operation == "Rebuild" else "")
+            + (f" · slowest {slowest[0].path} ({slowest[0].duration_ms:,.0f} ms)" if slowest else "")
+        )
+
+    @staticmethod
+    def _profile_text(profile: dict) -> str:
+        """Multi-line status tooltip: exclusive time per phase, per extractor, then the slowest files."""
+        lines = ["Phases (wall / CPU ms):"]
+        phases = sorted(profile["phases"].items(), key=lambda item: -item[1]["wall_ms"])
+        lines += [f"  {name}: {timing['wall_ms']:,.1f} / {timing['cpu_ms']:,.1f}" for name, timing in phases]
+        lines.append("Extractors (files, cached, ms):")
+        lines += [
+            f"  {name}: {timing['files']:,}, {timing['cached']:,}, {timing['duration_ms']:,.1f}"
+            for name, timing in profile["extractors"].items()
+        ]
+        lines.append("Slowest files:")
+        lines += [f"  {item['duration_ms']:,.1f} ms  {item['path']}" for item in profile["slowest_files"]]
+        return "\n".join(lines)
 
     def _set_index_buttons(self, enabled: bool) -> None:
         self._sync.setEnabled(enabled)
         self._rebuild.setEnabled(enabled)
+        self._workers.setEnabled(enabled)
+        self._profile.setEnabled(enabled)
 
     def _render_status(self, status: dict[str, object]) -> None:
         if not status.get("exists"):
             self._status.setText("Search index not built yet. It will be created automatically.")
             return
+        shards = f" · {len(status['shards'])} shards" if status.get("layout") == "sharded" else ""
         self._status.setText(
-            f"Index ready · {status.get('node_count','?')} nodes · {status.get('indexed_file_count','?')} searchable files · "
+            f"Index ready · {status.get('node_count','?')} nodes · {status.get('indexed_file_count','?')} searchable files{shards} · "
             f"synced {status.get('synced_at') or status.get('built_at','unknown')}"
         )
+        profile = status.get("index_profile")
+        self._status.setToolTip(self._profile_text(profile) if isinstance(profile, dict) else "")
 
     def _focus_search(self) -> None:
         if hasattr(self, "_search_page"):
@@ -153,7 +251,8 @@ class MainWindow(QMainWindow):
 
     def changeEvent(self, event) -> None:
         super().changeEvent(event)
-        if event.type() == QEvent.Type.ActivationChange and self.isActiveWindow():
+        # A running watcher already applies every change; focus syncs are only needed without one.
+        if event.type() == QEvent.Type.ActivationChange and self.isActiveWindow() and not self._watching:
             QTimer.singleShot(0, lambda: self._start_sync(True))
 
     def closeEvent(self, event) -> None:
@@ -21,19 +21,25 @@ class BatchPage(QWidget):
         self._run.setEnabled(False); self._status.setText("Running batch…")
         self._controller.run_batch(self._queries.toPlainText(), self._done)
 
-    def _done(self, results, error) -> None:
+    def _done(self, report, error) -> None:
         self._run.setEnabled(True)
         if error:
             self._status.setText(f"Batch failed: {error}"); return
+        results = report.results if report else ()
+        exports = {item.export_path for item in results if item.export_path}
         lines: list[str] = []; total_hits = 0
-        for item in results or ():
+        for item in results:
             lines.append(f"## {item.query}")
             if item.error:
                 lines.append(f"ERROR: {item.error}"); lines.append(""); continue
             total_hits += len(item.hits)
             for hit in item.hits: lines.append(f"- [{hit.area} / {hit.artifact_type}] {hit.path}")
             if not item.hits: lines.append("- no matches")
-            if item.export_path: lines.append(f"  export: {item.export_path}")
+            if item.export_path and len(exports) > 1: lines.append(f"  export: {item.export_path}")
             lines.append("")
+        if len(exports) == 1: lines.append(f"Batch export: {exports.pop()}")
         self._results.setPlainText("\n".join(lines))
-        self._status.setText(f"Completed {len(results or ())} queries · {total_hits} total matches")
+        self._status.setText(
+            f"Completed {len(results)} queries · {total_hits} total matches · "
+            f"{report.queries_per_second:,.1f} queries/s on {report.workers} workers"
+        )
@@ -7,12 +7,12 @@ from pathlib import Path
 from PySide6.QtCore import Qt, QUrl
 from PySide6.QtGui import QDesktopServices
 from PySide6.QtWidgets import (
-    QApplication, QComboBox, QHBoxLayout, QHeaderView, QLabel, QLineEdit,
+    QApplication, QCheckBox, QComboBox, QHBoxLayout, QHeaderView, QLabel, QLineEdit,
     QMessageBox, QPlainTextEdit, QPushButton, QSplitter, QTableWidget, QTableWidgetItem,
     QVBoxLayout, QWidget,
 )
 
-from perfect_prompts.contracts.dto import RemoveArtifactRequest, SearchHit, SearchRequest
+from perfect_prompts.contracts.dto import QueryExplanation, RemoveArtifactRequest, SearchHit, SearchRequest
 from perfect_prompts.domain.classification import AREAS, ARTIFACT_TYPES, RUNTIMES, SOURCE_SCOPES
 from perfect_prompts.presentation.controllers.library_controller import LibraryController
 
@@ -30,13 +30,15 @@ class SearchPage(QWidget):
         self._query = QLineEdit()
         self._query.setPlaceholderText('Search prompts, skills, standards, personas, scripts…  e.g. "session handoff" or architecture')
         self._search = QPushButton("Search")
+        self._explain = QCheckBox("Explain")
+        self._explain.setToolTip("Show how each search was parsed, planned and timed in the preview pane")
         self._area = _filter_combo("All areas", AREAS)
         self._type = _filter_combo("All types", ARTIFACT_TYPES)
         self._runtime = _filter_combo("All runtimes", tuple(value for value in RUNTIMES if value))
         self._scope = _filter_combo("All sources", SOURCE_SCOPES, default="project")
         self._path = QLineEdit(); self._path.setPlaceholderText("Optional path prefix")
 
-        query_row = QHBoxLayout(); query_row.addWidget(self._query, 1); query_row.addWidget(self._search)
+        query_row = QHBoxLayout(); query_row.addWidget(self._query, 1); query_row.addWidget(self._explain); query_row.addWidget(self._search)
         filters = QHBoxLayout()
         for widget in (self._area, self._type, self._runtime, self._scope): filters.addWidget(widget)
         filters.addWidget(self._path, 1)
@@ -88,9 +90,17 @@ class SearchPage(QWidget):
         try:
             self._hits = self._controller.search(self._last_request)
             self._render_hits()
+            if self._explain.isChecked():
+                self._show_explanation(self._controller.explain(self._last_request))
         except Exception as error:
             self._summary.setText(f"Search error: {error}")
 
+    def _show_explanation(self, explanation: QueryExplanation) -> None:
+        self._table.clearSelection()
+        self._preview_title.setText("Query explanation")
+        self._meta.setText(f"{explanation.match_mode} · {explanation.match_rows:,} matched · {explanation.filtered_rows:,} after filters")
+        self._content.setPlainText(_explanation_text(explanation))
+
     def _render_hits(self) -> None:
         self._table.setRowCount(len(self._hits))
         for row, hit in enumerate(self._hits):
@@ -166,6 +176,26 @@ class SearchPage(QWidget):
             QMessageBox.critical(self, "Export failed", str(error))
 
 
+def _explanation_text(explanation: QueryExplanation) -> str:
+    phrase_filter = {"native": "phrases table MATCH", "python": "Python UDF (non-ASCII phrase)"}.get(explanation.phrase_filter, "none")
+    lines = [
+        *([f"Shards: {', '.join(explanation.shards)}"] if explanation.shards else []),
+        f"Terms: {', '.join(explanation.terms) or '—'}",
+        f"Phrases: {', '.join(explanation.phrases) or '—'}",
+        f"FTS expression: {explanation.fts_expression or '—'}",
+        f"Phrase filter: {phrase_filter}",
+    ]
+    if explanation.node_filters:
+        span = f"; rowids {explanation.rowid_span[0]}–{explanation.rowid_span[1]}" if explanation.rowid_span else ""
+        nodes = f" ({explanation.node_rows:,} nodes{span})" if explanation.node_rows is not None else ""
+        lines.append(f"Filters: {' AND '.join(explanation.node_filters)}{nodes}")
+    lines.append(f"Candidates: {explanation.match_rows:,} matched → {explanation.filtered_rows:,} after filters → {explanation.hits:,} returned")
+    lines += ["", "Timings:"] + [f"  {name:<8} {ms:>10.2f} ms" for name, ms in explanation.timings_ms.items()]
+    for name, plan in explanation.plans.items():
+        lines += ["", f"Plan ({name}):"] + [f"  {line}" for line in plan]
+    return "\n".join(lines)
+
+
 def _filter_combo(label: str, values: tuple[str, ...], default: str | None = None) -> QComboBox:
     combo = QComboBox(); combo.addItem(label, None)
     default_index = 0
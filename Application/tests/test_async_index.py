@@ -0,0 +1,76 @@
+import asyncio
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from perfect_prompts.contracts.dto import SearchRequest
+from perfect_prompts.infrastructure.search.async_index import AsyncPromptBeaconIndex
+from perfect_prompts.infrastructure.search.prompt_beacon import PromptBeaconIndex, QueryInterrupted
+
+
+def _index(tmp_path: Path) -> PromptBeaconIndex:
+    folder = tmp_path / "Prompts" / "Portable"; folder.mkdir(parents=True)
+    for number in range(300):
+        (folder / f"note_{number:03d}.md").write_text(f"agent review topic{number % 12} " * (1 + number % 5), encoding="utf-8")
+    index = PromptBeaconIndex(tmp_path); index.rebuild()
+    return index
+
+
+def test_concurrent_searches_match_sync_results_within_the_concurrency_bound(tmp_path: Path):
+    index = _index(tmp_path)
+    requests = [SearchRequest(f"topic{number % 12} agent", limit=20) for number in range(200)]
+    expected = [index.search(request) for request in requests]
+    index._results.max_entries = 0
+    search, lock, running, peak = index.search, threading.Lock(), [0], [0]
+
+    def counted(request, cancelled=None):
+        with lock:
+            running[0] += 1; peak[0] = max(peak[0], running[0])
+        try:
+            return search(request, cancelled=cancelled)
+        finally:
+            with lock:
+                running[0] -= 1
+
+    index.search = counted
+
+    async def run():
+        async with AsyncPromptBeaconIndex(index, max_concurrency=3) as facade:
+            batched = await facade.batch(requests)
+            single = await asyncio.gather(*(facade.search(request) for request in requests[:50]))
+            return batched, single
+
+    batched, single = asyncio.run(run())
+    assert batched == expected and list(single) == expected[:50]
+    assert 1 <= peak[0] <= 3
+
+
+def test_timeouts_and_task_cancellation_interrupt_the_running_query(tmp_path: Path):
+    index = _index(tmp_path); index._results.max_entries = 0
+    with pytest.raises(QueryInterrupted):
+        index.search(SearchRequest("agent"), cancelled=lambda: True)
+    with pytest.raises(TimeoutError):
+        asyncio.run(AsyncPromptBeaconIndex(index).search(SearchRequest("agent"), timeout=0))
+
+    search, stopped = index.search, threading.Event()
+
+    def stalled(request, cancelled=None):
+        while not cancelled():
+            time.sleep(0.005)
+        stopped.set()
+        return search(request, cancelled=cancelled)
+
+    index.search = stalled
+
+    async def run():
+        facade = AsyncPromptBeaconIndex(index, max_concurrency=1)
+        task = asyncio.create_task(facade.search(SearchRequest("agent")))
+        await asyncio.sleep(0.05); task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        facade.close()
+
+    asyncio.run(run())
+    assert stopped.wait(2)
@@ -1,5 +1,7 @@
+import json
 from pathlib import Path
 from perfect_prompts.application.use_cases.batch_query import BatchQuery, split_batch_queries
+from perfect_prompts.infrastructure.search.exporter import read_batch_export
 from perfect_prompts.infrastructure.search.prompt_beacon import PromptBeaconIndex
 
 
@@ -13,3 +15,36 @@ def test_batch_exports_each_query(tmp_path: Path):
     index = PromptBeaconIndex(tmp_path); index.rebuild()
     results = BatchQuery(index, tmp_path).execute("alpha\nbeta")
     assert len(results) == 2 and all(Path(item.export_path).exists() for item in results)
+
+
+def test_concurrent_batch_keeps_positions_and_isolates_failures(tmp_path: Path):
+    p = tmp_path / "Prompts" / "Portable"; p.mkdir(parents=True)
+    for number in range(30):
+        (p / f"note_{number:02d}.md").write_text(f"topic{number} shared", encoding="utf-8")
+    index = PromptBeaconIndex(tmp_path); index.rebuild()
+    search = index.search
+    index.search = lambda request: (_ for _ in ()).throw(RuntimeError("boom")) if request.query == "topic7" else search(request)
+    report = BatchQuery(index, tmp_path, workers=4).run("\n".join(f"topic{number}" for number in range(30)))
+    assert [item.position for item in report.results] == list(range(1, 31)) and report.workers == 4
+    assert [item.query for item in report.results] == [f"topic{number}" for number in range(30)]
+    assert report.results[7].error == "boom" and not report.results[7].export_path
+    assert all(item.hits[0].path.endswith(f"note_{item.position - 1:02d}.md") for item in report.results if not item.error)
+    header, *records = read_batch_export(report.results[0].export_path)
+    assert header["schema"] == "perfect-prompts.prompt-beacon.batch.v1" and header["query_count"] == 30
+    assert {item.export_path for item in report.results if not item.error} == {report.results[0].export_path}
+    assert sorted(record["position"] for record in records) == list(range(1, 31))
+    assert next(record for record in records if record["position"] == 8)["error"] == "boom"
+    assert report.queries_per_second > 0
+
+
+def test_batch_export_formats(tmp_path: Path):
+    p = tmp_path / "Prompts"; p.mkdir()
+    (p / "p.md").write_text("alpha beta", encoding="utf-8")
+    index = PromptBeaconIndex(tmp_path); index.rebuild()
+    compressed = BatchQuery(index, tmp_path, export_format="jsonl.gz").execute("alpha, beta")
+    assert compressed[0].export_path.endswith(".jsonl.gz")
+    header, *records = read_batch_export(compressed[0].export_path)
+    assert header["batch_execution_id"] and [len(record["ranked_matches"]) for record in records] == [1, 1]
+    single = BatchQuery(index, tmp_path, export_format="json").execute("alpha, beta")
+    assert len({item.export_path for item in single}) == 2
+    assert json.loads(Path(single[0].export_path).read_text(encoding="utf-8"))["schema"] == "perfect-prompts.prompt-beacon.query.v1"
@@ -0,0 +1,54 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from perfect_prompts.benchmarks.corpus import CorpusSpec, generate_corpus, parse_mix
+from perfect_prompts.benchmarks.suite import compare
+from perfect_prompts.cli import main
+from perfect_prompts.domain.classification import LIBRARY_ROOT_DIRECTORIES
+from perfect_prompts.infrastructure.search.extractors import extract_searchable_text
+
+
+def _files(root: Path) -> dict[str, bytes]:
+    return {path.relative_to(root).as_posix(): path.read_bytes() for path in sorted(root.rglob("*")) if path.is_file()}
+
+
+def test_generated_corpus_is_deterministic_and_uses_the_library_layout(tmp_path: Path):
+    spec = CorpusSpec(files=60, seed=3, median_kb=1.0, vocabulary=500)
+    summary = generate_corpus(tmp_path / "a", spec)
+    generate_corpus(tmp_path / "b", spec)
+    files = _files(tmp_path / "a")
+    assert files == _files(tmp_path / "b") and len(files) == summary.files == 60
+    assert summary.bytes == sum(map(len, files.values())) and sum(summary.by_extension.values()) == 60
+    assert {path.split("/")[0] for path in files} <= LIBRARY_ROOT_DIRECTORIES
+    assert all(extract_searchable_text(tmp_path / "a" / path).strip() for path in files)
+    assert parse_mix("md=3,.docx=1") == {"md": 3, "docx": 1}
+    with pytest.raises(ValueError):
+        parse_mix("pdf=1")
+
+
+def test_bench_reports_metrics_and_flags_regressions_against_a_baseline(tmp_path: Path, capsys):
+    argv = ["bench", "--files", "40", "--median-kb", "1", "--queries", "20", "--keep", str(tmp_path / "library")]
+    assert main([*argv, "--output", str(tmp_path / "first.json")]) == 0
+    report = json.loads((tmp_path / "first.json").read_text(encoding="utf-8"))
+    assert report["corpus"]["indexed_files"] == 40 and report["corpus"]["touched_files"] >= 1
+    metrics = report["metrics"]
+    assert metrics["query_p50_ms"] <= metrics["query_p95_ms"] <= metrics["query_p99_ms"]
+    assert metrics["index_files_per_second"] > 0 and metrics["batch_queries_per_second"] > 0
+
+    slower = {**report, "metrics": {**metrics, "query_p95_ms": metrics["query_p95_ms"] * 2 + 1}}
+    changes = {item.metric: item for item in compare(slower, report)}
+    assert changes["query_p95_ms"].regressed and not changes["index_files_per_second"].regressed
+    faster = {**report, "metrics": {**metrics, "index_files_per_second": metrics["index_files_per_second"] * 2}}
+    assert not any(item.regressed for item in compare(faster, report))
+    with pytest.raises(ValueError):
+        compare(report, {**report, "config": {**report["config"], "queries": 21}})
+
+    capsys.readouterr()
+    unbeatable = {**report, "metrics": {**metrics, "query_p99_ms": 0.0001}}
+    (tmp_path / "baseline.json").write_text(json.dumps(unbeatable), encoding="utf-8")
+    assert main([*argv, "--baseline", str(tmp_path / "baseline.json")]) == 1
+    output = capsys.readouterr()
+    assert "regression: query_p99_ms" in output.err
+    assert any(item["regressed"] for item in json.loads(output.out)["comparison"]["metrics"])
@@ -22,3 +22,20 @@ def test_library_boundary_is_explicit_allowlist():
     assert not is_library_relative_path("README.md")
     assert not is_library_relative_path("install.py")
     assert not is_library_relative_path("VERSION")
+
+
+def test_library_root_facets_cover_every_classification():
+    from perfect_prompts.domain.classification import LIBRARY_ROOT_FACETS, LIBRARY_ROOT_DIRECTORIES, library_roots_matching
+
+    assert set(LIBRARY_ROOT_FACETS) == LIBRARY_ROOT_DIRECTORIES
+    for path in (
+        "Prompts", "Prompts/Templates/a.md", "Prompts/Portable/Plaintext/context_builder_prompts/b.md",
+        "Prompts/x/summary_prompts/c.md", "Prompts/x/education_prompts/d.md", "Prompts/x/examples/e.md",
+        "Methodologies/x/AGENTS.md", "Methodologies/x/method.md", "External_References/a/b.md", "Guidelines/g.md",
+        "Agent_Instructions/a.md", "Personas/p.md", "Rules/r.md", "Skills/s/t.py", "Standards/s.md",
+    ):
+        found = classify_relative_path(path)
+        assert path.split("/")[0] in library_roots_matching(found.area, found.artifact_type, found.source_scope, path)
+    assert library_roots_matching(path_prefix="P") == {"Personas", "Prompts"}
+    assert library_roots_matching(area="Context Builders", path_prefix="Prompts/Portable") == {"Prompts"}
+    assert library_roots_matching(artifact_type="reference", source_scope="project") == {"Guidelines"}
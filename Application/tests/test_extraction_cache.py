@@ -0,0 +1,55 @@
+import zipfile
+from pathlib import Path
+
+from perfect_prompts.contracts.dto import SearchRequest
+from perfect_prompts.infrastructure.search import pipeline
+from perfect_prompts.infrastructure.search.extraction_cache import ExtractionCache
+from perfect_prompts.infrastructure.search.prompt_beacon import PromptBeaconIndex
+
+
+def _docx(path: Path, text: str) -> None:
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("word/document.xml", f"<w:document xmlns:w='w'><w:body><w:t>{text}</w:t></w:body></w:document>")
+
+
+def test_rebuild_reuses_cached_document_bodies(tmp_path: Path, monkeypatch):
+    folder = tmp_path / "Standards" / "Docs"; folder.mkdir(parents=True)
+    _docx(folder / "spec.docx", "quasar specification")
+    (folder / "plain.md").write_text("pulsar notes", encoding="utf-8")
+    index = PromptBeaconIndex(tmp_path); index.rebuild()
+
+    parsed: list[str] = []
+    real = pipeline.extract_searchable_text
+    monkeypatch.setattr(pipeline, "extract_searchable_text", lambda path: parsed.append(path.name) or real(path))
+    index.rebuild()
+    assert parsed == ["plain.md"]
+    assert index.search(SearchRequest("quasar")) and index.status()["extraction_cache_bytes"] > 0
+
+    _docx(folder / "spec.docx", "nebula revision")
+    index.sync(full=True)
+    assert parsed[-1] == "spec.docx" and index.search(SearchRequest("nebula"))
+
+
+def test_extraction_cache_evicts_least_recently_used(tmp_path: Path):
+    cache = ExtractionCache(tmp_path / "cache.sqlite3", max_bytes=10**9)
+    for number in range(4):
+        cache.record("a.pdf", pipeline.Extraction(f"body {number} " * 200, 1, 0, f"d{number}"))
+    cache.close()
+    cache = ExtractionCache(tmp_path / "cache.sqlite3")
+    assert cache.get("d0", "pdf") is not None
+    cache.max_bytes = cache.size_bytes() // 2
+    cache.close()
+    cache = ExtractionCache(tmp_path / "cache.sqlite3")
+    assert cache.get("d0", "pdf") is not None and cache.get("d1", "pdf") is None
+    cache.close()
+
+
+def test_extraction_cache_keys_bodies_by_extractor(tmp_path: Path):
+    folder = tmp_path / "Standards" / "Docs"; folder.mkdir(parents=True)
+    _docx(folder / "spec.docx", "quasar specification")
+    (folder / "bundle.zip").write_bytes((folder / "spec.docx").read_bytes())
+    index = PromptBeaconIndex(tmp_path); index.rebuild()
+    index.rebuild()
+    # The zip reader indexes member names; the docx reader never does.
+    assert [hit.path for hit in index.search(SearchRequest("document.xml"))] == ["Standards/Docs/bundle.zip"]
+    assert len(index.search(SearchRequest("quasar"))) == 2
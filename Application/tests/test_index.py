@@ -1,6 +1,11 @@
+import sqlite3
+from dataclasses import replace
 from pathlib import Path
+
+import pytest
+
 from perfect_prompts.contracts.dto import SearchRequest
-from perfect_prompts.infrastructure.search.prompt_beacon import PromptBeaconIndex
+from perfect_prompts.infrastructure.search.prompt_beacon import NODE_SPAN_SQL, PromptBeaconIndex, _node_filters, _ranked_sql
 
 
 def test_index_search_filters_and_application_exclusion(tmp_path: Path):
@@ -19,3 +24,279 @@ def test_index_search_filters_and_application_exclusion(tmp_path: Path):
     assert [h.path for h in python_hits] == ["Prompts/Runtime_Bindings/Python/agent_prompts/reasoner.py"]
     standard_hits = index.search(SearchRequest("architecture", artifact_type="standard"))
     assert len([h for h in standard_hits if h.kind == "file"]) == 1
+
+
+def test_parallel_rebuild_matches_sequential_order_and_honours_cancellation(tmp_path: Path):
+    for area in ("Prompts/Portable/Plaintext", "Skills/handoff", "Standards/Research"):
+        folder = tmp_path / area; folder.mkdir(parents=True)
+        for number in range(6):
+            (folder / f"doc_{number}.md").write_text(f"architecture note {number} {area}", encoding="utf-8")
+    index = PromptBeaconIndex(tmp_path)
+    sequential = index.rebuild()
+    sequential_hits = index.search(SearchRequest("architecture", limit=500))
+    parallel = index.rebuild(workers=2)
+    assert replace(parallel, duration_ms=0, rows_per_second=0) == replace(sequential, duration_ms=0, rows_per_second=0)
+    assert index.search(SearchRequest("architecture", limit=500)) == sequential_hits
+    assert index.rebuild(cancelled=lambda: True, workers=2).cancelled
+    assert index.search(SearchRequest("architecture", limit=500)) == sequential_hits
+
+
+def test_bulk_rebuild_reports_throughput_and_leaves_a_wal_index(tmp_path: Path):
+    folder = tmp_path / "Prompts" / "Portable" / "Plaintext"; folder.mkdir(parents=True)
+    for number in range(1200):
+        (folder / f"note_{number}.md").write_text(f"bulk token{number} architecture", encoding="utf-8")
+    index = PromptBeaconIndex(tmp_path); report = index.rebuild()
+    assert report.nodes == 1203 and report.rows_per_second > 0 and report.duration_ms > 0
+    assert [h.path for h in index.search(SearchRequest("token1199"))] == ["Prompts/Portable/Plaintext/note_1199.md"]
+    connection = sqlite3.connect(index.db_path)
+    try:
+        assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    finally:
+        connection.close()
+
+
+def test_search_reuses_pooled_reader_until_rebuild_swaps_the_file(tmp_path: Path):
+    folder = tmp_path / "Prompts" / "Portable"; folder.mkdir(parents=True)
+    (folder / "a.md").write_text("alpha", encoding="utf-8")
+    index = PromptBeaconIndex(tmp_path); index.rebuild()
+    assert index.search(SearchRequest("alpha"))
+    with index._readers.reader() as first:
+        pass
+    assert index.search(SearchRequest('"alpha"'))
+    with index._readers.reader() as again:
+        assert again is first
+        assert again.execute("PRAGMA query_only").fetchone()[0] == 1
+
+    (folder / "a.md").write_text("omega", encoding="utf-8")
+    index.rebuild()
+    assert index.search(SearchRequest("omega")) and not index.search(SearchRequest("alpha"))
+    with index._readers.reader() as reopened:
+        assert reopened is not first
+
+    (folder / "a.md").write_text("sigma", encoding="utf-8")
+    PromptBeaconIndex(tmp_path).rebuild()  # another process-style writer swaps the file
+    assert index.search(SearchRequest("sigma"))
+
+
+def test_result_cache_is_scoped_to_the_index_generation(tmp_path: Path):
+    folder = tmp_path / "Prompts" / "Portable"; folder.mkdir(parents=True)
+    (folder / "a.md").write_text("alpha beta", encoding="utf-8")
+    index = PromptBeaconIndex(tmp_path); index.rebuild()
+    first = index.search(SearchRequest("alpha"))
+    assert index.search(SearchRequest("  ALPHA ")) is first
+    assert (index.status()["result_cache_hits"], index.status()["result_cache_misses"]) == (1, 1)
+
+    generation = int(index.status()["generation"])
+    assert index.sync().added == 0 and int(index.status()["generation"]) == generation
+    (folder / "b.md").write_text("alpha gamma", encoding="utf-8")
+    index.sync()
+    assert int(index.status()["generation"]) == generation + 1
+    assert len(index.search(SearchRequest("alpha"))) == 2
+    index.rebuild()
+    assert int(index.status()["generation"]) == generation + 2
+
+
+def test_result_cache_and_cursors_distinguish_facets_sharing_a_value(tmp_path: Path):
+    folder = tmp_path / "Skills" / "python"; folder.mkdir(parents=True)
+    for number in range(3):
+        (folder / f"n{number}.md").write_text("alpha notes", encoding="utf-8")
+    index = PromptBeaconIndex(tmp_path); index.rebuild()
+    by_runtime = SearchRequest("alpha", runtime="python", limit=1)
+    by_scope = SearchRequest("alpha", source_scope="python", limit=1)
+    assert len(index.search(by_runtime)) == 1
+    assert index.search(by_scope) == ()
+    page = index.search_page(by_runtime)
+    assert page.cursor
+    with pytest.raises(ValueError):
+        index.search_page(by_scope, page.cursor)
+
+
+def test_native_phrase_filter_matches_the_python_phrase_check(tmp_path: Path):
+    folder = tmp_path / "Prompts" / "Portable"; folder.mkdir(parents=True)
+    bodies = {
+        "exact.md": "use the prompt template daily", "stemmed.md": "several prompts templated here",
+        "split.md": "prompt\n\nTemplate, after a break", "underscore.md": "prompt_template is one token",
+        "prompt_template_notes.md": "path only", "apart.md": "prompt and template apart",
+        "accent.md": "a naïve prompt template", "café.md": "café menu",
+    }
+    for name, body in bodies.items():
+        (folder / name).write_text(body, encoding="utf-8")
+    index = PromptBeaconIndex(tmp_path); index.rebuild()
+    (folder / "apart.md").write_text("now a prompt template too", encoding="utf-8")
+    (folder / "exact.md").unlink()
+    index.sync(full=True)
+
+    for query in ('"prompt template"', '"prompt_template"', '"naïve prompt"', '"café"', '"template" prompt'):
+        index.native_phrase_filter = True
+        native = sorted(hit.path for hit in index.search(SearchRequest(query)))
+        index.native_phrase_filter = False
+        fallback = sorted(hit.path for hit in index.search(SearchRequest(query)))
+        assert native == fallback, query
+    index.native_phrase_filter = True
+    assert sorted(Path(hit.path).name for hit in index.search(SearchRequest('"prompt template"'))) == [
+        "accent.md", "apart.md", "split.md",
+    ]
+
+
+def test_phrase_filters_agree_on_decomposed_unicode(tmp_path: Path):
+    folder = tmp_path / "Prompts" / "Portable"; folder.mkdir(parents=True)
+    (folder / "nfd.md").write_text("the cafe\u0301 notes", encoding="utf-8")
+    (folder / "re\u0301sume\u0301 plan.md").write_text("path only", encoding="utf-8")
+    index = PromptBeaconIndex(tmp_path); index.rebuild()
+
+    def both(query: str) -> list[str]:
+        results = []
+        for native in (True, False):
+            index.native_phrase_filter = native
+            results.append(sorted(hit.path for hit in index.search(SearchRequest(query))))
+        assert results[0] == results[1], query
+        return results[0]
+
+    assert both('"cafe notes"') == [] and both('"resume plan"') == []
+    assert both('"café notes"') == both('"cafe\u0301 notes"') == ["Prompts/Portable/nfd.md"]
+    assert both('"résumé plan"') == ["Prompts/Portable/re\u0301sume\u0301 plan.md"]
+    (folder / "nfd.md").write_text("the cafe\u0301 menu", encoding="utf-8")
+    index.sync(full=True)
+    assert both('"café notes"') == [] and both('"café menu"') == ["Prompts/Portable/nfd.md"]
+
+
+def test_document_store_serves_snippets_and_previews_and_stays_consistent(tmp_path: Path):
+    folder = tmp_path / "Prompts" / "Portable"; folder.mkdir(parents=True)
+    note = folder / "note.md"; note.write_text("alpha handoff " + "filler words repeat " * 400, encoding="utf-8")
+    index = PromptBeaconIndex(tmp_path); index.rebuild()
+    [hit] = index.search(SearchRequest("handoff"))
+    assert "<mark>handoff</mark>" in hit.snippet
+    status = index.status()
+    assert 0 < status["document_store_bytes"] < status["document_store_raw_bytes"] == len(note.read_bytes())
+    assert index.read_content(hit.path) == note.read_text(encoding="utf-8")
+
+    note.write_text("omega session", encoding="utf-8")
+    assert index.read_content(hit.path) == "omega session"  # stale store entry falls back to the file
+    index.sync(full=True)
+    assert not index.search(SearchRequest("handoff")) and not index.search(SearchRequest('"alpha handoff"'))
+    assert "<mark>omega</mark>" in index.search(SearchRequest("omega"))[0].snippet
+    note.unlink(); index.sync()
+    assert not index.search(SearchRequest("omega")) and index.status()["document_store_raw_bytes"] == 0
+
+
+def test_prefix_indexes_are_configurable_and_kept_across_rebuilds(tmp_path: Path):
+    folder = tmp_path / "Prompts" / "Portable"; folder.mkdir(parents=True)
+    for name, body in {"a.md": "architecture review", "b.md": "arc welding", "c.md": "unrelated"}.items():
+        (folder / name).write_text(body, encoding="utf-8")
+    index = PromptBeaconIndex(tmp_path); index.rebuild(prefix_lengths=())
+    expected = {term: sorted(hit.path for hit in index.search(SearchRequest(term))) for term in ("ar", "arc", "arch")}
+    assert index.status()["prefix_lengths"] == ""
+
+    index.rebuild(prefix_lengths=[4, 2, 2])
+    assert index.status()["prefix_lengths"] == "2 4"
+    connection = sqlite3.connect(index.db_path)
+    try:
+        assert "prefix='2 4'" in connection.execute("SELECT sql FROM sqlite_master WHERE name='search'").fetchone()[0]
+    finally:
+        connection.close()
+    assert {term: sorted(hit.path for hit in index.search(SearchRequest(term))) for term in expected} == expected
+    index.rebuild()
+    assert index.status()["prefix_lengths"] == "2 4"
+    with pytest.raises(ValueError):
+        index.rebuild(prefix_lengths=[0])
+
+
+def test_metadata_filters_use_indexes_and_path_prefix_is_a_literal_range(tmp_path: Path):
+    for folder in ("Prompts/Runtime_Bindings/Python/agent_prompts", "Prompts/Runtime_Bindings/Python/agentXprompts"):
+        (tmp_path / folder).mkdir(parents=True)
+        (tmp_path / folder / "reasoner.py").write_text('PROMPT = "architecture"', encoding="utf-8")
+    (tmp_path / "Standards").mkdir(); (tmp_path / "Standards" / "a.md").write_text("architecture", encoding="utf-8")
+    index = PromptBeaconIndex(tmp_path); index.rebuild()
+    hits = index.search(SearchRequest("architecture", path_prefix="Prompts/Runtime_Bindings/Python/agent_prompts"))
+    assert [hit.path for hit in hits] == ["Prompts/Runtime_Bindings/Python/agent_prompts/reasoner.py"]
+    assert not index.search(SearchRequest("architecture", path_prefix="Prompts/Runtime_Bindings/Python/agent%"))
+    assert not index.search(SearchRequest("architecture", area="Standards", runtime="python"))
+
+    def plan(sql: str, params: list[object]) -> str:
+        with index._readers.reader() as connection:
+            return " | ".join(row[3] for row in connection.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+
+    for request, expected in (
+        (SearchRequest("x", area="Standards"), "COVERING INDEX nodes_area (area=?)"),
+        (SearchRequest("x", artifact_type="binding", runtime="python"), "COVERING INDEX nodes_artifact_type (artifact_type=? AND runtime=?)"),
+        (SearchRequest("x", source_scope="project"), "COVERING INDEX nodes_source_scope (source_scope=?)"),
+        (SearchRequest("x", path_prefix="Prompts/"), "COVERING INDEX sqlite_autoindex_nodes_1 (path>? AND path<?)"),
+    ):
+        clauses, params = _node_filters(request)
+        assert expected in plan(NODE_SPAN_SQL.format(where=" AND ".join(clauses)), [*params, 10])
+    clauses, params = _node_filters(SearchRequest("x", path_prefix="Prompts/"))
+    ranked = plan(_ranked_sql(["search MATCH ?", *clauses, "search.rowid BETWEEN ? AND ?"], join_nodes=True), ["x", *params, 1, 9, 40])
+    assert "SCAN search VIRTUAL TABLE" in ranked and "SEARCH n USING INTEGER PRIMARY KEY (rowid=?)" in ranked
+
+
+def test_top_k_breaks_rank_ties_by_path_past_the_spare_rows(tmp_path: Path):
+    folder = tmp_path / "Prompts" / "Portable"; folder.mkdir(parents=True)
+    for number in range(40):
+        (folder / f"same_{39 - number:02d}.md").write_text("handoff", encoding="utf-8")
+    (folder / "best.md").write_text("handoff handoff handoff", encoding="utf-8")
+    index = PromptBeaconIndex(tmp_path); index.rebuild()
+    hits = index.search(SearchRequest("handoff", limit=5))
+    assert [Path(hit.path).name for hit in hits] == ["best.md", "same_00.md", "same_01.md", "same_02.md", "same_03.md"]
+    assert all("<mark>handoff</mark>" in hit.snippet for hit in hits)
+    assert [hit.path for hit in index.search(SearchRequest("handoff", limit=41))][-1].endswith("same_39.md")
+
+    with index._readers.reader() as connection:
+        plan = connection.execute(
+            f"EXPLAIN QUERY PLAN {_ranked_sql(['search MATCH ?'], join_nodes=False)}", ('"handoff"*', 5),
+        ).fetchall()
+    # Phase one reads FTS5 alone; `nodes` is only joined for the rows that survive the LIMIT.
+    assert plan[0][3].startswith("SCAN search VIRTUAL TABLE") and not any("nodes" in row[3] or " n " in row[3] for row in plan)
+
+
+def test_search_pages_and_streams_every_match_in_rank_order(tmp_path: Path):
+    folder = tmp_path / "Prompts" / "Portable"; folder.mkdir(parents=True)
+    for number in range(520):
+        (folder / f"note_{number:03d}.md").write_text("audit " * (1 + number % 7) + f"filler {number}", encoding="utf-8")
+    index = PromptBeaconIndex(tmp_path); index.rebuild()
+    streamed = list(index.search_iter(SearchRequest("audit", limit=5), batch_size=64))
+    assert len(streamed) == 520 and len({hit.path for hit in streamed}) == 520
+    assert streamed[:500] == list(index.search(SearchRequest("audit", limit=500)))
+
+    paged, cursor = [], None
+    while True:
+        page = index.search_page(SearchRequest("audit", limit=150), cursor)
+        paged += page.hits; cursor = page.cursor
+        if cursor is None:
+            break
+    assert paged == streamed
+
+    first = index.search_page(SearchRequest("audit", limit=10))
+    with pytest.raises(ValueError):
+        index.search_page(SearchRequest("filler", limit=10), first.cursor)
+    (folder / "extra.md").write_text("audit", encoding="utf-8"); index.sync()
+    with pytest.raises(ValueError):
+        index.search_page(SearchRequest("audit", limit=10), first.cursor)
+
+    stream = index.search_iter(SearchRequest("audit"), batch_size=10)
+    next(stream)
+    index.rebuild()  # closes the dedicated handle instead of waiting for the consumer
+    with pytest.raises(RuntimeError):
+        list(stream)
+
+
+def test_explain_reports_parsing_plans_counts_and_phase_timings(tmp_path: Path, capsys):
+    from perfect_prompts.cli import main
+
+    folder = tmp_path / "Prompts" / "Portable"; folder.mkdir(parents=True)
+    for number in range(4):
+        (folder / f"note_{number}.md").write_text(f"session handoff architecture {number}", encoding="utf-8")
+    (tmp_path / "Skills").mkdir(); (tmp_path / "Skills" / "other.md").write_text("session handoff architecture notes", encoding="utf-8")
+    index = PromptBeaconIndex(tmp_path); index.rebuild()
+    explanation = index.explain(SearchRequest('"session handoff" architect', path_prefix="Prompts", limit=2))
+    assert explanation.terms == ("architect",) and explanation.phrases == ("session handoff",)
+    assert explanation.phrase_filter == "native" and explanation.match_mode == "mixed"
+    assert explanation.node_filters == ("n.path >= 'Prompts'", "n.path < 'Promptt'")
+    assert (explanation.match_rows, explanation.filtered_rows, explanation.hits) == (5, 4, 2)
+    assert set(explanation.timings_ms) == {"match", "filter", "rank", "join", "snippet"}
+    assert any("SCAN search" in line for line in explanation.plans["rank"]) and explanation.plans["hits"]
+    assert index.explain(SearchRequest('"naïve prompt"')).phrase_filter == "python"
+    assert index.explain(SearchRequest("a")).fts_expression == ""
+
+    assert main(["query", '"session handoff"', "--explain", "--root", str(tmp_path)]) == 0
+    output = capsys.readouterr().out
+    assert "phrase filter: phrases table MATCH" in output and "candidates: 5 matched, 5 after filters" in output
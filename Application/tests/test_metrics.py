@@ -0,0 +1,69 @@
+import threading
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+from perfect_prompts.contracts.dto import SearchRequest
+from perfect_prompts.infrastructure.metrics.endpoint import MetricsEndpoint
+from perfect_prompts.infrastructure.metrics.registry import OPENMETRICS_CONTENT_TYPE, MetricsRegistry
+from perfect_prompts.infrastructure.search.prompt_beacon import PromptBeaconIndex, QueryInterrupted
+from perfect_prompts.infrastructure.server.query_server import create_server, server_address
+
+
+def test_registry_renders_openmetrics_counters_gauges_and_cumulative_histograms():
+    registry = MetricsRegistry()
+    counter = registry.counter("demo_events", 'Events "seen".', ("kind",))
+    counter.inc(kind="a"); counter.inc(2, kind="b")
+    registry.gauge("demo_size_bytes", "Size.", unit="bytes", function=lambda: 42)
+    histogram = registry.histogram("demo_seconds", "Latency.", unit="seconds", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+    text = registry.render()
+    assert text.endswith("# EOF\n")
+    assert '# HELP demo_events Events \\"seen\\".' in text
+    assert 'demo_events_total{kind="a"} 1' in text and 'demo_events_total{kind="b"} 2' in text
+    assert "# UNIT demo_size_bytes bytes" in text and "demo_size_bytes 42" in text
+    assert 'demo_seconds_bucket{le="0.1"} 2' in text and 'demo_seconds_bucket{le="1.0"} 3' in text
+    assert 'demo_seconds_bucket{le="+Inf"} 4' in text and "demo_seconds_count 4" in text and "demo_seconds_sum 3.65" in text
+    with pytest.raises(ValueError):
+        counter.inc(kind="a", extra="x")
+    with pytest.raises(ValueError):
+        registry.counter("demo_events", "Again.")
+
+
+def test_index_metrics_count_queries_by_mode_updates_and_are_scrapable(tmp_path: Path):
+    folder = tmp_path / "Prompts"; folder.mkdir()
+    for number in range(200):
+        (folder / f"a{number}.md").write_text("agent handoff review " * (1 + number % 5), encoding="utf-8")
+    index = PromptBeaconIndex(tmp_path); index.rebuild()
+    for query in ("agent", "agent", '"agent handoff"', 'review "agent handoff"'):
+        index.search(SearchRequest(query))
+    with pytest.raises(QueryInterrupted):
+        index.search(SearchRequest("handoff"), cancelled=lambda: True)
+    metrics = index.metrics
+    assert metrics.queries.value(match_mode="broad_terms") == 2
+    assert metrics.queries.value(match_mode="quoted_phrase") == metrics.queries.value(match_mode="mixed") == 1
+    assert metrics.interrupted.value(match_mode="broad_terms") == 1
+    text = metrics.render()
+    assert "perfect_prompts_result_cache_hits_total 1" in text
+    assert 'perfect_prompts_query_duration_seconds_count{match_mode="broad_terms"} 2' in text
+
+    (folder / "b.md").write_text("beta", encoding="utf-8")
+    index.sync()
+    written = index.metrics_path.read_text(encoding="utf-8")
+    assert 'perfect_prompts_index_update_duration_seconds_count{operation="sync"} 1' in written
+    assert 'perfect_prompts_index_update_duration_seconds_count{operation="rebuild"} 1' in written
+    assert f"perfect_prompts_database_size_bytes {index.db_path.stat().st_size}" in written
+
+    endpoint = MetricsEndpoint(metrics.render, port=0)
+    server = create_server(index, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        for address in (endpoint.address, server_address(server)):
+            with urllib.request.urlopen(f"http://{address}/metrics", timeout=5) as response:
+                assert response.headers["Content-Type"] == OPENMETRICS_CONTENT_TYPE
+                assert "perfect_prompts_queries_total" in response.read().decode("utf-8")
+    finally:
+        endpoint.close()
+        server.shutdown(); server.server_close()
@@ -4,3 +4,5 @@ from perfect_prompts.infrastructure.search.query import parse_search_query
 def test_beacon_query_semantics_are_preserved():
     parsed = parse_search_query('find "session handoff" prompt templates')
     assert parsed.fts_expression == '("session handoff") AND ("prompt"* OR "templates"*)'
+    assert parsed.native_phrase_expression == '{path name body} : "session handoff"'
+    assert parse_search_query('"naïve prompt"').native_phrase_expression is None
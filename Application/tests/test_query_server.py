@@ -0,0 +1,48 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from pathlib import Path
+
+import pytest
+
+from perfect_prompts.cli import main
+from perfect_prompts.contracts.dto import SearchRequest
+from perfect_prompts.infrastructure.search.prompt_beacon import PromptBeaconIndex
+from perfect_prompts.infrastructure.server.client import QueryClient, QueryServiceError
+from perfect_prompts.infrastructure.server.query_server import create_server, server_address
+
+
+@pytest.mark.parametrize("transport", ["tcp", "unix"])
+def test_server_answers_concurrent_clients_and_follows_rebuilds(tmp_path: Path, transport: str, capsys):
+    folder = tmp_path / "Prompts" / "Portable"; folder.mkdir(parents=True)
+    for number in range(60):
+        (folder / f"note_{number:02d}.md").write_text(f"handoff review topic{number % 6}", encoding="utf-8")
+    index = PromptBeaconIndex(tmp_path); index.rebuild()
+    options = {"socket_path": tmp_path / "serve.sock"} if transport == "unix" else {"port": 0}
+    server = create_server(PromptBeaconIndex(tmp_path), workers=3, **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = QueryClient(server_address(server))
+    try:
+        requests = [SearchRequest(f"topic{number % 6} handoff", limit=5) for number in range(60)]
+        with ThreadPoolExecutor(8) as pool:
+            served = list(pool.map(lambda request: client.search(request)[0], requests))
+        assert served == [index.search(request) for request in requests]
+        assert client.status()["node_count"] == index.status()["node_count"]
+        assert client.request("POST", "/preview", {"path": "Prompts/Portable/note_01.md"})["content"] == "handoff review topic1"
+        batch = client.request("POST", "/batch", {"queries": ["topic1", "\"unclosed"], "limit": 3})["results"]
+        assert len(batch[0]["hits"]) == 3 and batch[0]["error"] is None and batch[1]["error"]
+        with pytest.raises(QueryServiceError, match="Unknown request field"):
+            client.request("POST", "/query", {"query": "x", "colour": "red"})
+
+        (folder / "fresh.md").write_text("zebrafinch", encoding="utf-8"); index.rebuild()
+        assert [hit.path for hit in client.search(SearchRequest("zebrafinch"))[0]] == ["Prompts/Portable/fresh.md"]
+
+        assert main(["query", "zebrafinch", "--server", server_address(server), "--json"]) == 0
+        assert json.loads(capsys.readouterr().out)["ranked_matches"][0]["path"] == "Prompts/Portable/fresh.md"
+        assert main(["query", "handoff", "--server", server_address(server), "--ndjson", "--all"]) == 0
+        streamed = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert streamed == [asdict(hit) for hit in index.search_iter(SearchRequest("handoff"))]
+    finally:
+        server.shutdown(); server.server_close()
+    assert transport == "tcp" or not (tmp_path / "serve.sock").exists()
@@ -0,0 +1,61 @@
+import json
+from pathlib import Path
+
+from perfect_prompts.cli import main
+from perfect_prompts.contracts.dto import SearchRequest
+from perfect_prompts.infrastructure.search.prompt_beacon import PromptBeaconIndex
+from perfect_prompts.infrastructure.search.sharded import ShardedPromptBeaconIndex, open_index
+
+
+def _library(root: Path) -> None:
+    for area in ("Prompts/Portable/Plaintext", "Skills/handoff", "Standards/Research", "Personas"):
+        folder = root / area; folder.mkdir(parents=True)
+        for number in range(5):
+            (folder / f"doc_{number}.md").write_text(f"architecture note {number} " * (number + 1) + area, encoding="utf-8")
+
+
+def test_sharded_index_merges_prunes_and_pages_like_the_single_index(tmp_path: Path):
+    _library(tmp_path)
+    single = PromptBeaconIndex(tmp_path); single.rebuild()
+    sharded = ShardedPromptBeaconIndex(tmp_path)
+    report = sharded.rebuild(workers=2)
+    assert not report.cancelled and str(report.nodes) == single.status()["node_count"] == sharded.status()["node_count"]
+    assert (tmp_path / ".perfect-prompts" / "shards" / "Skills" / "index.sqlite3").exists()
+
+    request = SearchRequest("architecture", limit=500)
+    hits = sharded.search(request)
+    assert sorted(hit.path for hit in hits) == sorted(hit.path for hit in single.search(request))
+    assert [(hit.rank, hit.path) for hit in hits] == sorted((hit.rank, hit.path) for hit in hits)
+    paged, cursor = [], None
+    while True:
+        page = sharded.search_page(SearchRequest("architecture", limit=7), cursor)
+        paged += page.hits; cursor = page.cursor
+        if cursor is None:
+            break
+    assert paged == list(sharded.search_iter(request)) == list(hits)
+
+    assert sharded.explain(SearchRequest("architecture", path_prefix="P")).shards == ("Personas", "Prompts")
+    assert {hit.path.split("/")[0] for hit in sharded.search(SearchRequest("architecture", area="Skills"))} == {"Skills"}
+
+    generations = {name: shard.status()["generation"] for name, shard in sharded.shards.items() if shard.db_path.exists()}
+    (tmp_path / "Skills" / "handoff" / "doc_0.md").write_text("rewritten quasar", encoding="utf-8")
+    assert sharded.sync(full=True).updated == 1 and [hit.path for hit in sharded.search(SearchRequest("quasar"))]
+    sharded.rebuild(shards=["Standards"])
+    moved = {name for name, generation in generations.items() if sharded.shards[name].status()["generation"] != generation}
+    assert moved == {"Skills", "Standards"}
+
+
+def test_cli_switches_layouts_and_keeps_using_the_built_one(tmp_path: Path, capsys):
+    _library(tmp_path)
+    assert main(["index", "--root", str(tmp_path)]) == 0
+    assert main(["index", "--layout", "sharded", "--root", str(tmp_path)]) == 0
+    assert not (tmp_path / ".perfect-prompts" / "index.sqlite3").exists()
+    assert isinstance(open_index(tmp_path), ShardedPromptBeaconIndex)
+    assert main(["index", "--shard", "Skills", "--root", str(tmp_path)]) == 0
+    capsys.readouterr()
+    assert main(["status", "--json", "--root", str(tmp_path)]) == 0
+    status = json.loads(capsys.readouterr().out)
+    assert status["layout"] == "sharded" and status["node_count"] == "28"
+    assert main(["index", "--layout", "single", "--root", str(tmp_path)]) == 0
+    assert not (tmp_path / ".perfect-prompts" / "shards").exists()
+    assert isinstance(open_index(tmp_path), PromptBeaconIndex)
@@ -0,0 +1,58 @@
+import importlib.util
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from perfect_prompts.infrastructure.search.prompt_beacon import PromptBeaconIndex
+
+SOURCE = Path(__file__).resolve().parents[1] / "src"
+# Milliseconds of `-X importtime` cumulative time from the first perfect_prompts import on, best
+# of three runs. Slow CI machines can scale every budget with PERFECT_PROMPTS_IMPORT_BUDGET_SCALE.
+BUDGET_MS = {"status": 400, "query": 400, "query --server": 300, "--smoke-test": 250}
+DEFERRED = {"zipfile", "xml.etree.ElementTree", "html", "multiprocessing", "uuid", "http.server", "ctypes"}
+
+
+def _imports(code: str, *args: str) -> tuple[float, set[str]]:
+    env = {**os.environ, "PYTHONPATH": str(SOURCE), "QT_QPA_PLATFORM": "offscreen"}
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code, *args], env=env, capture_output=True, text=True, check=False,
+    ).stderr
+    total, modules, started = 0, set(), False
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules.add(name.strip())
+        # Top-level entries only; PySide6 is the GUI toolkit's own cost, not ours.
+        if name[1:].startswith(" ") or name.strip().startswith(("PySide6", "shiboken6")):
+            continue
+        started = started or name.strip().startswith("perfect_prompts")
+        total += int(cumulative) if started else 0
+    return total / 1000, modules
+
+
+def _check(label: str, code: str, *args: str) -> set[str]:
+    runs = [_imports(code, *args) for _ in range(3)]
+    budget = BUDGET_MS[label] * float(os.environ.get("PERFECT_PROMPTS_IMPORT_BUDGET_SCALE", "1"))
+    assert min(total for total, _ in runs) <= budget, f"{label} imports took {min(t for t, _ in runs):.0f} ms"
+    return runs[0][1]
+
+
+def test_cli_subcommands_defer_unrelated_imports_within_budget(tmp_path: Path):
+    (tmp_path / "Prompts").mkdir(); (tmp_path / "Prompts" / "a.md").write_text("agent", encoding="utf-8")
+    PromptBeaconIndex(tmp_path).rebuild()
+    cli = "import sys; from perfect_prompts.cli import main; main(sys.argv[1:])"
+    for label, args in (("status", ["status"]), ("query", ["query", "agent"])):
+        modules = _check(label, cli, *args, "--root", str(tmp_path))
+        assert not modules & DEFERRED, f"{label} imported {sorted(modules & DEFERRED)}"
+    modules = _check("query --server", cli, "query", "agent", "--server", "127.0.0.1:9")
+    assert "sqlite3" not in modules and "perfect_prompts.infrastructure.search.prompt_beacon" not in modules
+
+
+@pytest.mark.skipif(importlib.util.find_spec("PySide6") is None, reason="PySide6 is not installed")
+def test_gui_smoke_test_stays_within_its_import_budget():
+    modules = _check("--smoke-test", "from perfect_prompts.main import main; main(['--smoke-test'])")
+    assert "perfect_prompts.composition.container" not in modules and "sqlite3" not in modules
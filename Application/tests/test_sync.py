@@ -1,6 +1,8 @@
+import os
+import sqlite3
 from pathlib import Path
 from perfect_prompts.contracts.dto import SearchRequest
-from perfect_prompts.infrastructure.search.prompt_beacon import PromptBeaconIndex
+from perfect_prompts.infrastructure.search.prompt_beacon import SCHEMA_VERSION, PromptBeaconIndex
 
 
 def test_sync_reflects_native_filesystem_add_change_and_remove(tmp_path: Path):
@@ -20,3 +22,133 @@ def test_sync_reflects_native_filesystem_add_change_and_remove(tmp_path: Path):
     first.unlink()
     report = index.sync(); assert report.removed >= 1
     assert not any(hit.path.endswith("a.md") for hit in index.search(SearchRequest("alpha")))
+
+
+def test_sync_restamps_touched_files_without_reextracting(tmp_path: Path, monkeypatch):
+    folder = tmp_path / "Skills" / "handoff"; folder.mkdir(parents=True)
+    note = folder / "note.md"; note.write_text("delta body", encoding="utf-8")
+    index = PromptBeaconIndex(tmp_path); index.rebuild()
+    stat = note.stat(); os.utime(note, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+
+    from perfect_prompts.infrastructure.search import prompt_beacon
+    monkeypatch.setattr(prompt_beacon, "extract_file", lambda *args: (_ for _ in ()).throw(AssertionError("re-extracted")))
+    report = index.sync()
+    assert (report.touched, report.updated, report.added) == (1, 0, 0)
+    assert index.sync().touched == 0
+    assert any(hit.path.endswith("note.md") for hit in index.search(SearchRequest("delta")))
+
+
+def test_sync_rebuilds_projection_from_older_schema(tmp_path: Path):
+    folder = tmp_path / "Prompts" / "Portable" / "Plaintext"; folder.mkdir(parents=True)
+    (folder / "a.md").write_text("alpha", encoding="utf-8")
+    index = PromptBeaconIndex(tmp_path); index.rebuild()
+    connection = sqlite3.connect(index.db_path)
+    connection.execute("DELETE FROM metadata WHERE key='schema_version'"); connection.commit(); connection.close()
+    assert index.sync().added == 4
+    assert index.status()["schema_version"] == str(SCHEMA_VERSION)
+
+
+def _age_tree(root: Path, seconds: int = 60) -> None:
+    for path in [root, *root.rglob("*")]:
+        stat = path.stat(); os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns - seconds * 1_000_000_000))
+
+
+def test_pruned_sync_relists_only_changed_directories(tmp_path: Path):
+    stable = tmp_path / "Standards" / "Stable"; stable.mkdir(parents=True)
+    (stable / "kept.md").write_text("epsilon", encoding="utf-8")
+    active = tmp_path / "Skills" / "active"; active.mkdir(parents=True)
+    (active / "old.md").write_text("zeta", encoding="utf-8")
+    _age_tree(tmp_path)
+    index = PromptBeaconIndex(tmp_path); index.rebuild()
+
+    # Rewritten in place: the directory mtime does not move, so only --full sees it.
+    stat = (stable / "kept.md").stat()
+    (stable / "kept.md").write_text("epsilon revised", encoding="utf-8")
+    os.utime(stable / "kept.md", ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    (active / "new" / "deep").mkdir(parents=True); (active / "new" / "deep" / "n.md").write_text("eta", encoding="utf-8")
+    (active / "old.md").unlink()
+
+    report = index.sync()
+    assert (report.added, report.removed, report.updated) == (3, 1, 0)
+    assert any(hit.path == "Skills/active/new/deep/n.md" for hit in index.search(SearchRequest("eta")))
+    assert not index.search(SearchRequest("zeta"))
+    assert not index.search(SearchRequest("revised"))
+    assert index.sync(full=True).updated == 1
+    assert index.search(SearchRequest("revised"))
+
+    import shutil
+    shutil.rmtree(active / "new")
+    assert index.sync().removed == 3
+    assert not index.search(SearchRequest("eta"))
+
+
+def test_profiled_rebuild_and_sync_report_phases_extractors_and_slowest_files(tmp_path: Path):
+    import json
+    import zipfile
+
+    folder = tmp_path / "Skills" / "pack"; folder.mkdir(parents=True)
+    (folder / "a.md").write_text("alpha", encoding="utf-8")
+    (folder / "b.ipynb").write_text(json.dumps({"cells": [{"cell_type": "markdown", "source": ["beta"]}]}), encoding="utf-8")
+    with zipfile.ZipFile(folder / "c.zip", "w") as archive:
+        archive.writestr("README.md", "gamma")
+    index = PromptBeaconIndex(tmp_path)
+    assert index.rebuild().profile is None and "index_profile" not in index.status()
+
+    report = index.rebuild(profile=True)
+    assert {"walk", "ignore", "extract", "insert", "optimize", "vacuum", "commit"} <= set(report.profile.phases)
+    with sqlite3.connect(index.db_path) as connection:
+        assert connection.execute("PRAGMA freelist_count").fetchone()[0] == 0
+    assert {name: timing.files for name, timing in report.profile.extractors.items()} == {"text": 1, "notebook": 1, "zip": 1}
+    assert sorted(item.path for item in report.profile.slowest_files) == [f"Skills/pack/{name}" for name in ("a.md", "b.ipynb", "c.zip")]
+    durations = [item.duration_ms for item in report.profile.slowest_files]
+    assert durations == sorted(durations, reverse=True)
+
+    (folder / "d.md").write_text("delta", encoding="utf-8")
+    report = index.sync(profile=True)
+    assert {"stat", "walk", "extract", "commit"} <= set(report.profile.phases)
+    assert [item.path for item in report.profile.slowest_files] == ["Skills/pack/d.md"]
+    stored = index.status()["index_profile"]
+    assert stored["operation"] == "sync" and stored["slowest_files"][0]["path"] == "Skills/pack/d.md"
+    assert index.sync().profile is None and index.status()["index_profile"]["operation"] == "sync"
+
+
+def test_pruned_sync_drops_subtree_when_directory_becomes_file(tmp_path: Path):
+    folder = tmp_path / "Skills" / "x"; folder.mkdir(parents=True)
+    (folder / "inner.md").write_text("theta", encoding="utf-8")
+    _age_tree(tmp_path)
+    index = PromptBeaconIndex(tmp_path); index.rebuild()
+
+    import shutil
+    shutil.rmtree(folder)
+    folder.write_text("iota", encoding="utf-8")
+
+    report = index.sync()
+    assert (report.added, report.removed) == (1, 2)
+    assert not index.search(SearchRequest("theta"))
+    with sqlite3.connect(index.db_path) as connection:
+        assert connection.execute("SELECT kind FROM nodes WHERE path='Skills/x'").fetchall() == [("file",)]
+        assert not connection.execute("SELECT 1 FROM nodes WHERE path LIKE 'Skills/x/%'").fetchall()
+        assert not connection.execute("SELECT 1 FROM directories WHERE path='Skills/x'").fetchall()
+
+
+def test_pruned_and_exhaustive_sync_keep_rows_whose_stat_fails(tmp_path: Path, monkeypatch):
+    folder = tmp_path / "Skills" / "flaky"; folder.mkdir(parents=True)
+    (folder / "kept.md").write_text("kappa", encoding="utf-8")
+    _age_tree(tmp_path)
+    index = PromptBeaconIndex(tmp_path); index.rebuild()
+    (folder / "added.md").write_text("lambda", encoding="utf-8")
+
+    from dataclasses import replace
+    from perfect_prompts.infrastructure.search import prompt_beacon, walker
+    scan = walker.scan_directory
+
+    def failing_scan(root, relative, matcher):
+        return [replace(entry, error=True) if entry.name == "kept.md" else entry for entry in scan(root, relative, matcher)]
+
+    monkeypatch.setattr(walker, "scan_directory", failing_scan)
+    monkeypatch.setattr(prompt_beacon, "scan_directory", failing_scan)
+    for full in (False, True):
+        report = index.sync(full=full)
+        assert report.removed == 0 and report.errors >= 1
+        assert [hit.path for hit in index.search(SearchRequest("kappa"))] == ["Skills/flaky/kept.md"]
+    assert index.search(SearchRequest("lambda"))
@@ -0,0 +1,21 @@
+from pathlib import Path
+from perfect_prompts.infrastructure.search.ignore import IgnoreMatcher
+from perfect_prompts.infrastructure.search.walker import walk_library
+
+
+def test_scandir_walker_orders_directories_first_and_applies_ignores(tmp_path: Path):
+    skills = tmp_path / "Skills" / "handoff"; skills.mkdir(parents=True)
+    (skills / "B.md").write_text("beta", encoding="utf-8"); (skills / "a.PY").write_text("alpha", encoding="utf-8")
+    (skills / "nested").mkdir(); (skills / "__pycache__").mkdir(); (skills / "draft.tmp").write_text("x", encoding="utf-8")
+    (tmp_path / "README.md").write_text("outside the library", encoding="utf-8")
+    (tmp_path / ".perfect-promptsignore").write_text("*.tmp\n", encoding="utf-8")
+    (skills / "link.md").symlink_to(skills / "B.md")
+    entries = list(walk_library(tmp_path, IgnoreMatcher(tmp_path, tmp_path / ".perfect-promptsignore")))
+    assert [entry.relative for entry in entries] == [
+        "Skills", "Skills/handoff", "Skills/handoff/nested",
+        "Skills/handoff/a.PY", "Skills/handoff/B.md", "Skills/handoff/link.md",
+    ]
+    by_name = {entry.name: entry for entry in entries}
+    assert by_name["B.md"].kind == "file" and by_name["B.md"].size == 4 and by_name["B.md"].mtime_ns > 0
+    assert by_name["a.PY"].extension == ".py" and by_name["nested"].kind == "directory"
+    assert by_name["link.md"].kind == "symlink" and by_name["link.md"].extension == ""
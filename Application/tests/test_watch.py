@@ -0,0 +1,69 @@
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from perfect_prompts.contracts.dto import SearchRequest
+from perfect_prompts.infrastructure.search.prompt_beacon import PromptBeaconIndex
+from perfect_prompts.infrastructure.watch.inotify import Inotify
+from perfect_prompts.infrastructure.watch.watcher import LibraryWatcher
+
+
+def test_apply_changes_upserts_new_subtrees_and_deletes_vanished_paths(tmp_path: Path):
+    folder = tmp_path / "Prompts" / "Portable"; folder.mkdir(parents=True)
+    (folder / "a.md").write_text("alpha", encoding="utf-8")
+    index = PromptBeaconIndex(tmp_path); index.rebuild()
+
+    nested = folder / "New" / "Deep"; nested.mkdir(parents=True)
+    (nested / "b.md").write_text("beta", encoding="utf-8")
+    (folder / "a.md").write_text("alpha rewritten", encoding="utf-8")
+    (tmp_path / "README.md").write_text("outside the library", encoding="utf-8")
+    report = index.apply_changes(["Prompts/Portable/New", "Prompts/Portable/a.md", "README.md"])
+    assert (report.added, report.updated, report.removed) == (3, 1, 0)
+    assert index.search(SearchRequest("beta")) and index.search(SearchRequest("rewritten"))
+
+    shutil.rmtree(folder / "New")
+    assert index.apply_changes(["Prompts/Portable/New"]).removed == 3
+    report = index.sync(full=True)
+    assert (report.added, report.updated, report.removed) == (0, 0, 0)
+
+
+@pytest.mark.skipif(not Inotify.available(), reason="inotify is Linux-only")
+def test_inotify_watcher_applies_a_burst_as_one_batch(tmp_path: Path):
+    folder = tmp_path / "Skills" / "live"; folder.mkdir(parents=True)
+    index = PromptBeaconIndex(tmp_path); index.rebuild()
+    watcher = LibraryWatcher(index, backend="inotify", debounce_seconds=0.2)
+    reports, applied = [], threading.Event()
+    watcher.start(lambda report: (reports.append(report), applied.set()))
+    try:
+        time.sleep(0.5)
+        for number in range(5):
+            (folder / f"note{number}.md").write_text(f"omega{number}", encoding="utf-8")
+        assert applied.wait(10)
+    finally:
+        watcher.stop()
+    assert sum(report.added for report in reports) == 5
+    assert index.search(SearchRequest("omega3"))
+
+
+def test_polling_watcher_picks_up_in_place_rewrites(tmp_path: Path):
+    folder = tmp_path / "Prompts" / "a"; folder.mkdir(parents=True)
+    note = folder / "x.md"; note.write_text("alpha original", encoding="utf-8")
+    # Old enough that the pruned sync trusts the directory's mtime and would skip it.
+    for path in [tmp_path, *tmp_path.rglob("*")]:
+        stat = path.stat(); os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns - 60_000_000_000))
+    index = PromptBeaconIndex(tmp_path); index.rebuild()
+    watcher = LibraryWatcher(index, backend="polling", poll_seconds=0.1)
+    updated = threading.Event()
+    watcher.start(lambda report: updated.set() if report.updated else None)
+    try:
+        time.sleep(0.3)
+        with note.open("r+", encoding="utf-8") as handle:
+            handle.write("omega")
+        assert updated.wait(10)
+    finally:
+        watcher.stop()
+    assert index.search(SearchRequest("omega"))